@@ -1,32 +1,37 @@
 #!/usr/bin/env python
 
 # Modules
-from pygnmi.client import gNMIclient
+from pygnmi.nornir_plugin import CONNECTION_NAME, register
 from nornir import InitNornir
 from nornir.core.task import Task, Result
 import logging
 
 # User-defined tasks
+# gNMIclient is opened once per host by the connection plugin and reused by all the tasks
 def gnmi_capabilites(task: Task) -> Result:
-    with gNMIclient(target=(task.host.hostname, task.host.port), username=task.host.username,
-                    password=task.host.password, insecure=True) as gc:
+    gc = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
 
-        r = gc.capabilities()
+    r = gc.capabilities()
 
     return Result(host=task.host, result=r)
 
 def gnmi_get(task: Task, path) -> Result:
-    with gNMIclient(target=(task.host.hostname, task.host.port), username=task.host.username,
-                    password=task.host.password, insecure=True) as gc:
+    gc = task.host.get_connection(CONNECTION_NAME, task.nornir.config)
 
-        r = gc.get(path=path)
+    r = gc.get(path=path)
 
     return Result(host=task.host, result=r)
 
 # Main
 if __name__ == "__main__":
+    register()
+
     nr = InitNornir(config_file='config.yaml')
-    result = nr.run(task=gnmi_capabilites)
-    result2 = nr.run(task=gnmi_get, path=['openconfig-interfaces:interfaces'])
+    try:
+        result = nr.run(task=gnmi_capabilites)
+        result2 = nr.run(task=gnmi_get, path=['openconfig-interfaces:interfaces'])
+
+    finally:
+        nr.close_connections()
 
-    print(result2['gNMI-EOS1'][0])
\ No newline at end of file
+    print(result2['gNMI-EOS1'][0])
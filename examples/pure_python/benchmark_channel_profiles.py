@@ -0,0 +1,108 @@
+"""This example compares the throughput of the channel profiles against the local gNMI server:
+big Get responses and the full-state ONCE subscription"""
+# Modules
+import json
+import sys
+import time
+from concurrent import futures
+import grpc
+from pygnmi.client import gNMIclient
+from pygnmi.create_gnmi_path import gnmi_path_generator
+from pygnmi.spec.v080 import gnmi_pb2, gnmi_pb2_grpc
+
+
+# Variables
+INTERFACES = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+REPEATS = 5
+PROFILES = [None, "bulk-get", "high-rate-telemetry", "low-latency-set"]
+
+
+# Classes
+class BenchmarkServicer(gnmi_pb2_grpc.gNMIServicer):
+    """gNMI server returning the state of INTERFACES interfaces"""
+
+    def __init__(self):
+        state = {
+            f"Ethernet{index}": {"mtu": 9000, "description": "x" * 200, "counters": {"in-octets": index}}
+            for index in range(INTERFACES)
+        }
+        self.get_response = gnmi_pb2.GetResponse(
+            notification=[
+                gnmi_pb2.Notification(
+                    timestamp=time.time_ns(),
+                    update=[
+                        gnmi_pb2.Update(
+                            path=gnmi_path_generator("interfaces"),
+                            val=gnmi_pb2.TypedValue(json_val=json.dumps(state).encode()),
+                        )
+                    ],
+                )
+            ]
+        )
+        self.subscribe_responses = [
+            gnmi_pb2.SubscribeResponse(
+                update=gnmi_pb2.Notification(
+                    timestamp=time.time_ns(),
+                    prefix=gnmi_path_generator(f"interfaces/interface[name=Ethernet{index}]"),
+                    update=[
+                        gnmi_pb2.Update(path=gnmi_path_generator("state/mtu"), val=gnmi_pb2.TypedValue(uint_val=9000)),
+                        gnmi_pb2.Update(
+                            path=gnmi_path_generator("state/description"), val=gnmi_pb2.TypedValue(string_val="x" * 200)
+                        ),
+                    ],
+                )
+            )
+            for index in range(INTERFACES)
+        ] + [gnmi_pb2.SubscribeResponse(sync_response=True)]
+
+    def Capabilities(self, request, context):
+        return gnmi_pb2.CapabilityResponse(supported_encodings=[0], gNMI_version="0.8.0")
+
+    def Get(self, request, context):
+        return self.get_response
+
+    def Subscribe(self, request_iterator, context):
+        next(request_iterator)
+        yield from self.subscribe_responses
+
+
+# User-defined functions
+def benchmark(port: int, profile: str, size: int) -> dict:
+    result = {"profile": profile or "default"}
+
+    with gNMIclient(target=("localhost", port), insecure=True, encoding="json", channel_profile=profile) as gc:
+        started_at = time.perf_counter()
+        try:
+            for _ in range(REPEATS):
+                gc.get(path=["interfaces"])
+            result["get"] = f"{size * REPEATS / (time.perf_counter() - started_at) / 2**20:.1f} MB/s"
+
+        except Exception as err:
+            result["get"] = f"failed ({err.__class__.__name__})"
+
+        started_at = time.perf_counter()
+        for _ in range(REPEATS):
+            telemetry = gc.subscribe2(subscribe={"subscription": [{"path": "interfaces"}], "mode": "once"})
+            updates = sum(1 for _ in telemetry)
+        result["once"] = f"{updates * REPEATS / (time.perf_counter() - started_at):.0f} updates/s"
+
+    return result
+
+
+# Body
+if __name__ == "__main__":
+    servicer = BenchmarkServicer()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=4), options=[("grpc.max_send_message_length", 512 * 2**20)]
+    )
+    gnmi_pb2_grpc.add_gNMIServicer_to_server(servicer, server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+
+    size = servicer.get_response.ByteSize()
+    print(f"GetResponse: {size / 2**20:.1f} MB, ONCE subscription: {INTERFACES} notifications\n")
+
+    for profile in PROFILES:
+        print(benchmark(port, profile, size))
+
+    server.stop(0)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+
+# Modules
+from pygnmi.collector import TelemetryCollector
+
+# Variables
+from inventory import hosts
+
+# Body
+if __name__ == "__main__":
+    subscribe = {
+        'subscription': [
+            {
+                'path': 'openconfig-interfaces:interfaces/interface/state/counters',
+                'mode': 'sample',
+                'sample_interval': 10000000000
+            }
+        ],
+        'mode': 'stream',
+        'encoding': 'json'
+    }
+
+    targets = [
+        {
+            "target": (host_entry["ip_address"], host_entry["port"]),
+            "username": host_entry["username"],
+            "password": host_entry["password"]
+        }
+        for host_entry in hosts
+    ]
+
+    with TelemetryCollector(targets=targets, subscribe=subscribe, workers=4, insecure=True) as collector:
+        for target, telemetry_entry in collector.updates():
+            print(target, telemetry_entry)
@@ -0,0 +1,86 @@
+"""This module contains the cache of the capabilities of the network devices
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import logging
+import threading
+import time
+
+
+# Own modules
+from pygnmi.json_store import JSONFileStore
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Classes
+class CapabilitiesCache(object):
+    """
+    Capabilities of the targets collected by gNMIclient to negotiate the encoding (see capabilities_cache
+    argument of gNMIclient), so the Capabilities RPC is done once per ttl seconds per target rather than
+    on each connect.
+
+    The capabilities are kept in memory and, if path is provided, in the JSON file shared between
+    the processes (e.g., subsequent runs of pygnmicli), which is guarded by the lock file next to it.
+    """
+
+    def __init__(self, ttl: float = 3600.0, path: str = None):
+        self.ttl = ttl
+        self.path = path
+        self._store = JSONFileStore(path, "capabilities cache") if path else None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        if self.path:
+            self._entries = self._store.read()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, target: str) -> dict:
+        """Returns the capabilities of the target, None if they are not cached or older than ttl"""
+        with self._lock:
+            entry = self._entries.get(target)
+
+            # Other processes may have collected the capabilities since the file was read
+            if entry is None and self.path:
+                self._entries = self._store.read()
+                entry = self._entries.get(target)
+
+        if entry is None or time.time() - entry["collected_at"] >= self.ttl:
+            return None
+
+        return entry["capabilities"]
+
+    def put(self, target: str, capabilities: dict) -> None:
+        """Stores the capabilities of the target"""
+        entry = {"capabilities": capabilities, "collected_at": time.time()}
+
+        with self._lock:
+            if self.path:
+                with self._store.locked():
+                    self._entries = self._store.read()
+                    self._entries[target] = entry
+                    self._store.write(self._entries)
+
+            else:
+                self._entries[target] = entry
+
+    def discard(self, target: str) -> None:
+        """Removes the capabilities of the target, so they are collected again"""
+        with self._lock:
+            if self.path:
+                with self._store.locked():
+                    self._entries = self._store.read()
+
+                    if self._entries.pop(target, None) is not None:
+                        self._store.write(self._entries)
+
+            else:
+                self._entries.pop(target, None)
+
+
+# Process-wide cache, used by gNMIclient(capabilities_cache=True)
+default_cache = CapabilitiesCache()
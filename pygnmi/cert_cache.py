@@ -0,0 +1,111 @@
+"""This module contains the on-disk cache of the certificates downloaded from the network devices
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import datetime
+import logging
+import os
+import threading
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+
+
+# Own modules
+from pygnmi.json_store import JSONFileStore
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Statics
+DEFAULT_PATH = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "pygnmi", "certificates.json"
+)
+
+
+# Classes
+class CertificateCache(object):
+    """
+    Certificates of the targets, which are downloaded from the devices when path_cert isn't provided
+    (see cert_cache argument of gNMIclient), so the extra TLS handshake to fetch the certificate is done
+    once rather than on each connect.
+
+    The certificates are stored in the JSON file at path along with their SHA-256 fingerprint and expiry.
+    The file is shared between the processes and guarded by the lock file next to it. The certificate
+    is returned by get() until it expires; the client discards it, when the channel with the cached
+    certificate fails to become ready, and downloads it again.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or DEFAULT_PATH
+        self._store = JSONFileStore(self.path, "certificate cache")
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def get(self, target: str) -> bytes:
+        """Returns the PEM certificate of the target, None if it is not cached or expired"""
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._store.read()
+
+            entry = self._entries.get(target)
+
+            # Other processes may have added the certificate since the file was read
+            if entry is None:
+                self._entries = self._store.read()
+                entry = self._entries.get(target)
+
+        if entry is None:
+            return None
+
+        if entry["not_after"] <= _utc_timestamp():
+            logger.info(f"The cached certificate of {target} expired")
+            return None
+
+        return entry["pem"].encode("utf-8")
+
+    def put(self, target: str, pem: bytes) -> dict:
+        """Stores the PEM certificate of the target, returns its entry"""
+        certificate = x509.load_pem_x509_certificate(pem, default_backend())
+        not_after = getattr(certificate, "not_valid_after_utc", None)
+        if not_after is None:
+            not_after = certificate.not_valid_after.replace(tzinfo=datetime.timezone.utc)
+
+        entry = {
+            "pem": pem.decode("utf-8"),
+            "fingerprint": certificate.fingerprint(hashes.SHA256()).hex(),
+            "not_after": not_after.timestamp(),
+        }
+
+        with self._lock:
+            with self._store.locked():
+                entries = self._store.read()
+
+                previous = entries.get(target)
+                if previous and previous["fingerprint"] != entry["fingerprint"]:
+                    logger.warning(f"The certificate of {target} changed, new fingerprint {entry['fingerprint']}")
+
+                entries[target] = entry
+                self._store.write(entries)
+
+            self._entries = entries
+
+        return entry
+
+    def discard(self, target: str) -> None:
+        """Removes the certificate of the target"""
+        with self._lock:
+            with self._store.locked():
+                entries = self._store.read()
+
+                if entries.pop(target, None) is not None:
+                    self._store.write(entries)
+
+            self._entries = entries
+
+
+# User-defined functions
+def _utc_timestamp() -> float:
+    return datetime.datetime.now(datetime.timezone.utc).timestamp()
@@ -0,0 +1,137 @@
+"""This module contains the pool of gRPC channels shared by gNMIclient instances
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import logging
+import threading
+import time
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Classes
+class _PooledChannel(object):
+    """Channel in the pool with its reference count and the state shared by the clients"""
+
+    __slots__ = ("key", "channel", "refcount", "idle_since", "attributes")
+
+    def __init__(self, key: tuple, channel):
+        self.key = key
+        self.channel = channel
+        self.refcount = 0
+        self.idle_since = None
+        self.attributes = {}
+
+
+class ChannelPool(object):
+    """
+    Pool of gRPC channels keyed by the target, credentials and channel options, so the gNMIclient
+    instances connecting to the same target share one warm channel instead of establishing a new
+    TCP and TLS session each time (see channel_pool argument of gNMIclient).
+
+    Each acquire() increments the reference count of the channel, and release() decrements it.
+    The channel without references is closed after idle_timeout seconds, which is checked
+    whenever the pool is used, or with evict_idle(). Besides the channel, the pool keeps
+    the attributes dictionary per channel, where the clients store the state of the connection
+    (e.g., the negotiated encoding), so it isn't collected again.
+    """
+
+    def __init__(self, idle_timeout: float = 300.0):
+        self.idle_timeout = idle_timeout
+        self._channels = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def acquire(self, key: tuple, factory) -> _PooledChannel:
+        """Returns the pooled channel for the key, creating it with factory() if there is none"""
+        self.evict_idle()
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Channels to the different targets are created concurrently
+        with key_lock:
+            with self._lock:
+                pooled = self._channels.get(key)
+
+                if pooled is not None:
+                    pooled.refcount += 1
+                    pooled.idle_since = None
+
+            if pooled is None:
+                pooled = _PooledChannel(key, factory())
+                pooled.refcount = 1
+
+                with self._lock:
+                    self._channels[key] = pooled
+
+            else:
+                logger.debug(f"Reusing the pooled channel to {key[0]}")
+
+        return pooled
+
+    def release(self, key: tuple) -> None:
+        """Returns the channel to the pool"""
+        with self._lock:
+            pooled = self._channels.get(key)
+
+            if pooled is not None and pooled.refcount > 0:
+                pooled.refcount -= 1
+
+                if not pooled.refcount:
+                    pooled.idle_since = time.monotonic()
+
+        self.evict_idle()
+
+    def evict_idle(self) -> int:
+        """Closes the channels, which are not used for idle_timeout seconds, returns their number"""
+        now = time.monotonic()
+
+        with self._lock:
+            evicted = [
+                pooled
+                for pooled in self._channels.values()
+                if pooled.idle_since is not None and now - pooled.idle_since >= self.idle_timeout
+            ]
+
+            for pooled in evicted:
+                del self._channels[pooled.key]
+                self._key_locks.pop(pooled.key, None)
+
+        for pooled in evicted:
+            logger.debug(f"Closing the idle pooled channel to {pooled.key[0]}")
+            pooled.channel.close()
+
+        return len(evicted)
+
+    def clear(self) -> None:
+        """Closes all the channels, including the ones in use"""
+        with self._lock:
+            channels, self._channels = self._channels, {}
+            self._key_locks = {}
+
+        for pooled in channels.values():
+            pooled.channel.close()
+
+    def stats(self) -> list:
+        """Returns the list of the pooled channels with their reference counts"""
+        now = time.monotonic()
+
+        with self._lock:
+            return [
+                {
+                    "target": pooled.key[0],
+                    "refcount": pooled.refcount,
+                    "idle_time": now - pooled.idle_since if pooled.idle_since is not None else 0.0,
+                }
+                for pooled in self._channels.values()
+            ]
+
+
+# Process-wide pool, used by gNMIclient(channel_pool=True)
+default_pool = ChannelPool()
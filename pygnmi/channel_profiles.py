@@ -0,0 +1,49 @@
+"""This module contains the named profiles of the gRPC channel options
+(c)2019-2024, karneliuk.com"""
+
+# Statics
+_MB = 1024 * 1024
+
+CHANNEL_PROFILES = {
+    # Big Get responses and full-state ONCE / POLL subscriptions: no 4 MB limit of the received
+    # message, and HTTP/2 flow-control windows grown by BDP probing instead of the default 64 KB
+    "bulk-get": [
+        ("grpc.max_receive_message_length", 512 * _MB),
+        ("grpc.max_send_message_length", 64 * _MB),
+        ("grpc.http2.bdp_probe", 1),
+        ("grpc.http2.lookahead_bytes", 16 * _MB),
+        ("grpc.http2.max_frame_size", 16 * _MB - 1),
+        ("grpc.http2.write_buffer_size", 4 * _MB),
+    ],
+    # Long-lived STREAM subscriptions with many updates per second: large windows,
+    # and keep-alive to detect the dead peer on the idle stream
+    "high-rate-telemetry": [
+        ("grpc.max_receive_message_length", 128 * _MB),
+        ("grpc.http2.bdp_probe", 1),
+        ("grpc.http2.lookahead_bytes", 8 * _MB),
+        ("grpc.http2.max_frame_size", 16 * _MB - 1),
+        ("grpc.keepalive_time_ms", 60000),
+        ("grpc.keepalive_timeout_ms", 20000),
+        ("grpc.keepalive_permit_without_calls", 0),
+        ("grpc.http2.max_pings_without_data", 0),
+    ],
+    # Small Set requests, where the time of the round-trip matters: no BDP pings competing
+    # with the requests, and keep-alive to detect the dead peer before the request is sent
+    "low-latency-set": [
+        ("grpc.max_send_message_length", 64 * _MB),
+        ("grpc.http2.bdp_probe", 0),
+        ("grpc.keepalive_time_ms", 30000),
+        ("grpc.keepalive_timeout_ms", 10000),
+        ("grpc.keepalive_permit_without_calls", 0),
+        ("grpc.http2.max_pings_without_data", 0),
+    ],
+}
+
+
+# User-defined functions
+def get_channel_options(profile: str) -> list:
+    """Returns the list of the gRPC channel options of the profile"""
+    if profile not in CHANNEL_PROFILES:
+        raise ValueError(f"Unknown channel profile '{profile}', expected one of {sorted(CHANNEL_PROFILES)}.")
+
+    return list(CHANNEL_PROFILES[profile])
@@ -9,10 +9,14 @@ import sys
 import json
 import logging
 import queue
+import random
+import collections
 import struct
 import time
 import threading
 import os
+import weakref
+import zlib
 from typing import Any
 import cryptography
 import grpc
@@ -43,9 +47,19 @@ from cryptography.hazmat.backends import default_backend
 
 
 # Own modules
-from pygnmi.create_gnmi_path import gnmi_path_generator, gnmi_path_degenerator
+from pygnmi.create_gnmi_path import gnmi_path_generator, gnmi_path_degenerator, join_xpath
 from pygnmi.create_gnmi_extension import get_gnmi_extension
 from pygnmi.tools import diff_openconfig
+from pygnmi.state_cache import StateCache
+from pygnmi.dispatcher import PathDispatcher
+from pygnmi.stages import Deduplicator
+from pygnmi.staleness import StalenessMonitor
+from pygnmi.records import UpdateRecord, UpdateBatch
+from pygnmi.wire import peek_subscribe_response
+from pygnmi.channel_pool import ChannelPool, default_pool
+from pygnmi.channel_profiles import get_channel_options
+from pygnmi.cert_cache import CertificateCache
+from pygnmi.capabilities_cache import CapabilitiesCache, default_cache as default_capabilities_cache
 
 
 # Logger
@@ -53,7 +67,70 @@ logger = logging.getLogger(__name__)
 logger.addHandler(logging.StreamHandler(sys.stdout))
 
 
+# Statics
+_NON_RETRYABLE_CODES = {
+    grpc.StatusCode.INVALID_ARGUMENT,
+    grpc.StatusCode.NOT_FOUND,
+    grpc.StatusCode.PERMISSION_DENIED,
+    grpc.StatusCode.UNAUTHENTICATED,
+    grpc.StatusCode.UNIMPLEMENTED,
+}
+_UPDATE_OPERATIONS = {operation.lower() for operation in UpdateResult.Operation.keys()}
+_SUBSCRIPTION_END = object()
+_MAX_RECONNECT_BACKOFF_MS = 5000
+_RECOVERY_PROBE_INTERVAL = 1.0
+# Each that many compressed messages, one is compressed for the metrics, its ratio applies to the others
+_COMPRESSION_SAMPLE_INTERVAL = 100
+# gRPC polls the connectivity of the watched channel each 0.2s, it stops within two polls after unsubscribe
+_CONNECTIVITY_POLL_STOP_DELAY = 0.5
+_COMPRESSION_ALGORITHMS = {
+    "none": grpc.Compression.NoCompression,
+    "deflate": grpc.Compression.Deflate,
+    "gzip": grpc.Compression.Gzip,
+}
+
+# Targets, which name override of TLS is remembered for
+_MAX_TLS_PROFILES = 4096
+
+
 # Classes
+class _TLSProfiles(object):
+    """Name override of the TLS target, which became ready first, per target. The least recently
+    used targets are forgotten beyond max_size, the concurrent connects share the object."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._profiles = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def get(self, target_path: str) -> str:
+        with self._lock:
+            profile = self._profiles.get(target_path)
+            if profile is not None:
+                self._profiles.move_to_end(target_path)
+
+            return profile
+
+    def put(self, target_path: str, profile: str) -> None:
+        with self._lock:
+            self._profiles[target_path] = profile
+            self._profiles.move_to_end(target_path)
+
+            while len(self._profiles) > self.max_size:
+                self._profiles.popitem(last=False)
+
+    def discard(self, target_path: str) -> None:
+        with self._lock:
+            self._profiles.pop(target_path, None)
+
+
+# Process-wide, as the overrides are learned per target rather than per client
+_tls_profiles = _TLSProfiles(_MAX_TLS_PROFILES)
+
+
 class gNMIclient(object):
     """
     This class instantiates the object, which interacts with the network elements over gNMI.
@@ -76,13 +153,58 @@ class gNMIclient(object):
         show_diff: str = None,
         token: str = None,
         no_qos_marking: bool = False,
+        channel_pool=None,
+        cert_cache=None,
+        encoding: str = None,
+        capabilities_cache=None,
+        lazy: bool = False,
+        connectivity_callback=None,
+        channel_profile: str = None,
+        compression: str = None,
+        auto_recover: bool = False,
+        refresh_certificate: bool = False,
         **kwargs,
     ):
         """
         Initializing the object
+
+        channel_pool: True or ChannelPool to share the channel (and the negotiated encoding) with other
+        clients connecting to the same target with the same credentials and options. The process-wide
+        pool is used for True. Closing the client returns the channel to the pool instead of closing it.
+        cert_cache: True, path to the file or CertificateCache to store the certificate downloaded from
+        the target (when path_cert isn't provided) on disk and reuse it on the next connects until it
+        expires or the channel fails to become ready with it.
+        encoding: encoding used when it isn't set in the request; if it isn't provided, it is negotiated
+        based on the capabilities of the target on the first request, which needs it.
+        capabilities_cache: True or CapabilitiesCache to reuse the capabilities of the target collected
+        for the negotiation of the encoding by other clients. The process-wide cache is used for True.
+        lazy: connect() returns without waiting for the channel to become ready. The channel connects
+        in background, and the requests sent before it is ready wait for it up to gnmi_timeout.
+        If the channel with the certificate from cert_cache fails, while the target accepts
+        the connections, the certificate is downloaded again and the channel is re-created.
+        The shared channel (channel_pool) of the lazy client doesn't use cert_cache.
+        connectivity_callback: function called with grpc.ChannelConnectivity on each change of the state
+        of the channel.
+        channel_profile: name of the set of gRPC channel options tuned for the workload: "bulk-get",
+        "high-rate-telemetry" or "low-latency-set" (see pygnmi.channel_profiles). The options in
+        grpc_options take precedence over the ones of the profile.
+        compression: "gzip" or "deflate" to compress the messages sent to the target; get(), set() and
+        subscriptions may override it ("none" disables it). The target compresses the responses
+        per its own settings. The request_* metrics count the requests sent to the target only
+        (the responses and telemetry aren't measured); the size of the compressed requests
+        is estimated by the ratio of each 100th request compressed with zlib.
+        auto_recover: watch the state of the channel and, once it is in TRANSIENT_FAILURE, probe
+        the target and re-create the channel as soon as the target is reachable, instead of waiting
+        for the growing reconnect backoff of gRPC. The subscriptions with reconnect=True are
+        re-established over the new channel. Not applicable to the channels from channel_pool.
+        refresh_certificate: download the certificate of the target again when the channel is
+        re-created (it is taken from cert_cache otherwise), as the device may generate the new
+        certificate on reload.
         """
         self.__metadata = [("username", username), ("password", password)]
-        self.__encoding = "json"  # default, may get overridden based on capabilities
+        self.__encoding = encoding or "json"  # default, may get overridden based on capabilities
+        self.__is_encoding_negotiated = encoding is not None
+        self.__negotiation_lock = threading.Lock()
         self.__debug = debug
         self.__insecure = insecure
         self.__path_cert = path_cert
@@ -90,12 +212,38 @@ class gNMIclient(object):
         self.__path_root = path_root
         if grpc_options is None:
             grpc_options = []
+        if channel_profile:
+            grpc_options = get_channel_options(channel_profile) + grpc_options
+        if auto_recover:
+            # The re-created channel doesn't share the subchannel (and its backoff) with the failed one
+            grpc_options = [
+                ("grpc.max_reconnect_backoff_ms", _MAX_RECONNECT_BACKOFF_MS),
+                ("grpc.use_local_subchannel_pool", 1),
+            ] + grpc_options
         self.__options = ([("grpc.ssl_target_name_override", override)] + grpc_options) if override else grpc_options
         self.__token = token
         self.__gnmi_timeout = gnmi_timeout
         self.__show_diff = show_diff if show_diff in {"get", "print"} else ""
         self.__skip_verify = skip_verify
         self.__no_qos_marking = no_qos_marking
+        self.__compression = self._get_compression_algorithm(compression)
+        self.__compressed_messages = 0
+        self.__compression_sample_ratio = None
+
+        # Statistics of the requests sent to the target and of the state of the channel
+        self.__metrics_lock = threading.Lock()
+        self.metrics = {
+            "request_messages": 0,
+            "request_bytes": 0,
+            "request_compressed_bytes": 0,
+            "request_compression_ratio": None,
+            "connectivity_state": None,
+            "state_changes": 0,
+            "transient_failures": 0,
+            "recoveries": 0,
+            "channel_replacements": 0,
+            "last_outage": None,
+        }
 
         if re.match("unix:.*", target[0]):
             self.__target = target
@@ -111,6 +259,49 @@ class gNMIclient(object):
 
         self.__grpc_proxy = os.getenv("grpc_proxy")
 
+        # Open subscriptions, so they can be closed all at once
+        self.__subscribers = weakref.WeakSet()
+
+        # Channel shared with other clients
+        if channel_pool is True:
+            channel_pool = default_pool
+        self.__channel_pool = channel_pool if isinstance(channel_pool, ChannelPool) else None
+        self.__pool_key = None
+        self.__is_channel_acquired = False
+        self.__channel = None
+        self.__supported_encodings = None
+        self.connect_timings = {}
+
+        # Certificate downloaded from the target
+        if cert_cache is True:
+            cert_cache = CertificateCache()
+        elif isinstance(cert_cache, str):
+            cert_cache = CertificateCache(cert_cache)
+        self.__cert_cache = cert_cache if isinstance(cert_cache, CertificateCache) else None
+
+        # Capabilities collected by other clients
+        if capabilities_cache is True:
+            capabilities_cache = default_capabilities_cache
+        self.__capabilities_cache = capabilities_cache if isinstance(capabilities_cache, CapabilitiesCache) else None
+        self.__connection_state = {}
+
+        # Channel connecting in background
+        self.__lazy = lazy
+        self.__connectivity_callback = connectivity_callback
+        self.__connectivity = None
+        self.__is_connectivity_watched = False
+
+        # Channel re-created after the outage
+        self.__auto_recover = auto_recover
+        self.__refresh_certificate = refresh_certificate
+        self.__failed_at = None
+        self.__is_cert_cached = False
+        self.__channel_lock = threading.Lock()
+        self.__recovery_thread = None
+        self.__recovery_lock = threading.Lock()
+        self.__is_closed = threading.Event()
+        self._connect_phase = None
+
     def configureKeepalive(
         self,
         keepalive_time_ms: int,
@@ -148,14 +339,293 @@ class gNMIclient(object):
         Building the connectivity towards network element over gNMI
         timeout: optional override of the time to wait for connection,
         defaults to init parameter
+
+        The durations of the phases ("certificate", "channel_ready" and "total") are stored
+        in connect_timings in seconds, along with "capabilities" once the encoding is negotiated.
+        """
+        if timeout is None:
+            timeout = self.__gnmi_timeout
+
+        # Channel becomes ready on the first request
+        if self.__lazy:
+            timeout = 0
+
+        # Duration of the phases of the connection in seconds
+        self.connect_timings = {}
+        connect_started_at = time.perf_counter()
+
+        # Shared channel is created only by the first client
+        if self.__channel_pool is not None:
+            if self.__pool_key is None:
+                self.__pool_key = self._get_pool_key()
+
+            # The lazy client can't replace the shared channel, if the cached certificate fails
+            pooled = self.__channel_pool.acquire(
+                self.__pool_key, lambda: self._open_channel(timeout, use_cert_cache=not self.__lazy)
+            )
+            self.__channel = pooled.channel
+            self.__is_channel_acquired = True
+            connection_state = pooled.attributes
+
+        else:
+            self.__channel = self._open_channel(timeout)
+            connection_state = {}
+
+        if "stub" not in connection_state:
+            connection_state["stub"] = gNMIStub(self.__channel)
+        self.__stub = connection_state["stub"]
+
+        self.__is_closed.clear()
+        if self.__lazy or self.__connectivity_callback or self.__auto_recover:
+            self.__channel.subscribe(self._on_connectivity_change, try_to_connect=self.__lazy or self.__auto_recover)
+            self.__is_connectivity_watched = True
+
+        # Encoding is negotiated on the first RPC, which needs it
+        self.__connection_state = connection_state
+
+        self._connect_phase = "connected"
+        self.connect_timings["total"] = time.perf_counter() - connect_started_at
+
+        return self
+
+    @staticmethod
+    def _get_compression_algorithm(compression: str):
+        if compression is None:
+            return None
+
+        if compression.lower() not in _COMPRESSION_ALGORITHMS:
+            raise ValueError(
+                f"Unsupported compression '{compression}', expected one of {sorted(_COMPRESSION_ALGORITHMS)}."
+            )
+
+        return _COMPRESSION_ALGORITHMS[compression.lower()]
+
+    def _get_compression(self, compression: str, request):
+        """
+        Compression algorithm of the request: per call, or per client. The size of the request
+        compressed with it is estimated for the metrics
+        """
+        algorithm = self.__compression if compression is None else self._get_compression_algorithm(compression)
+        is_compressed = algorithm in {grpc.Compression.Gzip, grpc.Compression.Deflate}
+        size = request.ByteSize()
+
+        # The message is serialized and compressed again by gRPC, so only the samples are compressed here
+        with self.__metrics_lock:
+            is_sampled = is_compressed and self.__compressed_messages % _COMPRESSION_SAMPLE_INTERVAL == 0
+            if is_compressed:
+                self.__compressed_messages += 1
+
+        if is_sampled:
+            compressed_size = len(zlib.compress(request.SerializeToString()))
+            sample_ratio = max(size, 1) / max(compressed_size, 1)
+
+        with self.__metrics_lock:
+            if is_sampled:
+                self.__compression_sample_ratio = sample_ratio
+
+            self.metrics["request_messages"] += 1
+            self.metrics["request_bytes"] += size
+
+            if is_compressed and self.__compression_sample_ratio:
+                self.metrics["request_compressed_bytes"] += round(size / self.__compression_sample_ratio)
+            else:
+                self.metrics["request_compressed_bytes"] += size
+
+            self.metrics["request_compression_ratio"] = self.metrics["request_bytes"] / max(
+                self.metrics["request_compressed_bytes"], 1
+            )
+
+        return algorithm
+
+    def _on_connectivity_change(self, connectivity) -> None:
+        self.__connectivity = connectivity
+        logger.debug(f"Channel to {self.__target_path} is {connectivity.name}")
+
+        with self.__metrics_lock:
+            self.metrics["connectivity_state"] = connectivity.name
+            self.metrics["state_changes"] += 1
+
+            if connectivity is grpc.ChannelConnectivity.TRANSIENT_FAILURE and self.__failed_at is None:
+                self.__failed_at = time.monotonic()
+                self.metrics["transient_failures"] += 1
+
+            elif connectivity is grpc.ChannelConnectivity.READY and self.__failed_at is not None:
+                self.metrics["recoveries"] += 1
+                self.metrics["last_outage"] = time.monotonic() - self.__failed_at
+                self.__failed_at = None
+
+        if connectivity is grpc.ChannelConnectivity.TRANSIENT_FAILURE:
+            # Certificate may have been replaced on the device, after the lazy channel was created
+            if (self.__auto_recover or self.__is_cert_cached) and self.__channel_pool is None:
+                self._start_recovery()
+
+        if self.__connectivity_callback:
+            self.__connectivity_callback(connectivity)
+
+    def _start_recovery(self) -> None:
+        with self.__recovery_lock:
+            if self.__recovery_thread is None or not self.__recovery_thread.is_alive():
+                self.__recovery_thread = threading.Thread(
+                    target=self._recover_channel, name=f"pygnmi-recovery-{self.__target_path}", daemon=True
+                )
+                self.__recovery_thread.start()
+
+    def _recover_channel(self) -> None:
+        """
+        Probing the target, while the channel fails to connect, and re-creating the channel
+        once the target accepts the connections
+        """
+        # The channel alternates between TRANSIENT_FAILURE and CONNECTING until it is READY
+        while not self.__is_closed.is_set() and self.__failed_at is not None:
+            if self._is_target_reachable():
+                try:
+                    self._replace_channel()
+                    return
+
+                except Exception as err:
+                    logger.warning(f"The channel to {self.__target_path} is not re-created: {err}")
+
+            self.__is_closed.wait(_RECOVERY_PROBE_INTERVAL)
+
+    def _is_target_reachable(self) -> bool:
+        if self.__target_path.startswith("unix:") or self.__grpc_proxy:
+            return True
+
+        try:
+            with socket.create_connection(
+                (re.sub(r"[\[\]]", "", self.__target[0]), int(self.__target[1])), timeout=_RECOVERY_PROBE_INTERVAL
+            ):
+                return True
+
+        except OSError:
+            return False
+
+    def _replace_channel(self) -> None:
+        """Creating the new channel to the target and moving the stub and the subscriptions to it"""
+        channel = self._open_channel(
+            self.__gnmi_timeout, use_cert_cache=not (self.__refresh_certificate or self.__is_cert_cached)
+        )
+
+        # The client is either closed with the old channel, or the new channel is set before close()
+        with self.__channel_lock:
+            if self.__is_closed.is_set():
+                channel.close()
+                return
+
+            old_channel, self.__channel = self.__channel, channel
+            self.__stub = gNMIStub(channel)
+            self.__connection_state["stub"] = self.__stub
+
+            for subscriber in list(self.__subscribers):
+                subscriber._channel = channel
+
+            channel.subscribe(self._on_connectivity_change, try_to_connect=True)
+            self._close_watched_channel(old_channel)
+
+        with self.__metrics_lock:
+            self.metrics["channel_replacements"] += 1
+        logger.info(f"The channel to {self.__target_path} is re-created")
+
+    def _call_unary(self, method: str, request, **kwargs):
+        """
+        Calling the unary RPC. The call cancelled, as the channel was re-created meanwhile
+        (see auto_recover and lazy), is sent once again over the new channel
+        """
+        stub = self.__stub
+
+        try:
+            return getattr(stub, method)(request, metadata=self.__metadata, **kwargs, **self._get_call_options())
+
+        except grpc.RpcError as err:
+            if stub is self.__stub or err.code() is not grpc.StatusCode.CANCELLED:
+                raise
+
+            logger.info(f"{method} request to {self.__target_path} is re-sent over the re-created channel")
+            return getattr(self.__stub, method)(
+                request, metadata=self.__metadata, **kwargs, **self._get_call_options()
+            )
+
+    def _close_watched_channel(self, channel) -> None:
+        """
+        Closing the channel, which connectivity is watched, once gRPC stops polling it: the polling
+        thread of gRPC fails, if the channel is closed in between. The calls in progress are cancelled then.
+        """
+        channel.unsubscribe(self._on_connectivity_change)
+
+        closing = threading.Timer(_CONNECTIVITY_POLL_STOP_DELAY, channel.close)
+        closing.daemon = True
+        closing.start()
+
+    def _get_call_options(self) -> dict:
+        """Options of the unary requests: until the lazy channel is ready, they wait for it"""
+        if self.__lazy and self.__connectivity is not grpc.ChannelConnectivity.READY:
+            return {"wait_for_ready": True, "timeout": self.__gnmi_timeout}
+
+        return {}
+
+    def negotiate_encoding(self) -> str:
+        """
+        Picking the encoding based on the capabilities of the network device, unless it is
+        set explicitly or already negotiated. The capabilities are collected once per channel,
+        or taken from the capabilities cache.
+        """
+        if self.__is_encoding_negotiated:
+            return self.__encoding
+
+        with self.__negotiation_lock:
+            if self.__is_encoding_negotiated:
+                return self.__encoding
+
+            connection_state = self.__connection_state
+
+            if "supported_encodings" not in connection_state:
+                caps = None
+                if self.__capabilities_cache is not None:
+                    caps = self.__capabilities_cache.get(self.__target_path)
+
+                if caps is None:
+                    phase = self._connect_phase
+                    self._connect_phase = "capabilities"
+                    phase_started_at = time.perf_counter()
+                    caps = self.capabilities()
+                    self.connect_timings["capabilities"] = time.perf_counter() - phase_started_at
+                    self._connect_phase = phase
+
+                    if caps and self.__capabilities_cache is not None:
+                        self.__capabilities_cache.put(self.__target_path, caps)
+
+                if caps and "supported_encodings" in caps:
+                    connection_state["supported_encodings"] = caps["supported_encodings"]
+
+            if "supported_encodings" in connection_state:
+                self.__supported_encodings = connection_state["supported_encodings"]
+                # Automatically pick encoding, in order of prefence
+                for p in ["json", "json_ietf", "bytes", "proto", "ascii"]:
+                    if p in self.__supported_encodings:
+                        self.__encoding = p
+                        logger.info(f"Selected encoding '{p}' based on capabilities")
+                        break
+            else:
+                logger.warning(f"Unable to detect supported encodings, defaulting to '{self.__encoding}'")
+
+            self.__is_encoding_negotiated = True
+
+        return self.__encoding
+
+    def _open_channel(self, timeout: int = None, use_cert_cache: bool = True):
+        """
+        Creating the gRPC channel towards network element and waiting for it to be ready.
+        The channel is returned, the caller sets it as the channel of the client
         """
+        is_cert_cached = False
+
         # Insecure GRPC channel
         if self.__insecure:
             # Print if debug enabled
             debug_gnmi_msg(self.__debug, self.__target_path, "GRPC Target")
             debug_gnmi_msg(self.__debug, self.__options, "GRPC Channel options")
 
-            self.__channel = grpc.insecure_channel(self.__target_path, self.__metadata + self.__options)
+            channel = grpc.insecure_channel(self.__target_path, self.__metadata + self.__options)
 
         # Secure GRPC channel
         else:
@@ -181,38 +651,22 @@ class gNMIclient(object):
 
             # Download a certficate from device if it is not provided
             else:
-                try:
-                    if self.__grpc_proxy:
-                        logger.debug(f"Using proxy {self.__grpc_proxy}")
-                        grpc_proxy = urlparse(self.__grpc_proxy)
-                        s = socket.socket()
-                        s.connect((grpc_proxy.hostname, grpc_proxy.port))
-                        # create tunnel to target
-                        s.send(f"CONNECT {self.__target[0]}:{self.__target[1]} HTTP/1.0\r\n\r\n".encode())
-                        buf = s.recv(8192)
-                        if buf[9:12] != b"200":
-                            raise gNMIException(f"Didn't get a 200 from the proxy, instead: {buf})")
-                        # upgrade socket to ssl - ignore certifcate errors since we only want
-                        # to get the certificate and don't transfer sensitive data
-                        ctx = ssl.create_default_context()
-                        ctx.check_hostname = False
-                        ctx.verify_mode = ssl.CERT_NONE
-                        cert = ctx.wrap_socket(s, server_hostname=self.__target[0]).getpeercert(True)
-                        ssl_cert = ssl.DER_cert_to_PEM_cert(cert).encode("utf-8")
-                    else:
-                        ssl_cert = ssl.get_server_certificate(
-                            (
-                                re.sub(r"[\[\]]", "", self.__target[0]),
-                                self.__target[1],
-                            )
-                        ).encode("utf-8")
+                ssl_cert = None
 
-                except Exception as e:
-                    logger.error(f"The SSL certificate cannot be retrieved from {self.__target}")
-                    raise gNMIException(
-                        f"The SSL certificate cannot be retrieved from {self.__target}",
-                        e,
-                    )
+                if self.__cert_cache is not None and use_cert_cache:
+                    ssl_cert = self.__cert_cache.get(self.__target_path)
+                    is_cert_cached = ssl_cert is not None
+
+                if ssl_cert is None:
+                    self._connect_phase = "certificate"
+                    phase_started_at = time.perf_counter()
+
+                    ssl_cert = self._download_certificate()
+
+                    self.connect_timings["certificate"] = time.perf_counter() - phase_started_at
+
+                    if self.__cert_cache is not None:
+                        self.__cert_cache.put(self.__target_path, ssl_cert)
 
             if self.__skip_verify:
                 # Work with the certificate contents
@@ -256,16 +710,18 @@ class gNMIclient(object):
                 if ssl_cert_common_name:
                     self.__cert_sans.append(ssl_cert_common_name)
 
-                # Set auto overrides
-                for san in self.__cert_sans:
-                    self.__options.append(("grpc.ssl_target_name_override", san))
-
-                # Set empty override if neither CN ans SARs exist
-                if not ssl_cert_common_name and not self.__cert_sans:
-                    self.__options.append(("grpc.ssl_target_name_override", ""))
+                # Set auto overrides, CN first; each of them is tried on own channel concurrently.
+                # Empty override is set if neither CN ans SARs exist
+                profiles = {
+                    name: self.__options + [("grpc.ssl_target_name_override", name)]
+                    for name in list(dict.fromkeys(reversed(self.__cert_sans))) or [""]
+                }
 
                 logger.warning("ssl_target_name_override is applied, should be used for testing only!")
 
+            else:
+                profiles = {None: self.__options}
+
             # Set up SSL channel credentials
             if self.__path_key and self.__path_root:
                 cert = grpc.ssl_channel_credentials(
@@ -285,52 +741,161 @@ class gNMIclient(object):
             else:
                 credentials = cert
 
+            # The profile, which became ready first before, is used alone
+            preferred_profile = _tls_profiles.get(self.__target_path)
+            if preferred_profile in profiles:
+                names = [preferred_profile]
+            elif timeout is None or timeout > 0:
+                names = list(profiles)
+            else:
+                names = list(profiles)[:1]
+
             # Print if debug enabled
             debug_gnmi_msg(self.__debug, self.__target_path, "GRPC Target")
-            debug_gnmi_msg(self.__debug, self.__options, "GRPC Channel options")
+            debug_gnmi_msg(self.__debug, [profiles[name] for name in names], "GRPC Channel options")
 
-            self.__channel = grpc.secure_channel(self.__target_path, credentials=credentials, options=self.__options)
+            channels = {
+                name: grpc.secure_channel(self.__target_path, credentials=credentials, options=profiles[name])
+                for name in names
+            }
+            channel = channels[names[0]]
 
-        if timeout is None:
-            timeout = self.__gnmi_timeout
         if timeout is None or timeout > 0:
-            self.wait_for_connect(timeout)
-        self.__stub = gNMIStub(self.__channel)
-
-        caps = self.capabilities()
-        if "supported_encodings" in caps:
-            self.__supported_encodings = caps["supported_encodings"]
-            # Automatically pick encoding, in order of prefence
-            for p in ["json", "json_ietf", "bytes", "proto", "ascii"]:
-                if p in self.__supported_encodings:
-                    self.__encoding = p
-                    logger.info(f"Selected encoding '{p}' based on capabilities")
-                    break
-        else:
-            logger.warning(f"Unable to detect supported encodings, defaulting to '{self.__encoding}'")
+            self._connect_phase = "channel_ready"
+            phase_started_at = time.perf_counter()
 
-        return self
+            try:
+                if self.__insecure or len(channels) == 1:
+                    self._wait_for_ready(channel, timeout)
+
+                else:
+                    winner = self._wait_for_first_ready(channels, timeout)
+                    channel = channels[winner]
+                    _tls_profiles.put(self.__target_path, winner)
+
+            except Exception:
+                for failed_channel in channels.values() if not self.__insecure else [channel]:
+                    failed_channel.close()
+
+                # The certificate may have been replaced on the device
+                if is_cert_cached:
+                    logger.info(f"The channel with the cached certificate of {self.__target} failed, re-fetching it")
+                    self.__cert_cache.discard(self.__target_path)
+
+                # Other name overrides may work with the new certificate
+                if not self.__insecure and len(channels) < len(profiles):
+                    _tls_profiles.discard(self.__target_path)
+
+                if is_cert_cached or (not self.__insecure and len(channels) < len(profiles)):
+                    return self._open_channel(timeout, use_cert_cache=False)
+
+                raise
+
+            # TCP and TLS handshakes
+            self.connect_timings["channel_ready"] = time.perf_counter() - phase_started_at
+
+        # Not verified by the handshake yet, if the channel isn't waited for
+        self.__is_cert_cached = is_cert_cached and timeout == 0
+
+        return channel
+
+    def _download_certificate(self) -> bytes:
+        """
+        Retrieving the certificate of the network element with the separate TLS handshake
+        """
+        try:
+            if self.__grpc_proxy:
+                logger.debug(f"Using proxy {self.__grpc_proxy}")
+                grpc_proxy = urlparse(self.__grpc_proxy)
+                s = socket.socket()
+                s.connect((grpc_proxy.hostname, grpc_proxy.port))
+                # create tunnel to target
+                s.send(f"CONNECT {self.__target[0]}:{self.__target[1]} HTTP/1.0\r\n\r\n".encode())
+                buf = s.recv(8192)
+                if buf[9:12] != b"200":
+                    raise gNMIException(f"Didn't get a 200 from the proxy, instead: {buf})")
+                # upgrade socket to ssl - ignore certifcate errors since we only want
+                # to get the certificate and don't transfer sensitive data
+                ctx = ssl.create_default_context()
+                ctx.check_hostname = False
+                ctx.verify_mode = ssl.CERT_NONE
+                cert = ctx.wrap_socket(s, server_hostname=self.__target[0]).getpeercert(True)
+                return ssl.DER_cert_to_PEM_cert(cert).encode("utf-8")
+            else:
+                return ssl.get_server_certificate(
+                    (
+                        re.sub(r"[\[\]]", "", self.__target[0]),
+                        self.__target[1],
+                    )
+                ).encode("utf-8")
+
+        except Exception as e:
+            logger.error(f"The SSL certificate cannot be retrieved from {self.__target}")
+            raise gNMIException(
+                f"The SSL certificate cannot be retrieved from {self.__target}",
+                e,
+            )
+
+    def _get_pool_key(self) -> tuple:
+        """Key of the channel in the pool: target, credentials and options of the channel"""
+        return (
+            self.__target_path,
+            tuple(self.__metadata),
+            self.__insecure,
+            self.__path_cert,
+            self.__path_key,
+            self.__path_root,
+            self.__skip_verify,
+            self.__token,
+            self.__grpc_proxy,
+            tuple(self.__options),
+        )
 
     def wait_for_connect(self, timeout: int):
         """
         Wait for the gNMI connection to the server to come up, with given timeout
         """
+        self._wait_for_ready(self.__channel, timeout)
+
+    def _wait_for_ready(self, channel, timeout: int) -> None:
         try:
-            grpc.channel_ready_future(self.__channel).result(timeout=timeout)
+            grpc.channel_ready_future(channel).result(timeout=timeout)
 
         except grpc.FutureTimeoutError:
-            if not self.__insecure:
-                logger.error("Failed to setup gRPC channel, trying change cipher")
+            logger.error(f"Failed to setup gRPC channel to {self.__target_path}")
+            raise
 
-                try:
-                    os.environ["GRPC_SSL_CIPHER_SUITES"] = "HIGH"
-                    grpc.channel_ready_future(self.__channel).result(timeout=timeout)
+    def _wait_for_first_ready(self, channels: dict, timeout: int):
+        """
+        Wait for the first of the channels with different TLS settings to come up, close the others
+        and return its key
+        """
+        ready = queue.Queue()
+        futures = []
 
-                except grpc.FutureTimeoutError:
-                    raise
+        for name, channel in channels.items():
+            future = grpc.channel_ready_future(channel)
+            future.add_done_callback(lambda f, name=name: None if f.cancelled() else ready.put(name))
+            futures.append(future)
 
-            else:
-                raise
+        try:
+            winner = ready.get(timeout=timeout)
+
+        except queue.Empty:
+            logger.error(f"Failed to setup gRPC channel to {self.__target_path} with any of {len(channels)} profiles")
+            raise grpc.FutureTimeoutError()
+
+        finally:
+            for future in futures:
+                future.cancel()
+
+        for name, channel in channels.items():
+            if name != winner:
+                channel.close()
+
+        logger.debug(f"Channel to {self.__target_path} with TLS name override '{winner}' is ready first")
+
+        return winner
 
     def capabilities(self):
         """
@@ -343,7 +908,7 @@ class gNMIclient(object):
             gnmi_message_request = CapabilityRequest()
             debug_gnmi_msg(self.__debug, gnmi_message_request, "gNMI request")
 
-            gnmi_message_response = self.__stub.Capabilities(gnmi_message_request, metadata=self.__metadata)
+            gnmi_message_response = self._call_unary("Capabilities", gnmi_message_request)
             debug_gnmi_msg(self.__debug, gnmi_message_response, "gNMI response")
 
             if gnmi_message_response:
@@ -381,6 +946,11 @@ class gNMIclient(object):
                 if gnmi_message_response.gNMI_version:
                     response.update({"gnmi_version": gnmi_message_response.gNMI_version})
 
+            # Requested encodings are checked against the capabilities, once they are known
+            if "supported_encodings" in response:
+                self.__supported_encodings = response["supported_encodings"]
+                self.__connection_state["supported_encodings"] = response["supported_encodings"]
+
             logger.info(f"Collection of Capabilities is successfull")
 
             return response
@@ -398,16 +968,33 @@ class gNMIclient(object):
         if (
             not is_encoding_explicitly_set
             and requested_encoding
-            and self.__supported_encodings
+            and self._get_known_encodings()
             and requested_encoding.lower() not in self.__supported_encodings
         ):
             raise ValueError(
                 f"Requested encoding '{requested_encoding}' not in supported encodings '{self.__supported_encodings}'"
             )
 
-        encoding = requested_encoding or self.__encoding
+        encoding = requested_encoding or self.negotiate_encoding()
         return Encoding.Value(encoding.upper())  # may raise ValueError
 
+    def _get_known_encodings(self) -> list:
+        """
+        Returns the encodings supported by the target, if its capabilities are already known
+        to this client, the other clients of the channel or the capabilities cache. The capabilities
+        aren't collected, so the request with the explicit encoding doesn't wait for them.
+        """
+        if self.__supported_encodings is None:
+            supported_encodings = self.__connection_state.get("supported_encodings")
+
+            if supported_encodings is None and self.__capabilities_cache is not None:
+                caps = self.__capabilities_cache.get(self.__target_path)
+                supported_encodings = caps.get("supported_encodings") if caps else None
+
+            self.__supported_encodings = supported_encodings
+
+        return self.__supported_encodings
+
     def get(
         self,
         prefix: str = None,
@@ -415,6 +1002,7 @@ class gNMIclient(object):
         target: str = None,
         datatype: str = "all",
         encoding: str = None,
+        compression: str = None,
     ):
         """
         Collecting the information about the resources from defined paths.
@@ -441,6 +1029,8 @@ class gNMIclient(object):
           - proto
           - ascii
           - json_ietf
+
+        compression: "gzip", "deflate" or "none" to override the compression of the client
         """
         logger.info("Collecting info from requested paths (Get operation)...")
 
@@ -492,7 +1082,9 @@ class gNMIclient(object):
                 )
             debug_gnmi_msg(self.__debug, gnmi_message_request, "gNMI request")
 
-            gnmi_message_response = self.__stub.Get(gnmi_message_request, metadata=self.__metadata)
+            gnmi_message_response = self._call_unary(
+                "Get", gnmi_message_request, compression=self._get_compression(compression, gnmi_message_request)
+            )
             debug_gnmi_msg(self.__debug, gnmi_message_response, "gNMI response")
 
             if gnmi_message_response:
@@ -631,6 +1223,7 @@ class gNMIclient(object):
         prefix: str = None,
         target: str = None,
         extension: dict = None,
+        compression: str = None,
     ):
         """
         Changing the configuration on the destination network elements.
@@ -653,6 +1246,8 @@ class gNMIclient(object):
           - proto
           - ascii
           - json_ietf
+
+        compression: "gzip", "deflate" or "none" to override the compression of the client
         """
         del_protobuf_paths = []
         replace_msg = []
@@ -660,7 +1255,7 @@ class gNMIclient(object):
         diff_list = []
 
         # Set the encoding to auto-discovered value, unless overridden
-        encoding = encoding or self.__encoding
+        encoding = encoding or self.negotiate_encoding()
         gnmi_extension = get_gnmi_extension(ext=extension)
 
         # Gnmi PREFIX
@@ -743,7 +1338,9 @@ class gNMIclient(object):
                     )
             debug_gnmi_msg(self.__debug, gnmi_message_request, "gNMI request")
 
-            gnmi_message_response = self.__stub.Set(gnmi_message_request, metadata=self.__metadata)
+            gnmi_message_response = self._call_unary(
+                "Set", gnmi_message_request, compression=self._get_compression(compression, gnmi_message_request)
+            )
             debug_gnmi_msg(self.__debug, gnmi_message_response, "gNMI response")
 
             if gnmi_message_response:
@@ -894,7 +1491,7 @@ class gNMIclient(object):
         # encoding
         is_encoding_explicitly_set = True
         if "encoding" not in subscribe:
-            subscribe.update({"encoding": self.__encoding})
+            subscribe.update({"encoding": self.negotiate_encoding()})
             is_encoding_explicitly_set = False
 
         pb_encoding = self.convert_encoding(subscribe["encoding"], is_encoding_explicitly_set)
@@ -984,6 +1581,21 @@ class gNMIclient(object):
         else:
             return SubscribeRequest(subscribe=request)
 
+    def _build_aliasrequest(self, aliases: list):
+        """
+        Build the SubscribeRequest with the client-defined aliases out of the list of tuples,
+        where the first entry is the path and the second is the alias, e.g. ("interfaces", "#ifs")
+        """
+        request = AliasList()
+        for ae in aliases:
+            if isinstance(ae, tuple) and re.match("^#.*", ae[1]):
+                request.alias.add(path=gnmi_path_generator(ae[0]), alias=ae[1])
+
+            else:
+                raise ValueError("The alias is malformed. It should start with #...")
+
+        return SubscribeRequest(aliases=request)
+
     def subscribe(
         self,
         subscribe: dict = None,
@@ -1011,16 +1623,7 @@ class gNMIclient(object):
 
         if aliases:
             if isinstance(aliases, list):
-                request = AliasList()
-                for ae in aliases:
-                    if isinstance(ae, tuple):
-                        if re.match("^#.*", ae[1]):
-                            request.alias.add(path=gnmi_path_generator(ae[0]), alias=ae[1])
-
-                    else:
-                        raise ValueError("The alias is malformed. It should start with #...")
-
-                gnmi_message_request = SubscribeRequest(aliases=request)
+                gnmi_message_request = self._build_aliasrequest(aliases)
 
             else:
                 logger.error("Subscribe aliases request is specified, but the value is not list.")
@@ -1029,9 +1632,14 @@ class gNMIclient(object):
             gnmi_message_request = self._build_subscriptionrequest(subscribe)
             debug_gnmi_msg(self.__debug, gnmi_message_request, "gNMI request")
 
-        return self.__stub.Subscribe(self.__generator(gnmi_message_request), metadata=self.__metadata, timeout=timeout)
+        return self.__stub.Subscribe(
+            self.__generator(gnmi_message_request),
+            metadata=self.__metadata,
+            timeout=timeout,
+            wait_for_ready=self.__lazy,
+        )
 
-    def subscribe2(self, subscribe: dict, target: str = None, extension: list = None):
+    def subscribe2(self, subscribe: dict, target: str = None, extension: list = None, **kwargs):
         """
         New High-level method to serve temetry based on recent additions
         """
@@ -1041,40 +1649,116 @@ class gNMIclient(object):
 
         if subscribe["mode"].lower() in {"stream", "once", "poll"}:
             if subscribe["mode"].lower() == "stream":
-                return self.subscribe_stream(subscribe=subscribe, target=target, extension=extension)
+                return self.subscribe_stream(subscribe=subscribe, target=target, extension=extension, **kwargs)
 
             elif subscribe["mode"].lower() == "poll":
-                return self.subscribe_poll(subscribe=subscribe, target=target, extension=extension)
+                return self.subscribe_poll(subscribe=subscribe, target=target, extension=extension, **kwargs)
 
             elif subscribe["mode"].lower() == "once":
-                return self.subscribe_once(subscribe=subscribe, target=target, extension=extension)
+                return self.subscribe_once(subscribe=subscribe, target=target, extension=extension, **kwargs)
 
         else:
             raise gNMIException("Unknown subscription request mode.")
 
-    def subscribe_stream(self, subscribe: dict, target: str = None, extension: list = None):
+    def subscribe_stream(
+        self,
+        subscribe: dict,
+        target: str = None,
+        extension: list = None,
+        aliases: list = None,
+        compression: str = None,
+        **kwargs,
+    ):
+        """
+        Subscribe in the STREAM mode.
+
+        aliases: list of client-defined aliases as tuples (path, "#alias"), which are sent to the target
+        right after the subscription. Aliases used by the target in the prefix of notifications, both
+        client-defined and target-defined (with "use_aliases" set in the subscription), are resolved
+        to the paths transparently.
+
+        compression: "gzip", "deflate" or "none" to override the compression of the client
+
+        Other keyword arguments (e.g., cache, reconnect or incremental_sync) are passed to the subscriber,
+        see _Subscriber and StreamSubscriber for details.
+        """
         if "mode" not in subscribe:
             subscribe["mode"] = "STREAM"
         gnmi_message_request = self._build_subscriptionrequest(subscribe, target, extension)
         debug_gnmi_msg(self.__debug, gnmi_message_request, "gNMI request")
 
-        return StreamSubscriber(self.__channel, gnmi_message_request, self.__metadata)
+        alias_request = self._build_aliasrequest(aliases) if aliases else None
+
+        subscriber = StreamSubscriber(
+            self.__channel,
+            gnmi_message_request,
+            self.__metadata,
+            alias_request=alias_request,
+            wait_for_ready=self.__lazy,
+            compression=self._get_compression(compression, gnmi_message_request),
+            **kwargs,
+        )
+        self.__subscribers.add(subscriber)
+
+        return subscriber
 
-    def subscribe_poll(self, subscribe: dict, target: str = None, extension: list = None):
+    def subscribe_poll(
+        self,
+        subscribe: dict,
+        target: str = None,
+        extension: list = None,
+        aliases: list = None,
+        compression: str = None,
+        **kwargs,
+    ):
         if "mode" not in subscribe:
             subscribe["mode"] = "POLL"
         gnmi_message_request = self._build_subscriptionrequest(subscribe, target, extension)
         debug_gnmi_msg(self.__debug, gnmi_message_request, "gNMI request")
 
-        return PollSubscriber(self.__channel, gnmi_message_request, self.__metadata)
+        alias_request = self._build_aliasrequest(aliases) if aliases else None
+
+        subscriber = PollSubscriber(
+            self.__channel,
+            gnmi_message_request,
+            self.__metadata,
+            alias_request=alias_request,
+            wait_for_ready=self.__lazy,
+            compression=self._get_compression(compression, gnmi_message_request),
+            **kwargs,
+        )
+        self.__subscribers.add(subscriber)
+
+        return subscriber
 
-    def subscribe_once(self, subscribe: dict, target: str = None, extension: list = None):
+    def subscribe_once(
+        self,
+        subscribe: dict,
+        target: str = None,
+        extension: list = None,
+        aliases: list = None,
+        compression: str = None,
+        **kwargs,
+    ):
         if "mode" not in subscribe:
             subscribe["mode"] = "ONCE"
         gnmi_message_request = self._build_subscriptionrequest(subscribe, target, extension)
         debug_gnmi_msg(self.__debug, gnmi_message_request, "gNMI request")
 
-        return OnceSubscriber(self.__channel, gnmi_message_request, self.__metadata)
+        alias_request = self._build_aliasrequest(aliases) if aliases else None
+
+        subscriber = OnceSubscriber(
+            self.__channel,
+            gnmi_message_request,
+            self.__metadata,
+            alias_request=alias_request,
+            wait_for_ready=self.__lazy,
+            compression=self._get_compression(compression, gnmi_message_request),
+            **kwargs,
+        )
+        self.__subscribers.add(subscriber)
+
+        return subscriber
 
     def __generator(self, in_message):
         """
@@ -1085,10 +1769,46 @@ class gNMIclient(object):
         yield in_message
 
     def __exit__(self, type, value, traceback):
-        self.__channel.close()
+        self.close()
+
+    def close_all(self, timeout: float = None):
+        """Close all the subscriptions of this client.
+
+        The calls are cancelled all at once, and then the threads of the
+        subscriptions are waited for, so the time to close many subscriptions
+        doesn't grow with their number.
+        """
+        subscribers = list(self.__subscribers)
+
+        for subscriber in subscribers:
+            subscriber._cancel()
+
+        for subscriber in subscribers:
+            subscriber._join(timeout)
+
+        self.__subscribers.clear()
 
     def close(self):
-        self.__channel.close()
+        with self.__channel_lock:
+            self.__is_closed.set()
+
+        self.close_all()
+
+        is_connectivity_watched, self.__is_connectivity_watched = self.__is_connectivity_watched, False
+
+        if self.__channel_pool is not None:
+            if is_connectivity_watched:
+                self.__channel.unsubscribe(self._on_connectivity_change)
+
+            if self.__is_channel_acquired:
+                self.__is_channel_acquired = False
+                self.__channel_pool.release(self.__pool_key)
+
+        elif is_connectivity_watched:
+            self._close_watched_channel(self.__channel)
+
+        elif self.__channel is not None:
+            self.__channel.close()
 
 
 class _Subscriber:
@@ -1099,15 +1819,72 @@ class _Subscriber:
 
     `peek` and `get_update(timeout)` allow to read updates in a time-bound
     fashion.
+
+    Updates are decoded with telemetryParser as soon as they are received, and
+    passed through the stages (if any) in their order. A stage is a callable,
+    which takes the decoded update and returns it (potentially modified), or
+    None to drop it.
+
+    Callbacks can be registered for the path patterns with `on(pattern, callback)`,
+    see PathDispatcher for details. They are called from the thread receiving
+    the updates, after all the stages.
     """
 
-    def __init__(self, channel, request, metadata, once: bool = False):
+    def __init__(
+        self,
+        channel,
+        request,
+        metadata,
+        once: bool = False,
+        cache=None,
+        stages: list = None,
+        dedup=None,
+        staleness=None,
+        output: str = "dict",
+        alias_request=None,
+        reconnect: bool = False,
+        reconnect_backoff: tuple = (1.0, 60.0),
+        max_reconnects: int = None,
+        queue_updates: bool = True,
+        wait_for_ready: bool = False,
+        compression=None,
+    ):
         """
         Create a new object.
 
         channel: GRPC channel attached to a target
         request: SubscribeRequest
         metadata: gNMI metadata for that target
+        cache: True or StateCache to maintain the last-value cache of the subscribed state
+        stages: list of callables processing the decoded updates; each stage returns the update,
+          None to drop it, or the list of updates passed to the next stages one by one
+        dedup: True or Deduplicator to forward only the changed values of the leaves
+        staleness: factor or StalenessMonitor to report the subscribed paths, which are not updated
+          for factor * heartbeat_interval (or sample_interval); the events {"stale": ...} and
+          {"fresh": ...} are returned along with the updates, unless the monitor has own callback
+        output: format of the updates: "dict" (see telemetryParser()), "records" for the tuples
+          of UpdateRecord or "batch" for UpdateBatch per notification (see telemetryRecordParser()).
+          Compact formats don't coalesce the initial synchronisation and can't be combined with
+          cache, stages, dedup, staleness or callbacks. "raw" returns the serialized SubscribeResponse
+          as bytes, which gRPC doesn't deserialize at all (aliases aren't resolved), e.g. to forward
+          them as they are; peek_subscribe_response() reads the timestamp or sync_response out of them
+        alias_request: SubscribeRequest with the client-defined aliases
+        reconnect: re-issue the SubscribeRequest if the stream breaks (e.g., device reload)
+        reconnect_backoff: tuple (initial, maximum) delay in seconds between reconnects;
+          the delay doubles with each failed attempt and is randomised by up to 50%
+        max_reconnects: number of consecutive failed attempts before giving up (None for unlimited)
+        queue_updates: set to False, if the updates are consumed only by the stages and callbacks,
+          so they are not queued for next() / iteration
+        wait_for_ready: the stream waits for the channel to become ready instead of failing
+          (used by the lazy gNMIclient)
+        compression: grpc.Compression of the requests of the subscription
+
+        Once the stream is re-established, the update {"resync": {"reconnects": ..., "gap": ...,
+        "reason": ...}} is returned to mark the boundary, followed by the new initial
+        synchronisation of the state ending with the sync_response. Reconnect counts and gap
+        durations are available in the 'stats' attribute. The "records", "batch" and "raw" outputs
+        don't get the marker, so their streams contain only the records (or bytes); the boundary
+        is seen by the change of stats["reconnects"] and the new sync_response.
         """
 
         # Enqueue a 'POLL' when we should send an empty Poll to the
@@ -1117,83 +1894,373 @@ class _Subscriber:
         # send a close to the target.
         self._msgs = queue.Queue()
 
-        # updates from the target. The subscript thread pushes updates to that
-        # queue, and get_one_update (called from next()) dequeues them,
-        # decodes them using telemetryParser, then returns to the calling code.
+        # updates from the target. The subscript thread decodes updates using
+        # telemetryParser, runs them through the stages and pushes them to that
+        # queue, and get_one_update (called from next()) dequeues them, then
+        # returns to the calling code.
         self._updates = queue.Queue()
 
-        # start the subscription in a separate thread
-        _client_stream = self._create_client_stream(request)
+        # Events (e.g., staleness), which arrived during the coalesced synchronisation
+        # and are returned after it
+        self._held_updates = collections.deque()
+
+        if output not in {"dict", "records", "batch", "raw"}:
+            raise ValueError(f"Unknown output format '{output}'.")
+
+        if output != "dict" and (stages or any(option not in {None, False} for option in (cache, dedup, staleness))):
+            raise ValueError("Stages can be used only with the 'dict' output format.")
+        self._output = output
+
+        # The cache goes first, so it sees the updates as the target sent them
+        if cache is True:
+            cache = StateCache()
+        self.cache = cache if isinstance(cache, StateCache) else None
+        self._stages = ([self.cache] if self.cache is not None else []) + (stages or [])
+
+        # Redundant values are suppressed before any other processing
+        if dedup is True:
+            dedup = Deduplicator()
+        self.dedup = dedup if isinstance(dedup, Deduplicator) else None
+        if self.dedup is not None:
+            self._stages.insert(1 if self.cache is not None else 0, self.dedup)
+
+        # Any update refreshes the path, even if it is suppressed afterwards
+        if staleness is not None and not isinstance(staleness, StalenessMonitor):
+            staleness = StalenessMonitor(factor=staleness)
+        self.staleness = staleness
+        if self.staleness is not None:
+            if self.staleness.callback is None:
+                self.staleness.callback = self._deliver
+            self._track_subscribed_paths(request)
+            self._stages.insert(0, self.staleness)
+
+        # Callbacks see the updates the same way, as they are returned by next()
+        self.dispatcher = PathDispatcher()
+        self._stages.append(self.dispatcher)
+        self._queue_updates = queue_updates
+
+        # Table of aliases in use, which maps alias (e.g., "#42") to the path. Client-defined
+        # aliases are known upfront, target-defined ones are learned from the notifications.
+        self._alias_request = alias_request
+        self._client_aliases = {}
+        if alias_request is not None:
+            for ae in alias_request.aliases.alias:
+                self._client_aliases[ae.alias] = gnmi_path_degenerator(ae.path) or ""
+        self.aliases = dict(self._client_aliases)
+
+        # Add the handling corner case for ONCE telemtry
+        self._once = once
+        self._once_end = False
+
+        self._reconnect = reconnect
+        self._reconnect_backoff = reconnect_backoff
+        self._max_reconnects = max_reconnects
+        self._closed = threading.Event()
+        self.stats = {
+            "reconnects": 0,
+            "last_gap": None,
+            "max_gap": 0.0,
+            "total_gap": 0.0,
+            "last_error": None,
+        }
 
         # Initialize error attribute to None. Used to catch errors in _subscribe_thread.
         self.error = None
+        self._termination_error = None
+        self._call = None
+
+        # Channel may be replaced by the client, when it recovers the connection to the target
+        self._channel = channel
+
+        def receive_updates():
+            broken_at = None
+            reason = None
+            attempt = 0
+
+            while not self._closed.is_set():
+                error = None
+                channel = self._channel
+                try:
+                    if self._output == "raw":
+                        # Responses are passed as they are received, without deserialization
+                        subscribe = channel.stream_stream(
+                            "/gnmi.gNMI/Subscribe",
+                            request_serializer=SubscribeRequest.SerializeToString,
+                            response_deserializer=None,
+                        )
+                    else:
+                        subscribe = gNMIStub(channel).Subscribe
+
+                    self._call = subscribe(
+                        self._create_client_stream(request),
+                        metadata=metadata,
+                        wait_for_ready=wait_for_ready,
+                        compression=compression,
+                    )
+
+                    # The subscription may be closed before the call is created
+                    if self._closed.is_set():
+                        self._call.cancel()
+
+                    for update in self._call:
+                        if broken_at is not None:
+                            self._resync(broken_at, attempt, reason)
+                            broken_at = None
+                            attempt = 0
+
+                        self._process_update(update)
+
+                except Exception as err:
+                    error = err
+                    self.error = error
+
+                # The call on the replaced channel is re-issued on the new one
+                if channel is not self._channel and not self._closed.is_set():
+                    continue
+
+                if self._is_reconnect_needed(error, attempt):
+                    if isinstance(error, grpc.RpcError) and hasattr(error, "details"):
+                        self.stats["last_error"] = error.details()
+                    else:
+                        self.stats["last_error"] = str(error) if error else "stream ended"
+
+                    if broken_at is None:
+                        broken_at = time.monotonic()
+                        reason = self.stats["last_error"]
+                        logger.warning(f"Subscription stream is terminated ({reason}), reconnecting...")
+
+                    attempt += 1
+
+                    # Stop the request iterator of the broken stream
+                    self._msgs.put("STOP")
+                    self._msgs = queue.Queue()
+
+                    self._closed.wait(self._get_reconnect_delay(attempt))
+                    continue
+
+                if error is not None:
+                    # The connection was terminated by the server. This is generally okay and
+                    # shouldn't raise an exception.
+                    if isinstance(error, grpc._channel._MultiThreadedRendezvous) and error.code() == grpc.StatusCode.CANCELLED:
+                        return
+
+                    self._termination_error = error
+                    raise error
+
+                return
 
         def enqueue_updates():
             try:
-                stub = gNMIStub(channel)
-                subscription = stub.Subscribe(_client_stream, metadata=metadata)
-                for update in subscription:
-                    self._updates.put(update)
-            except Exception as error:
-                self.error = error
-                
-                # The connection was terminated by the server. This is generally okay and
-                # shouldn't raise an exception.
-                if isinstance(error, grpc._channel._MultiThreadedRendezvous) and error.code() == grpc.StatusCode.CANCELLED:
-                    return
-                
-                raise error
+                receive_updates()
+
+            finally:
+                # Wake up the consumers waiting for the updates
+                self._updates.put(_SUBSCRIPTION_END)
 
+        # start the subscription in a separate thread
         self._subscribe_thread = threading.Thread(target=enqueue_updates)
         self._subscribe_thread.start()
 
-        # Add the handling corner case for ONCE telemtry
-        self._once = once
-        self._once_end = False
+    def _track_subscribed_paths(self, request):
+        """Start monitoring of the paths, which are expected to be updated periodically"""
+        if request.subscribe.mode != SubscriptionList.Mode.Value("STREAM"):
+            return
+
+        prefix = gnmi_path_degenerator(request.subscribe.prefix) if request.subscribe.HasField("prefix") else ""
+        for subscription in request.subscribe.subscription:
+            if subscription.heartbeat_interval:
+                interval = subscription.heartbeat_interval
+            elif subscription.mode == SubscriptionMode.Value("SAMPLE"):
+                interval = subscription.sample_interval
+            else:
+                interval = 0
+
+            if interval:
+                path = gnmi_path_degenerator(subscription.path) if subscription.HasField("path") else ""
+                self.staleness.track(join_xpath(prefix, path), interval / 1e9)
+
+            else:
+                logger.info("Subscription without heartbeat_interval or sample_interval is not monitored")
 
     def _create_client_stream(self, request):
         """Iterator that yields the request, then poll messages when requested.
 
         This iterator is consumed by grpc. Returning from this
         iterator will cancel the RPC (grpc will send_close_from_client).
+
+        The iterator is bound to the current queue of messages, so the
+        iterator of the broken stream doesn't intercept the messages of
+        the new one after reconnect.
         """
 
-        def client_stream(request):
+        def client_stream(request, msgs):
             yield request
+            if self._alias_request is not None:
+                yield self._alias_request
             while True:
-                msg = self._msgs.get(block=True)
+                msg = msgs.get(block=True)
                 if msg == "POLL":
                     yield SubscribeRequest(poll=Poll())
                 elif msg == "STOP":
                     return
 
-        return client_stream(request)
+        return client_stream(request, self._msgs)
+
+    def _is_reconnect_needed(self, error, attempt: int) -> bool:
+        """Decide if the terminated stream shall be re-established"""
+        if not self._reconnect or self._closed.is_set():
+            return False
+
+        # Once subscription ends by design
+        if error is None and self._once:
+            return False
+
+        if isinstance(error, grpc.RpcError) and error.code() in _NON_RETRYABLE_CODES:
+            logger.error(f"Subscription stream is terminated and won't be re-established: {error}")
+            return False
+
+        if self._max_reconnects is not None and attempt >= self._max_reconnects:
+            logger.error(f"Subscription stream is not re-established after {attempt} attempts")
+            return False
+
+        return True
+
+    def _get_reconnect_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter"""
+        initial_delay, max_delay = self._reconnect_backoff
+
+        return min(max_delay, initial_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    def _resync(self, broken_at: float, attempt: int, reason: str):
+        """Account the re-established stream and mark the resync boundary for the consumers"""
+        gap = time.monotonic() - broken_at
+
+        self.stats["reconnects"] += 1
+        self.stats["last_gap"] = gap
+        self.stats["max_gap"] = max(self.stats["max_gap"], gap)
+        self.stats["total_gap"] += gap
+        logger.warning(f"Subscription stream is re-established after {gap:.3f}s and {attempt} attempt(s)")
+
+        # Target-defined aliases don't survive the stream
+        self.aliases.clear()
+        self.aliases.update(self._client_aliases)
+
+        # Compact and raw outputs contain only the records or bytes, stats report the reconnect for them
+        if self._output == "dict":
+            self._enqueue_update(
+                {"resync": {"reconnects": self.stats["reconnects"], "gap": gap, "reason": reason}}
+            )
+
+    def _process_update(self, update):
+        """Decode the SubscribeResponse, pass it through the stages and enqueue it"""
+        if self._output == "raw":
+            self._deliver(update)
+            return
+
+        if self._output != "dict":
+            parsed_update = telemetryRecordParser(update, aliases=self.aliases, batch=self._output == "batch")
+
+            if parsed_update is None or not isinstance(parsed_update, dict):
+                self._deliver(parsed_update)
+                return
+
+        else:
+            parsed_update = telemetryParser(update, aliases=self.aliases)
+
+        if parsed_update is None:
+            self._updates.put(parsed_update)
+
+        else:
+            self._enqueue_update(parsed_update)
+
+    def _enqueue_update(self, parsed_update: dict, first_stage: int = 0):
+        for stage_index in range(first_stage, len(self._stages)):
+            parsed_update = self._stages[stage_index](parsed_update)
+
+            if parsed_update is None:
+                return
+
+            # Stage may split the update or emit additional ones
+            if isinstance(parsed_update, list):
+                for emitted_update in parsed_update:
+                    self._enqueue_update(emitted_update, stage_index + 1)
+
+                return
+
+        self._deliver(parsed_update)
+
+    def _deliver(self, parsed_update: dict):
+        if self._queue_updates:
+            self._updates.put(parsed_update)
+
+    def on(self, pattern: str, callback) -> None:
+        """Register the callback for the updates of the paths matching the pattern.
+
+        The pattern may contain wildcards "*", "..." and "[key=*]". The callback
+        is called with the dictionary {"path", "val", "timestamp", "op"} per leaf.
+        """
+        if self._output != "dict":
+            raise gNMIException("Callbacks can be used only with the 'dict' output format.")
+
+        self.dispatcher.on(pattern, callback)
+
+    def off(self, pattern: str, callback=None) -> None:
+        """Remove the callback (or all the callbacks) registered for the pattern"""
+        self.dispatcher.off(pattern, callback)
 
     def _get_one_update(self, timeout=None):
-        return telemetryParser(self._updates.get(block=True, timeout=timeout))
+        try:
+            return self._held_updates.popleft()
+
+        except IndexError:
+            pass
+
+        update = self._updates.get(block=True, timeout=timeout)
+
+        if update is _SUBSCRIPTION_END:
+            # Keep the marker for the other consumers and the further calls
+            self._updates.put(update)
+
+            error = self._termination_error
+            if error is not None:
+                reason = error.details() if isinstance(error, grpc.RpcError) and hasattr(error, "details") else error
+                raise gNMIException(f"Subscription is terminated: {reason}", error)
+
+            raise StopIteration
+
+        return update
 
     def _get_updates_till_sync(self, timeout=None):
         """Read updates from streaming subscriptions, until sync_response
 
         Successive updates are coalesced together by merging the update/delete
         lists. Scalar values (timestamp etc.) are set to that of the last
-        update.
+        update. Other events (e.g., {"stale": ...} or {"resync": ...}) are not
+        merged, and are returned by the next calls after the coalesced update.
         """
         resp = {"update": {}}
-        while not "sync_response" in resp:
-            new_resp = self._get_one_update(timeout=timeout)
-            self._merge_updates(resp, new_resp)
+        events = []
+        try:
+            while not "sync_response" in resp:
+                new_resp = self._get_one_update(timeout=timeout)
+
+                if isinstance(new_resp, dict) and "update" not in new_resp and "sync_response" not in new_resp:
+                    events.append(new_resp)
+                else:
+                    self._merge_updates(resp, new_resp)
+
+        finally:
+            self._held_updates.extend(events)
+
         return resp
 
     def _merge_updates(self, resp, new_resp):
         if "update" in new_resp:
-            for key in new_resp["update"]:
-                if key.upper() in UpdateResult.Operation.keys():
-                    if key not in resp["update"]:
-                        resp["update"][key] = []
-                    resp["update"][key] += new_resp["update"][key]
+            for key, value in new_resp["update"].items():
+                if key in _UPDATE_OPERATIONS:
+                    resp["update"].setdefault(key, []).extend(value)
                 else:
-                    resp["update"][key] = new_resp["update"][key]
+                    resp["update"][key] = value
         if "sync_response" in new_resp:
             resp["sync_response"] = new_resp["sync_response"]
 
@@ -1208,11 +2275,17 @@ class _Subscriber:
         result = self.next()
 
         # Add handling of Once - 1
-        if self._once and "sync_response" in result:
+        if self._once and self._is_sync_response(result):
             self._once_end = True
 
         return result
 
+    def _is_sync_response(self, result) -> bool:
+        if isinstance(result, bytes):
+            return peek_subscribe_response(result).get("sync_response", False)
+
+        return isinstance(result, dict) and "sync_response" in result
+
     def next(self):
         """Get the next update from the target.
 
@@ -1240,16 +2313,35 @@ class _Subscriber:
         """Return True if there are updates from the target that have not yet been
         received.
         """
-        return not self._updates.empty()
+        return bool(self._held_updates) or not self._updates.empty()
 
-    def close(self):
+    def close(self, timeout: float = None):
         """Close the subscription.
 
         This cancels only that SubscribeRequest RPC, but keeps the
-        client session alive.
+        client session alive. The consumers blocked in next() get StopIteration,
+        and the call returns once the thread of the subscription is finished
+        (or after timeout seconds, if provided).
         """
+        self._cancel()
+        self._join(timeout)
+
+    def _cancel(self):
+        """Cancel the RPC without waiting for the thread of the subscription"""
+        self._closed.set()
         self._msgs.put("STOP")
-        self._subscribe_thread.join(1)
+
+        call = self._call
+        if call is not None:
+            call.cancel()
+
+        if self.staleness is not None:
+            self.staleness.close()
+
+    def _join(self, timeout: float = None):
+        # close() may be called from the callback running in the thread of the subscription
+        if self._subscribe_thread is not threading.current_thread():
+            self._subscribe_thread.join(timeout)
 
 
 class StreamSubscriber(_Subscriber):
@@ -1261,14 +2353,36 @@ class StreamSubscriber(_Subscriber):
     from the target as they arrive. If there has been no update from the
     target yet, next() will block.
 
+    With incremental_sync set, the initial synchronisation is not coalesced:
+    its updates are returned as they arrive with the key "sync_phase" set to
+    True, followed by the {"sync_response": True} marker. That keeps the memory
+    bounded for the large subscriptions and lets the processing start before
+    the target completes the synchronisation. The initial synchronisation after
+    the reconnect is tagged the same way.
+
     """
 
-    def __init__(self, *args):
+    def __init__(self, *args, incremental_sync: bool = False, **kwargs):
         self._first_update_seen = False
-        super().__init__(*args)
+        self._incremental_sync = incremental_sync
+        self._is_sync_phase = incremental_sync
+        super().__init__(*args, **kwargs)
+
+    def _deliver(self, parsed_update: dict):
+        if self._incremental_sync and isinstance(parsed_update, dict):
+            if "resync" in parsed_update:
+                self._is_sync_phase = True
+
+            elif "sync_response" in parsed_update:
+                self._is_sync_phase = False
+
+            elif self._is_sync_phase and "update" in parsed_update:
+                parsed_update["sync_phase"] = True
+
+        super()._deliver(parsed_update)
 
     def _next_update(self, timeout):
-        if not self._first_update_seen:
+        if not self._first_update_seen and not self._incremental_sync and self._output == "dict":
             self._first_update_seen = True
             return self._get_updates_till_sync(timeout=timeout)
         else:
@@ -1289,9 +2403,9 @@ class OnceSubscriber(_Subscriber):
 
     """
 
-    def __init__(self, *args):
+    def __init__(self, *args, **kwargs):
         args = args + (True,)
-        super().__init__(*args)
+        super().__init__(*args, **kwargs)
 
     def _next_update(self, timeout):
         return self._get_one_update(timeout=timeout)
@@ -1305,12 +2419,55 @@ class PollSubscriber(_Subscriber):
     a message with the sync_response field is seen, then the update is
     returned.
 
+    Alternatively, the subscription can be added to PollScheduler, which sends
+    the Poll messages on a fixed cadence and delivers the coalesced snapshots
+    to a callback or queue instead.
+
     """
 
+    def __init__(self, *args, **kwargs):
+        if kwargs.get("output", "dict") != "dict":
+            raise ValueError("POLL subscription supports only the 'dict' output format.")
+
+        self._snapshot_handler = None
+        self._snapshot = None
+        super().__init__(*args, **kwargs)
+
     def _next_update(self, timeout):
+        if self._snapshot_handler is not None:
+            raise gNMIException("Subscription is driven by PollScheduler and can't be polled directly.")
+
         self._msgs.put("POLL")
         return self._get_updates_till_sync(timeout=timeout)
 
+    def poll(self):
+        """Send the Poll message to the target without waiting for the response"""
+        self._msgs.put("POLL")
+
+    def _set_snapshot_handler(self, handler=None):
+        """Deliver the coalesced snapshots to handler(snapshot) rather than to the queue of updates"""
+        self._snapshot = None
+        self._snapshot_handler = handler
+
+    def _deliver(self, parsed_update: dict):
+        handler = self._snapshot_handler
+        if handler is None:
+            return super()._deliver(parsed_update)
+
+        # Snapshot being collected is incomplete after reconnect
+        if "resync" in parsed_update:
+            self._snapshot = None
+            handler(parsed_update)
+            return
+
+        if self._snapshot is None:
+            self._snapshot = {"update": {}}
+        self._merge_updates(self._snapshot, parsed_update)
+
+        if "sync_response" in self._snapshot:
+            snapshot, self._snapshot = self._snapshot, None
+            handler(snapshot)
+
 
 class gNMIException(Exception):
     """Raised when a generic error in pygnmi occurred
@@ -1327,9 +2484,13 @@ class gNMIException(Exception):
 
 
 # User-defined functions
-def telemetryParser(in_message=None, debug: bool = False):
+def telemetryParser(in_message=None, debug: bool = False, aliases: dict = None):
     """
     The telemetry parser is method used to covert the Protobuf message
+
+    aliases: optional table mapping aliases (e.g., "#42") to paths. If provided, aliases
+    used in place of the prefix are resolved to the paths, and target-defined aliases
+    announced in the notifications are added to (or removed from) the table.
     """
     debug_gnmi_msg(debug, in_message, "gNMI response")
 
@@ -1341,24 +2502,16 @@ def telemetryParser(in_message=None, debug: bool = False):
             (
                 response["update"].update({"timestamp": in_message.update.timestamp})
                 if in_message.update.timestamp
-                else in_message.update({"timestamp": 0})
+                else response["update"].update({"timestamp": 0})
             )
 
-            if in_message.update.HasField("prefix"):
-                resource_prefix = []
-                for prefix_elem in in_message.update.prefix.elem:
-                    tp = ""
-                    if prefix_elem.name:
-                        tp += prefix_elem.name
-
-                    if prefix_elem.key:
-                        # Use 'sorted' to have a consistent ordering of keys
-                        for pk_name, pk_value in sorted(prefix_elem.key.items()):
-                            tp += f"[{pk_name}={pk_value}]"
-
-                    resource_prefix.append(tp)
+            prefix = _decode_prefix(in_message.update, aliases)
+            if prefix is not None:
+                response["update"].update({"prefix": prefix})
 
-                response["update"].update({"prefix": "/".join(resource_prefix)})
+            # Target-defined alias for the prefix
+            if in_message.update.alias:
+                response["update"].update({"alias": in_message.update.alias})
 
             for update_msg in in_message.update.update:
                 update_container = {}
@@ -1370,103 +2523,182 @@ def telemetryParser(in_message=None, debug: bool = False):
                     else update_container.update({"path": None})
                 )
 
-                if update_msg.val:
-                    if update_msg.val.HasField("json_ietf_val"):
-                        update_container.update({"val": json.loads(update_msg.val.json_ietf_val)})
+                if update_msg.val and update_msg.val.WhichOneof("value"):
+                    update_container.update({"val": _decode_typed_value(update_msg.val)})
 
-                    elif update_msg.val.HasField("json_val"):
-                        update_container.update({"val": json.loads(update_msg.val.json_val)})
+                response["update"]["update"].append(update_container)
 
-                    elif update_msg.val.HasField("string_val"):
-                        update_container.update({"val": update_msg.val.string_val})
+            if in_message.update.delete:
+                response["update"]["delete"] = []
+                for delete_msg in in_message.update.delete:
+                    response["update"]["delete"].append({"path": _decode_path(delete_msg)})
 
-                    elif update_msg.val.HasField("int_val"):
-                        update_container.update({"val": update_msg.val.int_val})
+            return response
 
-                    elif update_msg.val.HasField("uint_val"):
-                        update_container.update({"val": update_msg.val.uint_val})
+        elif in_message.HasField("sync_response"):
+            response["sync_response"] = in_message.sync_response
 
-                    elif update_msg.val.HasField("bool_val"):
-                        update_container.update({"val": update_msg.val.bool_val})
+            return response
 
-                    elif update_msg.val.HasField("float_val"):
-                        update_container.update({"val": update_msg.val.float_val})
+    except Exception as exc:
+        logger.error(f"Parsing of telemetry information is failed: {exc}")
 
-                    elif update_msg.val.HasField("double_val"):
-                        update_container.update({"val": update_msg.val.double_val})
+        return None
 
-                    elif update_msg.val.HasField("decimal_val"):
-                        update_container.update({"val": update_msg.val.decimal_val})
 
-                    elif update_msg.val.HasField("any_val"):
-                        update_container.update({"val": update_msg.val.any_val})
+def telemetryRecordParser(in_message=None, debug: bool = False, aliases: dict = None, batch: bool = False):
+    """
+    The alternative to telemetryParser(), which converts the notification into the tuple of UpdateRecord
+    (deletes first), or into UpdateBatch if batch is set. The sync_response is returned as by telemetryParser().
 
-                    elif update_msg.val.HasField("ascii_val"):
-                        update_container.update({"val": update_msg.val.ascii_val})
+    aliases: optional table of aliases, the same as for telemetryParser()
+    """
+    debug_gnmi_msg(debug, in_message, "gNMI response")
 
-                    elif update_msg.val.HasField("proto_bytes"):
-                        update_container.update({"val": update_msg.val.proto_bytes})
+    try:
+        if in_message.HasField("update"):
+            notification = in_message.update
+            timestamp = notification.timestamp
+            prefix = _decode_prefix(notification, aliases)
+
+            deletes = [_decode_path(delete_msg) for delete_msg in notification.delete]
+            paths = []
+            values = []
+            for update_msg in notification.update:
+                paths.append(gnmi_path_degenerator(update_msg.path) if update_msg.path else None)
+                values.append(_decode_typed_value(update_msg.val) if update_msg.val.WhichOneof("value") else None)
+
+            if batch:
+                return UpdateBatch(timestamp, prefix, tuple(paths), tuple(values), tuple(deletes))
+
+            # tuple.__new__() skips the keyword handling of the namedtuple constructor
+            records = [tuple.__new__(UpdateRecord, (timestamp, prefix, path, None, "delete")) for path in deletes]
+            records.extend(
+                tuple.__new__(UpdateRecord, (timestamp, prefix, path, value, "update"))
+                for path, value in zip(paths, values)
+            )
 
-                    elif update_msg.val.HasField("bytes_val"):
-                        val_binary = "".join(format(byte, "08b") for byte in update_msg.val.bytes_val)
-                        val_decimal = struct.unpack("f", struct.pack("I", int(val_binary, 2)))[0]
-                        update_container.update({"val": val_decimal})
+            return tuple(records)
 
-                    elif update_msg.val.HasField("leaflist_val"):
-                        val_leaflist = update_msg.val
-                        element_val = None
-                        if all([isinstance(e, TypedValue) for e in val_leaflist.leaflist_val.element]):
-                            element_val = {}
-                            for e in val_leaflist.leaflist_val.element:
-                                if hasattr(e, "json_val"):
-                                    element_val.update(json.loads(e.json_val))
-                                elif hasattr(e, "json_ietf_val"):
-                                    element_val.update(json.loads(e.json_ietf_val))
-                                else:
-                                    raise TypeError(f"Neither json_val nor json_ietf_val found in element {e}.")
-                        elif all([isinstance(e, str) for e in val_leaflist.leaflist_val.element]):
-                            element_val = ""
-                            for e in val_leaflist.leaflist_val.element:
-                                element_val += e
-                        else:
-                            raise Exception("leaflist elements have differing types. Only str and TypedValue are supported.")
+        elif in_message.HasField("sync_response"):
+            return {"sync_response": in_message.sync_response}
 
-                        update_container.update({"val": element_val})
+    except Exception as exc:
+        logger.error(f"Parsing of telemetry information is failed: {exc}")
 
-                response["update"]["update"].append(update_container)
+        return None
 
-            if in_message.update.delete:
-                response["update"]["delete"] = []
-                for delete_msg in in_message.update.delete:
-                    delete_container = {}
-                    resource_path = []
 
-                    for path_elem in delete_msg.elem:
-                        tp = ""
-                        if path_elem.name:
-                            tp += path_elem.name
+def _decode_path(path) -> str:
+    """Converts the gNMI Path into XPath, keeping the empty path as the empty string"""
+    return "/".join(_decode_path_elements(path))
 
-                        if path_elem.key:
-                            # Use 'sorted' to have a consistent ordering of keys
-                            for pk_name, pk_value in sorted(path_elem.key.items()):
-                                tp += f"[{pk_name}={pk_value}]"
 
-                        resource_path.append(tp)
+def _decode_path_elements(path) -> list:
+    resource_path = []
+    for path_elem in path.elem:
+        tp = ""
+        if path_elem.name:
+            tp += path_elem.name
 
-                    delete_container.update({"path": "/".join(resource_path)})
-                    response["update"]["delete"].append(delete_container)
+        if path_elem.key:
+            # Use 'sorted' to have a consistent ordering of keys
+            for pk_name, pk_value in sorted(path_elem.key.items()):
+                tp += f"[{pk_name}={pk_value}]"
 
-            return response
+        resource_path.append(tp)
 
-        elif in_message.HasField("sync_response"):
-            response["sync_response"] = in_message.sync_response
+    return resource_path
 
-            return response
 
-    except Exception as exc:
-        logger.error(f"Parsing of telemetry information is failed: {exc}")
+def _decode_prefix(notification, aliases: dict = None) -> str:
+    """Returns the prefix of the notification (None if there is no prefix) with the alias resolved.
+    The target-defined alias announced in the notification is added to (or removed from) the table."""
+    prefix = None
 
-        return None
+    if notification.HasField("prefix"):
+        resource_prefix = _decode_path_elements(notification.prefix)
+
+        # The alias is sent as the first element of the prefix
+        if aliases and resource_prefix and resource_prefix[0] in aliases:
+            resource_prefix = [aliases[resource_prefix[0]]] + resource_prefix[1:]
+            resource_prefix = list(filter(None, resource_prefix))
+
+        prefix = "/".join(resource_prefix)
+
+    # Empty prefix removes the alias
+    if notification.alias and aliases is not None:
+        if prefix:
+            aliases[notification.alias] = prefix
+        else:
+            aliases.pop(notification.alias, None)
+
+    return prefix
+
+
+def _decode_typed_value(typed_value) -> Any:
+    """Converts the TypedValue into Python value"""
+    if typed_value.HasField("json_ietf_val"):
+        return json.loads(typed_value.json_ietf_val)
+
+    elif typed_value.HasField("json_val"):
+        return json.loads(typed_value.json_val)
+
+    elif typed_value.HasField("string_val"):
+        return typed_value.string_val
+
+    elif typed_value.HasField("int_val"):
+        return typed_value.int_val
+
+    elif typed_value.HasField("uint_val"):
+        return typed_value.uint_val
+
+    elif typed_value.HasField("bool_val"):
+        return typed_value.bool_val
+
+    elif typed_value.HasField("float_val"):
+        return typed_value.float_val
+
+    elif typed_value.HasField("double_val"):
+        return typed_value.double_val
+
+    elif typed_value.HasField("decimal_val"):
+        return typed_value.decimal_val
+
+    elif typed_value.HasField("any_val"):
+        return typed_value.any_val
+
+    elif typed_value.HasField("ascii_val"):
+        return typed_value.ascii_val
+
+    elif typed_value.HasField("proto_bytes"):
+        return typed_value.proto_bytes
+
+    elif typed_value.HasField("bytes_val"):
+        val_binary = "".join(format(byte, "08b") for byte in typed_value.bytes_val)
+        return struct.unpack("f", struct.pack("I", int(val_binary, 2)))[0]
+
+    elif typed_value.HasField("leaflist_val"):
+        element_val = None
+        if all([isinstance(e, TypedValue) for e in typed_value.leaflist_val.element]):
+            element_val = {}
+            for e in typed_value.leaflist_val.element:
+                if hasattr(e, "json_val"):
+                    element_val.update(json.loads(e.json_val))
+                elif hasattr(e, "json_ietf_val"):
+                    element_val.update(json.loads(e.json_ietf_val))
+                else:
+                    raise TypeError(f"Neither json_val nor json_ietf_val found in element {e}.")
+        elif all([isinstance(e, str) for e in typed_value.leaflist_val.element]):
+            element_val = ""
+            for e in typed_value.leaflist_val.element:
+                element_val += e
+        else:
+            raise Exception("leaflist elements have differing types. Only str and TypedValue are supported.")
+
+        return element_val
+
+    return None
 
 
 def debug_gnmi_msg(is_printable: bool, what_to_print: str, message_name: str) -> None:
@@ -0,0 +1,402 @@
+"""This module contains the telemetry collector sharding the targets across the worker processes
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import copy
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import threading
+import time
+
+
+# Own modules
+from pygnmi.client import gNMIclient
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Statics
+_STOP = "stop"
+_ADD = "add"
+_MAX_RETRY_DELAY = 60.0
+
+
+# Classes
+class TelemetryCollector(object):
+    """
+    Collects the streaming telemetry from many targets in the pool of worker processes, so decoding
+    of the updates (telemetryParser, JSON) isn't limited by the GIL of one process.
+
+    targets: list of tuples (host, port), or dictionaries with the arguments of gNMIclient
+      for the individual targets (including "target")
+    subscribe: subscription request, the same for all the targets (see subscribe_stream())
+    workers: number of the worker processes, the number of CPUs by default
+    batch_size: maximum number of the updates sent by the worker to the collector at once
+    flush_interval: maximum delay of the updates in the worker in seconds
+    stats_interval: interval of the statistics reported by the workers in seconds
+    max_restarts: number of times the died worker is restarted, before its targets are
+      distributed across the remaining workers
+    retry_delay: delay before subscribing again to the target, which the worker failed to subscribe to
+      (e.g., it was unreachable on start), in seconds; it doubles with each attempt up to a minute
+    subscribe_kwargs: arguments of subscribe_stream(), e.g. {"dedup": True}
+    kwargs: arguments of gNMIclient common for all the targets (e.g., username, password, insecure)
+
+    Each worker subscribes to its targets concurrently in the background, retrying the targets failed
+    to subscribe to, connects to them lazily and re-establishes the broken subscriptions.
+    The updates are decoded in the workers and returned by updates() as tuples (target, update)
+    in the order they arrive from the workers. The workers are started with "spawn", so the script
+    using the collector must be guarded by if __name__ == "__main__".
+    """
+
+    def __init__(
+        self,
+        targets: list,
+        subscribe: dict,
+        workers: int = None,
+        batch_size: int = 500,
+        flush_interval: float = 0.1,
+        stats_interval: float = 1.0,
+        max_restarts: int = 3,
+        retry_delay: float = 1.0,
+        subscribe_kwargs: dict = None,
+        **kwargs,
+    ):
+        self.subscribe = subscribe
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats_interval = stats_interval
+        self.max_restarts = max_restarts
+        self.retry_delay = retry_delay
+        self.subscribe_kwargs = subscribe_kwargs or {}
+
+        self._arguments = {}
+        for target in targets:
+            arguments = dict(kwargs, **target) if isinstance(target, dict) else dict(kwargs, target=target)
+            self._arguments[tuple(arguments["target"])] = arguments
+
+        self._context = multiprocessing.get_context("spawn")
+        self._updates = queue.Queue()
+        self._processes = {}
+        self._controls = {}
+        self._pipes = {}
+        self._shards = {}
+        self._stats = {}
+        self._closed = threading.Event()
+        self._stopping = threading.Event()
+        self._monitor_thread = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def start(self):
+        """Starts the workers with the targets sharded across them"""
+        self._closed.clear()
+        self._stopping.clear()
+
+        for worker_id in range(self.workers):
+            self._shards[worker_id] = []
+            self._stats[worker_id] = {
+                "pid": None,
+                "alive": False,
+                "restarts": 0,
+                "targets": 0,
+                "updates": 0,
+                "updates_per_second": 0.0,
+                "errors": 0,
+                "last_report": None,
+            }
+
+        for index, target in enumerate(sorted(self._arguments)):
+            self._shards[index % self.workers].append(target)
+
+        for worker_id in self._shards:
+            self._start_worker(worker_id)
+
+        self._monitor_thread = threading.Thread(target=self._monitor, name="pygnmi-collector", daemon=True)
+        self._monitor_thread.start()
+
+        return self
+
+    def updates(self, timeout: float = None):
+        """Yields the tuples (target, update) until the collector is closed, or for timeout seconds"""
+        until = time.monotonic() + timeout if timeout is not None else None
+
+        while not self._closed.is_set():
+            wait = 0.5 if until is None else min(0.5, until - time.monotonic())
+            if wait <= 0:
+                return
+
+            try:
+                yield self._updates.get(timeout=wait)
+
+            except queue.Empty:
+                continue
+
+    def stats(self) -> dict:
+        """
+        Returns the statistics per worker: pid, state, restarts, number of targets, errors of subscription,
+        updates since the worker (re)started and their rate over the last stats_interval
+        """
+        with self._lock:
+            return {worker_id: dict(stats) for worker_id, stats in self._stats.items()}
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stops the workers"""
+        self._stopping.set()
+
+        for control in self._controls.values():
+            control.put((_STOP,))
+
+        # The monitor keeps reading the pipes, while the workers send the last updates
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+        self._closed.set()
+
+        if self._monitor_thread is not None:
+            self._monitor_thread.join(timeout)
+
+    def _start_worker(self, worker_id: int) -> None:
+        # The pipe per worker: the worker killed while sending doesn't hold the lock shared with the others
+        receiver, sender = self._context.Pipe(duplex=False)
+        control = self._context.Queue()
+        process = self._context.Process(
+            target=_run_worker,
+            args=(
+                worker_id,
+                [self._arguments[target] for target in self._shards[worker_id]],
+                self.subscribe,
+                self.subscribe_kwargs,
+                sender,
+                control,
+                self.batch_size,
+                self.flush_interval,
+                self.stats_interval,
+                self.retry_delay,
+            ),
+            name=f"pygnmi-collector-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+
+        self._processes[worker_id] = process
+        self._controls[worker_id] = control
+        self._pipes[worker_id] = receiver
+
+        with self._lock:
+            self._stats[worker_id].update({"pid": process.pid, "alive": True, "targets": len(self._shards[worker_id])})
+
+    def _monitor(self) -> None:
+        """Moves the updates from the workers to updates(), collects the statistics and restarts the workers"""
+        while not self._closed.is_set():
+            pipes = {pipe: worker_id for worker_id, pipe in self._pipes.items()}
+
+            for pipe in multiprocessing.connection.wait(list(pipes), timeout=0.5):
+                try:
+                    kind, payload = pipe.recv()
+
+                except (EOFError, OSError):
+                    # The worker exited, it is handled by _check_workers()
+                    del self._pipes[pipes[pipe]]
+                    pipe.close()
+                    continue
+
+                if kind == "updates":
+                    for entry in payload:
+                        self._updates.put(entry)
+
+                elif kind == "stats":
+                    with self._lock:
+                        self._stats[pipes[pipe]].update(payload, last_report=time.time())
+
+            self._check_workers()
+
+    def _check_workers(self) -> None:
+        for worker_id, process in list(self._processes.items()):
+            if process.is_alive() or self._stopping.is_set() or not self._stats[worker_id]["alive"]:
+                continue
+
+            logger.error(f"Collector worker {worker_id} (pid {process.pid}) exited with code {process.exitcode}")
+
+            with self._lock:
+                self._stats[worker_id].update(alive=False, updates_per_second=0.0)
+
+            if self._stats[worker_id]["restarts"] < self.max_restarts:
+                with self._lock:
+                    self._stats[worker_id]["restarts"] += 1
+
+                self._start_worker(worker_id)
+
+            else:
+                self._rebalance(worker_id)
+
+    def _rebalance(self, dead_worker_id: int) -> None:
+        """Distributes the targets of the dead worker to the least loaded alive workers"""
+        targets, self._shards[dead_worker_id] = self._shards[dead_worker_id], []
+        alive = [worker_id for worker_id, stats in self._stats.items() if stats["alive"]]
+
+        if not alive:
+            logger.critical("All collector workers exited, the telemetry isn't collected")
+            return
+
+        moved = {worker_id: [] for worker_id in alive}
+        for target in targets:
+            worker_id = min(alive, key=lambda worker_id: len(self._shards[worker_id]))
+            self._shards[worker_id].append(target)
+            moved[worker_id].append(self._arguments[target])
+
+        with self._lock:
+            self._stats[dead_worker_id]["targets"] = 0
+            for worker_id, arguments in moved.items():
+                self._stats[worker_id]["targets"] = len(self._shards[worker_id])
+
+        for worker_id, arguments in moved.items():
+            if arguments:
+                self._controls[worker_id].put((_ADD, arguments))
+
+        logger.warning(f"Targets of collector worker {dead_worker_id} are moved to workers {sorted(moved)}")
+
+
+# User-defined functions
+def _run_worker(
+    worker_id: int,
+    targets: list,
+    subscribe: dict,
+    subscribe_kwargs: dict,
+    pipe,
+    control,
+    batch_size: int,
+    flush_interval: float,
+    stats_interval: float,
+    retry_delay: float,
+) -> None:
+    """Body of the worker process: subscribes to the targets and sends the decoded updates in batches"""
+    batch = []
+    batch_lock = threading.Lock()
+    pipe_lock = threading.Lock()
+    clients = []
+    clients_lock = threading.Lock()
+    counters = {"updates": 0, "errors": 0}
+    stopped = threading.Event()
+
+    def send(kind: str, payload) -> None:
+        with pipe_lock:
+            pipe.send((kind, payload))
+
+    def flush() -> None:
+        nonlocal batch
+
+        with batch_lock:
+            entries, batch = batch, []
+
+        if entries:
+            send("updates", entries)
+
+    def collect(target: tuple, update: dict):
+        with batch_lock:
+            batch.append((target, update))
+            counters["updates"] += 1
+            is_full = len(batch) >= batch_size
+
+        if is_full:
+            flush()
+
+    def subscribe_target(arguments: dict) -> None:
+        """Subscribes to the target until it succeeds, then the subscription re-establishes itself"""
+        target = tuple(arguments["target"])
+        delay = retry_delay
+
+        while not stopped.is_set():
+            client = gNMIclient(**dict(arguments, lazy=True))
+
+            try:
+                # Negotiation of the encoding fails, while the target is unreachable
+                client.connect()
+                client.subscribe_stream(
+                    subscribe=copy.deepcopy(subscribe),
+                    stages=[lambda update, target=target: collect(target, update)],
+                    reconnect=True,
+                    queue_updates=False,
+                    **subscribe_kwargs,
+                )
+
+            except Exception as err:
+                client.close()
+                with batch_lock:
+                    counters["errors"] += 1
+                logger.error(f"Collector worker {worker_id} can't subscribe to {target}, retry in {delay}s: {err}")
+
+                stopped.wait(delay)
+                delay = min(delay * 2, _MAX_RETRY_DELAY)
+                continue
+
+            with clients_lock:
+                if not stopped.is_set():
+                    clients.append(client)
+                    return
+
+            client.close()
+            return
+
+    def add_targets(arguments_list: list) -> None:
+        # The unreachable targets don't delay the others and the commands from the collector
+        for arguments in arguments_list:
+            threading.Thread(
+                target=subscribe_target, args=(arguments,), name="pygnmi-collector-subscribe", daemon=True
+            ).start()
+
+    def report() -> None:
+        last_updates = 0
+        last_report = time.monotonic()
+
+        while not stopped.wait(min(flush_interval, stats_interval)):
+            flush()
+
+            now = time.monotonic()
+            if now - last_report >= stats_interval:
+                send(
+                    "stats",
+                    {
+                        "updates": counters["updates"],
+                        "updates_per_second": (counters["updates"] - last_updates) / (now - last_report),
+                        "errors": counters["errors"],
+                    },
+                )
+                last_updates = counters["updates"]
+                last_report = now
+
+    add_targets(targets)
+    reporter = threading.Thread(target=report, name="pygnmi-collector-report", daemon=True)
+    reporter.start()
+
+    while True:
+        command = control.get()
+
+        if command[0] == _ADD:
+            add_targets(command[1])
+
+        elif command[0] == _STOP:
+            break
+
+    stopped.set()
+    reporter.join()
+
+    with clients_lock:
+        for client in clients:
+            client.close()
+
+    flush()
+    pipe.close()
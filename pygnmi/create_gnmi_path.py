@@ -100,3 +100,78 @@ def gnmi_path_degenerator(gnmi_path) -> str:
         result = "/".join(resource_path)
 
     return result
+
+
+def split_xpath(path_in_question: str) -> list:
+    """Splits an XPath expression into the list of its elements
+
+    The keys stay attached to their element and are sorted by name, the same way
+    as gnmi_path_degenerator() renders them, so the result can be compared with
+    the paths reported in telemetry. Slashes inside the keys (e.g., "[name=1/1/c1/1]")
+    are preserved. The origin (e.g., "openconfig-interfaces:" in the first element)
+    is dropped, as gnmi_path_degenerator() doesn't report it either.
+    """
+    result = []
+
+    if not path_in_question:
+        return result
+
+    element = ""
+    depth = 0
+    for char in path_in_question:
+        if char == "[":
+            depth += 1
+        elif char == "]" and depth:
+            depth -= 1
+
+        if char == "/" and not depth:
+            if element:
+                result.append(element)
+            element = ""
+
+        else:
+            element += char
+
+    if element:
+        result.append(element)
+
+    # Drop the origin the same way as gnmi_path_generator() does
+    if result and ":" in result[0].split("[", 1)[0]:
+        parts = result[0].split(":", 1)
+
+        if parts[1]:
+            result[0] = parts[1]
+        else:
+            del result[0]
+
+    return [_normalise_xpath_element(pe_entry) for pe_entry in result]
+
+
+def join_xpath(prefix: str, path: str) -> str:
+    """Joins the prefix and the path of the update, as returned by telemetryParser(), into the full path"""
+    if prefix and path:
+        return f"{prefix}/{path}"
+
+    return prefix or path or ""
+
+
+def parse_xpath_element(element: str) -> tuple:
+    """Parses a single XPath element (e.g., "interface[name=Ethernet1]") into
+    the tuple of its name and dictionary of keys"""
+    if "[" not in element:
+        return element, {}
+
+    name = element.split("[", 1)[0]
+    keys = dict(re.findall(r"\[([^=\]]+)=([^\]]*)\]", element))
+
+    return name, keys
+
+
+def _normalise_xpath_element(element: str) -> str:
+    """Sorts the keys of the XPath element by their names"""
+    if element.count("[") < 2:
+        return element
+
+    name, keys = parse_xpath_element(element)
+
+    return name + "".join(f"[{pk_name}={pk_value}]" for pk_name, pk_value in sorted(keys.items()))
@@ -0,0 +1,118 @@
+"""This module contains the dispatcher of the telemetry updates to the callbacks
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import logging
+import time
+
+
+# Own modules
+from pygnmi.create_gnmi_path import join_xpath
+from pygnmi.path_patterns import PathPatternIndex
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Classes
+class _Handler(object):
+    """Registered callback with its statistics"""
+
+    __slots__ = ("pattern", "callback", "calls", "errors", "total_time", "max_time")
+
+    def __init__(self, pattern: str, callback):
+        self.pattern = pattern
+        self.callback = callback
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
+class PathDispatcher(object):
+    """
+    Dispatcher of the updates returned by telemetryParser() to the callbacks registered for the path patterns.
+
+    Patterns may contain wildcards "*", "..." and "[key=*]" (see PathPatternIndex), and are compiled
+    into the tree, so matching of each path costs O(depth of the path) regardless of the number
+    of registered patterns. The pattern is matched against the full path of each leaf (prefix and
+    path of the update).
+
+    Each callback is called with the dictionary {"path": ..., "val": ..., "timestamp": ..., "op": ...},
+    where op is "update" or "delete" (val is None for the latter), along with any other keys added
+    to the update by the preceding stages (e.g., "rate"). Exceptions raised by the callbacks
+    are logged and counted, but don't stop the dispatching. The object can be used as a stage of
+    the subscription, as calling it dispatches the update and returns it unchanged.
+    """
+
+    def __init__(self):
+        self._index = PathPatternIndex()
+
+    def __call__(self, update: dict) -> dict:
+        self.dispatch(update)
+
+        return update
+
+    def on(self, pattern: str, callback) -> None:
+        """Registers the callback for the paths matching the pattern"""
+        self._index.add(pattern, _Handler(pattern, callback))
+
+    def off(self, pattern: str, callback=None) -> None:
+        """Removes the callback (or all the callbacks if not provided) registered for the pattern"""
+        self._index.remove(pattern, lambda handler: callback is None or handler.callback == callback)
+
+    def dispatch(self, update: dict) -> None:
+        """Calls the callbacks matching the leaves of the update"""
+        if not len(self._index) or not update or "update" not in update:
+            return
+
+        notification = update["update"]
+        prefix = notification.get("prefix")
+        timestamp = notification.get("timestamp", 0)
+
+        for delete_entry in notification.get("delete", []):
+            self._dispatch_leaf(join_xpath(prefix, delete_entry.get("path")), delete_entry, timestamp, "delete")
+
+        for update_entry in notification.get("update", []):
+            self._dispatch_leaf(join_xpath(prefix, update_entry.get("path")), update_entry, timestamp, "update")
+
+    def match(self, path: str) -> list:
+        """Returns the list of patterns matching the path"""
+        return [handler.pattern for handler in self._index.match(path)]
+
+    def stats(self) -> list:
+        """Returns the list of statistics per registered callback"""
+        return [
+            {
+                "pattern": handler.pattern,
+                "callback": getattr(handler.callback, "__name__", repr(handler.callback)),
+                "calls": handler.calls,
+                "errors": handler.errors,
+                "total_time": handler.total_time,
+                "avg_time": handler.total_time / handler.calls if handler.calls else 0.0,
+                "max_time": handler.max_time,
+            }
+            for _, handler in self._index.items()
+        ]
+
+    def _dispatch_leaf(self, path: str, entry: dict, timestamp: int, op: str) -> None:
+        handlers = self._index.match(path)
+        if not handlers:
+            return
+
+        leaf = {**entry, "path": path, "val": entry.get("val"), "timestamp": timestamp, "op": op}
+        for handler in handlers:
+            started_at = time.perf_counter()
+            try:
+                handler.callback(leaf)
+
+            except Exception as err:
+                handler.errors += 1
+                logger.error(f"Callback for '{handler.pattern}' failed on '{path}': {err}")
+
+            elapsed = time.perf_counter() - started_at
+            handler.calls += 1
+            handler.total_time += elapsed
+            if elapsed > handler.max_time:
+                handler.max_time = elapsed
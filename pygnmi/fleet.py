@@ -0,0 +1,371 @@
+"""This module contains the helpers to work with many network devices concurrently
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError, wait
+import grpc
+
+
+# Own modules
+from pygnmi.client import gNMIclient, gNMIException
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Statics
+_RETRYABLE_CODES = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+}
+
+
+# Classes
+class BulkConnectResult(namedtuple("BulkConnectResult", ("clients", "failures", "timings"))):
+    """
+    Result of connect_many(), each field is the dictionary keyed by the target (host, port):
+      - clients: connected gNMIclient objects
+      - failures: {"phase": ..., "error": ..., "exception": ...} for the targets failed to connect,
+        where phase is "certificate", "channel_ready", "capabilities" or "deadline"
+      - timings: durations of the phases of the connection in seconds (see gNMIclient.connect_timings)
+    """
+
+    __slots__ = ()
+
+
+class FleetResult(namedtuple("FleetResult", ("target", "result", "error", "attempts", "duration"))):
+    """
+    Result of the operation of gNMIFleet for one target (host, port): result of the gNMIclient method,
+    or error (the exception) if it failed after all the attempts; duration is in seconds
+    """
+
+    __slots__ = ()
+
+
+class gNMIFleet(object):
+    """
+    Runs the same operation against many targets concurrently and yields the results per target
+    as they complete, so the slow targets don't delay the processing of the others.
+
+    targets: list of tuples (host, port), or dictionaries with the arguments of gNMIclient
+      for the individual targets (including "target")
+    concurrency: maximum number of the operations running at the same time across the fleet
+    per_target_concurrency: maximum number of the operations running at the same time per target
+    deadline: time to complete one operation across the fleet, in seconds, counted from the call
+      of the operation; the targets, which haven't completed by then, are yielded with TimeoutError
+    retries: number of the additional attempts for the targets, which failed to connect
+      or returned the transient gRPC errors (UNAVAILABLE, DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED, ABORTED)
+    retry_delay: delay between the attempts in seconds, which doubles with each attempt
+    kwargs: arguments of gNMIclient common for all the targets (e.g., username, password, insecure)
+
+    The clients are connected on the first operation and reused by the next ones until close().
+    The client, which fails with the transient error, is replaced for the next operations, and is
+    closed once the other operations running on it at the same time are finished.
+
+    The operations, which haven't completed by the deadline, aren't interrupted: each of them keeps
+    its executor worker and the per-target slot until its current attempt returns (bounded by gnmi_timeout),
+    and is not retried afterwards. The next operations on these targets wait for them, so gnmi_timeout
+    is best kept below the deadline, and concurrency above the number of targets expected to hang.
+
+    The fleet runs the unary operations only, there is no get_iter: gNMIclient has no iterating Get,
+    and the streaming subscriptions are per target (see pygnmi.collector for them).
+    """
+
+    def __init__(
+        self,
+        targets: list,
+        concurrency: int = 50,
+        per_target_concurrency: int = 1,
+        deadline: float = None,
+        retries: int = 0,
+        retry_delay: float = 1.0,
+        **kwargs,
+    ):
+        self.deadline = deadline
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+        self._arguments = {}
+        for target in targets:
+            arguments = dict(kwargs, **target) if isinstance(target, dict) else dict(kwargs, target=target)
+            self._arguments[tuple(arguments["target"])] = arguments
+
+        self._clients = {}
+        self._holders = {}
+        self._semaphores = {target: threading.BoundedSemaphore(per_target_concurrency) for target in self._arguments}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pygnmi-fleet")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    @property
+    def targets(self) -> list:
+        return list(self._arguments)
+
+    def capabilities(self, deadline: float = None):
+        """Returns the iterator of FleetResult with the capabilities per target"""
+        return self.run(lambda client: client.capabilities(), deadline=deadline)
+
+    def get(self, deadline: float = None, **kwargs):
+        """Returns the iterator of FleetResult with the result of get() per target, kwargs are the arguments of get()"""
+        return self.run(lambda client: client.get(**kwargs), deadline=deadline)
+
+    def set(self, deadline: float = None, **kwargs):
+        """Returns the iterator of FleetResult with the result of set() per target, kwargs are the arguments of set()"""
+        return self.run(lambda client: client.set(**kwargs), deadline=deadline)
+
+    def run(self, operation, targets: list = None, deadline: float = None):
+        """
+        Starts the operation on the targets and returns the iterator, which yields FleetResult
+        per target as the operation completes for it. The deadline is counted from this call,
+        and the results completed in time are yielded, however long the consumer processes them.
+
+        operation: function called with the connected gNMIclient
+        targets: subset of the targets (host, port), all of them by default
+        deadline: overrides the deadline of the fleet
+        """
+        deadline = self.deadline if deadline is None else deadline
+        expires_at = time.monotonic() + deadline if deadline is not None else None
+        abandoned = threading.Event()
+        completed_at = {}
+        futures = {}
+
+        for target in targets or self._arguments:
+            future = self._executor.submit(self._run_on_target, operation, target, abandoned)
+            future.add_done_callback(lambda future: completed_at.setdefault(future, time.monotonic()))
+            futures[future] = target
+
+        return self._collect(futures, deadline, expires_at, completed_at, abandoned)
+
+    def _collect(
+        self, futures: dict, deadline: float, expires_at: float, completed_at: dict, abandoned: threading.Event
+    ):
+        """Yields the results completed by expires_at, then TimeoutError for the remaining targets"""
+        pending = set(futures)
+
+        while pending:
+            timeout = max(0.0, expires_at - time.monotonic()) if expires_at is not None else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            # The callback recording the completion may not have run yet for the futures just completed
+            now = time.monotonic()
+            late = {
+                future for future in done if expires_at is not None and completed_at.get(future, now) > expires_at
+            }
+            for future in done - late:
+                yield future.result()
+
+            if not done or late:
+                pending |= late
+                break
+
+        if pending:
+            # The late operations release the workers and the per-target slots as soon as possible
+            abandoned.set()
+
+            for future in pending:
+                future.cancel()
+                yield FleetResult(
+                    futures[future], None, TimeoutError(f"Not completed within {deadline}s"), None, deadline
+                )
+
+    def close(self) -> None:
+        """Closes the connections to all the targets"""
+        self._executor.shutdown(wait=False)
+
+        with self._lock:
+            clients, self._clients = self._clients, {}
+            self._holders = {}
+
+        for client in clients.values():
+            client.close()
+
+    def _run_on_target(self, operation, target: tuple, abandoned: threading.Event) -> FleetResult:
+        started_at = time.monotonic()
+        attempt = 0
+
+        with self._semaphores[target]:
+            while True:
+                if abandoned.is_set():
+                    return FleetResult(target, None, TimeoutError("Abandoned after the deadline"), attempt, None)
+
+                attempt += 1
+                client = None
+                error = None
+                try:
+                    client = self._acquire_client(target)
+                    result = operation(client)
+
+                except Exception as err:
+                    error = err
+
+                if client is not None:
+                    # The connection is re-established for the next operations
+                    if error is not None and _is_retryable(error):
+                        self._discard_client(target, client)
+
+                    self._release_client(target, client)
+
+                if error is None:
+                    return FleetResult(target, result, None, attempt, time.monotonic() - started_at)
+
+                if attempt > self.retries or not _is_retryable(error) or abandoned.is_set():
+                    logger.error(f"Operation on {target} failed after {attempt} attempt(s): {error}")
+                    return FleetResult(target, None, error, attempt, time.monotonic() - started_at)
+
+                abandoned.wait(self.retry_delay * 2 ** (attempt - 1))
+
+    def _acquire_client(self, target: tuple) -> gNMIclient:
+        """Returns the client of the target, which is held by the operation until _release_client()"""
+        with self._lock:
+            client = self._clients.get(target)
+
+            if client is not None:
+                self._holders[client] = self._holders.get(client, 0) + 1
+                return client
+
+        client = gNMIclient(**self._arguments[target]).connect()
+
+        # Another operation on the same target may have connected meanwhile
+        with self._lock:
+            connected_client = self._clients.setdefault(target, client)
+            self._holders[connected_client] = self._holders.get(connected_client, 0) + 1
+
+        if connected_client is not client:
+            client.close()
+
+        return connected_client
+
+    def _release_client(self, target: tuple, client: gNMIclient) -> None:
+        """Closes the discarded client, once the last operation using it releases it"""
+        with self._lock:
+            # The fleet is closed meanwhile
+            if client not in self._holders:
+                return
+
+            self._holders[client] -= 1
+            if self._holders[client]:
+                return
+
+            del self._holders[client]
+            if self._clients.get(target) is client:
+                return
+
+        client.close()
+
+    def _discard_client(self, target: tuple, client: gNMIclient) -> None:
+        """Stops giving the failed client to the operations, unless it's already replaced"""
+        with self._lock:
+            if self._clients.get(target) is client:
+                del self._clients[target]
+
+
+# User-defined functions
+def connect_many(
+    targets: list, concurrency: int = 50, timeout: float = 5, deadline: float = None, **kwargs
+) -> BulkConnectResult:
+    """
+    Connects to many targets concurrently.
+
+    targets: list of tuples (host, port), or dictionaries with the arguments of gNMIclient
+      for the individual targets (including "target")
+    concurrency: maximum number of the connections established at the same time
+    timeout: time to wait for each channel to become ready, in seconds
+    deadline: time to wait for all the connections, in seconds; the targets not connected
+      by then are reported as failed, and are closed once they connect
+    kwargs: arguments of gNMIclient common for all the targets (e.g., username, password, insecure)
+    """
+    clients = {}
+    failures = {}
+    timings = {}
+    pending = {}
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pygnmi-connect")
+    started_at = time.monotonic()
+
+    try:
+        for target in targets:
+            arguments = dict(kwargs, **target) if isinstance(target, dict) else dict(kwargs, target=target)
+            arguments.setdefault("gnmi_timeout", timeout)
+            client = gNMIclient(**arguments)
+
+            pending[executor.submit(_connect, client)] = (tuple(arguments["target"]), client)
+
+        done, not_done = wait(pending, timeout=deadline)
+
+    finally:
+        executor.shutdown(wait=False)
+
+    for future in done:
+        target, client = pending[future]
+        timings[target] = dict(client.connect_timings)
+        error = future.exception()
+
+        if error is None:
+            clients[target] = client
+
+        else:
+            failures[target] = {
+                "phase": client._connect_phase,
+                "error": str(error) or error.__class__.__name__,
+                "exception": error,
+            }
+
+    for future in not_done:
+        target, client = pending[future]
+        timings[target] = dict(client.connect_timings)
+        failures[target] = {
+            "phase": "deadline",
+            "error": f"Not connected within {deadline}s, last phase: {client._connect_phase or 'queued'}",
+            "exception": None,
+        }
+
+        # Connections completed after the deadline are not returned, so they are closed
+        if not future.cancel():
+            future.add_done_callback(_close_late_connection)
+
+    logger.info(
+        f"Connected to {len(clients)} out of {len(pending)} targets in {time.monotonic() - started_at:.3f}s"
+    )
+
+    return BulkConnectResult(clients, failures, timings)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, gNMIException) and error.orig_exc is not None:
+        error = error.orig_exc
+
+    if isinstance(error, grpc.FutureTimeoutError):
+        return True
+
+    return isinstance(error, grpc.RpcError) and hasattr(error, "code") and error.code() in _RETRYABLE_CODES
+
+
+def _connect(client: gNMIclient) -> gNMIclient:
+    client.connect()
+
+    # Clients are returned ready for the requests
+    try:
+        client.negotiate_encoding()
+
+    except Exception:
+        client.close()
+        raise
+
+    return client
+
+
+def _close_late_connection(future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
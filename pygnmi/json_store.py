@@ -0,0 +1,88 @@
+"""This module contains the JSON file shared between the processes, which backs the caches of pygnmi
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import json
+import logging
+import os
+
+try:
+    import fcntl
+
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Classes
+class JSONFileStore(object):
+    """
+    Dictionary stored in the JSON file at path. The file is guarded by the lock file next to it,
+    so read-modify-write done within locked() isn't interleaved with the other processes.
+    """
+
+    def __init__(self, path: str, description: str = "JSON file"):
+        self.path = path
+        self.description = description
+
+    def locked(self):
+        """Returns the context manager holding the exclusive lock of the file across the processes"""
+        return _FileLock(self.path + ".lock")
+
+    def read(self) -> dict:
+        """Returns the content of the file, empty if it doesn't exist or cannot be read"""
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+
+        except (OSError, ValueError) as err:
+            logger.warning(f"The {self.description} {self.path} cannot be read: {err}")
+            return {}
+
+    def write(self, entries: dict) -> None:
+        """Replaces the content of the file, call it within locked()"""
+        # Readers never see the partially written file
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+
+        with open(temporary_path, "w") as f:
+            json.dump(entries, f, indent=2)
+
+        os.replace(temporary_path, self.path)
+
+
+class _FileLock(object):
+    """Exclusive lock of the file across the processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a+")
+
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+        self._file.close()
@@ -0,0 +1,74 @@
+"""This module contains the Nornir connection plugin, which keeps gNMIclient open across the tasks
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import logging
+
+
+# Own modules
+from pygnmi.client import gNMIclient
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Statics
+CONNECTION_NAME = "pygnmi"
+
+
+# Classes
+class gNMIConnection(object):
+    """
+    Nornir connection plugin managing gNMIclient: the client is opened with the first
+    task.host.get_connection("pygnmi", task.nornir.config) for the host, reused by the following
+    tasks and closed by nr.close_connections() at the end of the run.
+
+    The arguments of gNMIclient other than target, username and password (e.g., insecure, path_cert,
+    skip_verify, encoding) are taken from the extras of the "pygnmi" connection options of the host.
+    The port of the host without its own port is taken from the "default_port" in the extras, which can
+    be set once in the connection options of the group or of the defaults; gNMI has no standard port.
+    """
+
+    def open(
+        self,
+        hostname: str,
+        username: str,
+        password: str,
+        port: int = None,
+        platform: str = None,
+        extras: dict = None,
+        configuration=None,
+    ) -> None:
+        extras = dict(extras or {})
+        default_port = extras.pop("default_port", None)
+        if port is None:
+            port = default_port
+
+        if port is None:
+            raise ValueError(
+                f"Port of the host {hostname} isn't set: set it in the inventory, or the 'default_port' "
+                f"in the extras of the '{CONNECTION_NAME}' connection options"
+            )
+
+        parameters = {"target": (hostname, port), "username": username, "password": password}
+        parameters.update(extras)
+
+        self.connection = gNMIclient(**parameters)
+        self.connection.connect()
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+# User-defined functions
+def register(name: str = CONNECTION_NAME) -> None:
+    """Registers gNMIConnection as the Nornir connection plugin, which tasks get by name"""
+    try:
+        from nornir.core.plugins.connections import ConnectionPluginRegister
+
+    except ImportError as err:
+        raise ImportError("Nornir connection plugin requires nornir, install it with 'pip install nornir'.") from err
+
+    ConnectionPluginRegister.register(name, gNMIConnection)
+    logger.info(f"gNMIConnection is registered as Nornir connection plugin '{name}'")
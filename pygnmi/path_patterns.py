@@ -0,0 +1,180 @@
+"""This module contains the index of XPath patterns with wildcards
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import threading
+
+
+# Own modules
+from pygnmi.create_gnmi_path import split_xpath, parse_xpath_element
+
+
+# Classes
+class _PatternNode(object):
+    """Single element of the compiled patterns"""
+
+    __slots__ = ("exact", "keyed", "star", "multi", "is_multi", "entries")
+
+    def __init__(self, is_multi: bool = False):
+        self.exact = {}
+        self.keyed = {}
+        self.star = None
+        self.multi = None
+        self.is_multi = is_multi
+        self.entries = []
+
+
+class PathPatternIndex(object):
+    """
+    Index of the items (e.g., callbacks) registered for XPath patterns.
+
+    Patterns are XPaths in the same format as in gNMIclient.get(), which may contain wildcards:
+      - "*" matches any single element, e.g. "interfaces/*/state/oper-status"
+      - "..." matches any number of elements, e.g. "interfaces/.../in-octets"
+      - "[key=*]" matches any value of the key, e.g. "interfaces/interface[name=*]/state/oper-status"
+
+    Patterns are compiled into the tree, so matching of each path costs O(depth of the path)
+    regardless of the number of registered patterns; results are also cached per path.
+    """
+
+    _max_cached_paths = 65536
+
+    def __init__(self):
+        self._entries = []
+        self._root = _PatternNode()
+        self._matches = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, pattern: str, item) -> None:
+        """Registers the item for the paths matching the pattern"""
+        with self._lock:
+            self._entries.append((pattern, item))
+            self._compile()
+
+    def remove(self, pattern: str, match=None) -> None:
+        """
+        Removes the items registered for the pattern, for which match(item) returns True
+        (all of them if match isn't provided); the tree is rebuilt once for all of them
+        """
+        with self._lock:
+            entries = [
+                (e_pattern, e_item)
+                for e_pattern, e_item in self._entries
+                if not (e_pattern == pattern and (match is None or match(e_item)))
+            ]
+
+            if len(entries) != len(self._entries):
+                self._entries = entries
+                self._compile()
+
+    def items(self) -> list:
+        """Returns the list of tuples (pattern, item) in the order of registration"""
+        return list(self._entries)
+
+    def match(self, path: str) -> list:
+        """Returns the list of items, which patterns match the path, in the order of registration"""
+        # Reference is taken once, as registration replaces the cache and the tree
+        matches = self._matches
+        result = matches.get(path)
+
+        if result is None:
+            nodes = _walk(self._root, split_xpath(path))
+            entries = sorted((entry for node in nodes for entry in node.entries), key=lambda entry: entry[0])
+            result = [item for _, item in entries]
+
+            if len(matches) >= self._max_cached_paths:
+                matches.clear()
+            matches[path] = result
+
+        return result
+
+    def _compile(self) -> None:
+        """Builds the tree of the patterns, replacing the previous one"""
+        root = _PatternNode()
+
+        for order, (pattern, item) in enumerate(self._entries):
+            node = root
+            for element in split_xpath(pattern):
+                if element == "*":
+                    if node.star is None:
+                        node.star = _PatternNode()
+                    node = node.star
+
+                elif element == "...":
+                    if node.multi is None:
+                        node.multi = _PatternNode(is_multi=True)
+                    node = node.multi
+
+                elif "=*]" in element or element.startswith("*["):
+                    name, keys = parse_xpath_element(element)
+                    keys = tuple(sorted(keys.items()))
+
+                    for keys_pattern, child in node.keyed.setdefault(name, []):
+                        if keys_pattern == keys:
+                            node = child
+                            break
+                    else:
+                        child = _PatternNode()
+                        node.keyed[name].append((keys, child))
+                        node = child
+
+                else:
+                    node = node.exact.setdefault(element, _PatternNode())
+
+            node.entries.append((order, item))
+
+        self._root = root
+        self._matches = {}
+
+
+# User-defined functions
+def _walk(root: _PatternNode, elements: list) -> list:
+    """Returns the list of pattern nodes matching the path elements"""
+    states = _expand([root])
+
+    for element in elements:
+        next_states = []
+
+        for node in states:
+            child = node.exact.get(element)
+            if child is not None:
+                next_states.append(child)
+
+            if node.keyed:
+                name, keys = parse_xpath_element(element)
+
+                for pattern_name in (name, "*"):
+                    for keys_pattern, child in node.keyed.get(pattern_name, []):
+                        if all(pk_name in keys and pk_value in {"*", keys[pk_name]} for pk_name, pk_value in keys_pattern):
+                            next_states.append(child)
+
+            if node.star is not None:
+                next_states.append(node.star)
+
+            # "..." consumes the element and stays in place
+            if node.is_multi:
+                next_states.append(node)
+
+        if not next_states:
+            return []
+
+        states = _expand(next_states)
+
+    return states
+
+
+def _expand(states: list) -> list:
+    """Adds the nodes reachable via "..." matching zero elements, the same node
+    may be reached via different branches, so it is kept only once"""
+    result = []
+    seen = set()
+    for node in states:
+        while node is not None and id(node) not in seen:
+            seen.add(id(node))
+            result.append(node)
+            node = node.multi
+
+    return result
@@ -0,0 +1,227 @@
+"""This module contains the scheduler of the POLL subscriptions
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import heapq
+import logging
+import queue
+import random
+import threading
+import time
+
+
+# Own modules
+from pygnmi.client import PollSubscriber
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Classes
+class _PollJob(object):
+    """Scheduled POLL subscription with its state and statistics"""
+
+    __slots__ = (
+        "subscriber",
+        "interval",
+        "jitter",
+        "pipelined",
+        "callback",
+        "next_due",
+        "is_pending",
+        "is_delivering",
+        "is_removed",
+        "sent_at",
+        "stats",
+    )
+
+    def __init__(self, subscriber: PollSubscriber, interval: float, jitter: float, pipelined: bool, callback):
+        self.subscriber = subscriber
+        self.interval = interval
+        self.jitter = jitter
+        self.pipelined = pipelined
+        self.callback = callback
+        self.next_due = time.monotonic()
+        self.is_pending = False
+        self.is_delivering = False
+        self.is_removed = False
+        self.sent_at = None
+        self.stats = {
+            "polls": 0,
+            "snapshots": 0,
+            "overruns": 0,
+            "missed": 0,
+            "last_latency": None,
+            "max_latency": 0.0,
+        }
+
+
+class PollScheduler(object):
+    """
+    Scheduler sending the Poll messages for many POLL subscriptions (see gNMIclient.subscribe_poll())
+    on a fixed cadence from a single thread, so the cadence doesn't drift by the response time.
+
+    Snapshots (updates coalesced till sync_response, as returned by PollSubscriber.next()) are
+    collected by the subscriptions and delivered to callback(subscriber, snapshot), or put into
+    the queue 'snapshots' as the tuples (subscriber, snapshot), if the callback is not provided.
+    The update {"resync": ...} of the re-established subscription is delivered the same way.
+
+    If the previous poll is not answered by the time of the next one, the poll is skipped and
+    counted as the overrun. Unless pipelined is set, the poll is also skipped while the callback
+    is still processing the previous snapshot; with pipelined, the next poll is in flight meanwhile.
+
+    Example:
+      with PollScheduler() as scheduler:
+          scheduler.add(gc.subscribe_poll(subscribe=...), interval=10, jitter=1)
+          subscriber, snapshot = scheduler.snapshots.get()
+    """
+
+    def __init__(self):
+        self.snapshots = queue.Queue()
+        self._jobs = {}
+        self._heap = []
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def add(
+        self,
+        subscriber: PollSubscriber,
+        interval: float,
+        jitter: float = 0.0,
+        pipelined: bool = False,
+        callback=None,
+    ) -> None:
+        """
+        Starts polling of the subscription.
+
+        interval: time between the polls in seconds
+        jitter: random delay up to that many seconds added to each poll, which spreads the polls
+          of many targets; the cadence is kept regardless of the jitter
+        pipelined: allow the poll while the callback processes the previous snapshot
+        callback: function called with (subscriber, snapshot); snapshots are queued if not provided
+        """
+        if not isinstance(subscriber, PollSubscriber):
+            raise ValueError("Only POLL subscriptions can be scheduled.")
+
+        if interval <= 0 or jitter < 0 or jitter >= interval:
+            raise ValueError("Interval must be positive, and jitter must be within the interval.")
+
+        with self._condition:
+            if self._closed:
+                raise ValueError("Scheduler is closed.")
+
+            if subscriber in self._jobs:
+                raise ValueError("Subscription is already scheduled.")
+
+            job = _PollJob(subscriber, interval, jitter, pipelined, callback)
+            self._jobs[subscriber] = job
+            subscriber._set_snapshot_handler(lambda snapshot: self._on_snapshot(job, snapshot))
+            self._push(job)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pygnmi-poll-scheduler", daemon=True)
+                self._thread.start()
+
+            self._condition.notify()
+
+    def remove(self, subscriber: PollSubscriber) -> None:
+        """Stops polling of the subscription, which can be polled with next() again"""
+        with self._condition:
+            job = self._jobs.pop(subscriber, None)
+
+            if job is not None:
+                job.is_removed = True
+                subscriber._set_snapshot_handler(None)
+                self._condition.notify()
+
+    def stats(self) -> list:
+        """Returns the list of statistics per scheduled subscription"""
+        with self._condition:
+            return [dict(job.stats, interval=job.interval, subscriber=job.subscriber) for job in self._jobs.values()]
+
+    def close(self) -> None:
+        """Stops the scheduler. The subscriptions aren't closed, so they can be rescheduled or closed separately."""
+        with self._condition:
+            for subscriber in list(self._jobs):
+                self.remove(subscriber)
+
+            self._closed = True
+            self._condition.notify()
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _push(self, job: _PollJob) -> None:
+        self._sequence += 1
+        send_at = job.next_due + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+        heapq.heappush(self._heap, (send_at, self._sequence, job))
+
+    def _run(self) -> None:
+        with self._condition:
+            while not self._closed:
+                now = time.monotonic()
+
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, job = heapq.heappop(self._heap)
+
+                    if not job.is_removed:
+                        self._poll(job, now)
+                        self._push(job)
+
+                self._condition.wait(self._heap[0][0] - now if self._heap else None)
+
+    def _poll(self, job: _PollJob, now: float) -> None:
+        if job.is_pending or (job.is_delivering and not job.pipelined):
+            job.stats["overruns"] += 1
+            logger.warning(f"Poll is skipped, as the previous one is not completed within {job.interval}s")
+
+        else:
+            job.is_pending = True
+            job.sent_at = now
+            job.stats["polls"] += 1
+            job.subscriber.poll()
+
+        # Keep the cadence, skipping the polls missed while the scheduler was stalled
+        job.next_due += job.interval
+        if job.next_due <= now:
+            missed = int((now - job.next_due) // job.interval) + 1
+            job.next_due += missed * job.interval
+            job.stats["missed"] += missed
+
+    def _on_snapshot(self, job: _PollJob, snapshot: dict) -> None:
+        """Called by the thread of the subscription with each completed snapshot"""
+        with self._condition:
+            if "sync_response" in snapshot:
+                job.stats["snapshots"] += 1
+
+                if job.is_pending:
+                    latency = time.monotonic() - job.sent_at
+                    job.stats["last_latency"] = latency
+                    job.stats["max_latency"] = max(job.stats["max_latency"], latency)
+
+            # Poll in flight is lost with the broken stream
+            job.is_pending = False
+            job.is_delivering = True
+
+        try:
+            if job.callback is not None:
+                job.callback(job.subscriber, snapshot)
+
+            else:
+                self.snapshots.put((job.subscriber, snapshot))
+
+        except Exception as err:
+            logger.error(f"Callback failed on the poll snapshot: {err}")
+
+        finally:
+            with self._condition:
+                job.is_delivering = False
@@ -0,0 +1,32 @@
+"""This module contains the compact records of the telemetry updates
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+from collections import namedtuple
+
+
+# Classes
+class UpdateRecord(namedtuple("UpdateRecord", ("timestamp", "prefix", "path", "value", "op"))):
+    """
+    Single leaf of the notification: op is "update" or "delete" (value is None for the latter).
+    All the records of the notification share the same prefix string.
+    """
+
+    __slots__ = ()
+
+
+class UpdateBatch(namedtuple("UpdateBatch", ("timestamp", "prefix", "paths", "values", "deletes"))):
+    """
+    Notification in the columnar form: paths and values of the updates are the tuples of the same
+    length, and deletes is the tuple of the deleted paths.
+    """
+
+    __slots__ = ()
+
+    def records(self):
+        """Yields the UpdateRecord per leaf, deletes first, as mandated by gNMI specification"""
+        for path in self.deletes:
+            yield UpdateRecord(self.timestamp, self.prefix, path, None, "delete")
+
+        for path, value in zip(self.paths, self.values):
+            yield UpdateRecord(self.timestamp, self.prefix, path, value, "update")
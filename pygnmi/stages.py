@@ -0,0 +1,601 @@
+"""This module contains the stages processing the telemetry updates in the subscriptions
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import logging
+import time
+from array import array
+
+
+# Own modules
+from pygnmi.create_gnmi_path import join_xpath, split_xpath
+from pygnmi.path_patterns import PathPatternIndex
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Statics
+_MAX_UINT64 = 2**64 - 1
+_CONSUMED = object()
+
+
+# Classes
+class _LeafStore(object):
+    """
+    Compact store of the previous (timestamp, value) per leaf. The values are kept in the
+    typed arrays, and the dictionary only maps the path to the slot in the arrays. The paths
+    are also indexed in the tree of their elements, so the delete of the subtree doesn't scan all of them.
+    """
+
+    def __init__(self, value_typecode: str = "Q"):
+        self._slots = {}
+        self._free_slots = []
+        self._tree = {}
+        self.timestamps = array("q")
+        self.values = array(value_typecode)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get_slot(self, path: str) -> int:
+        return self._slots.get(path)
+
+    def add(self, path: str, timestamp: int, value) -> int:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self.timestamps[slot] = timestamp
+            self.values[slot] = value
+
+        else:
+            slot = len(self.timestamps)
+            self.timestamps.append(timestamp)
+            self.values.append(value)
+
+        if path not in self._slots:
+            node = self._tree
+            for element in split_xpath(path):
+                node = node.setdefault(element, {})
+            node[None] = path
+
+        self._slots[path] = slot
+
+        return slot
+
+    def discard(self, path: str) -> None:
+        """Forgets the path and all the paths below it"""
+        elements = split_xpath(path)
+
+        if not elements:
+            self._free_slots.extend(self._slots.values())
+            self._slots.clear()
+            self._tree = {}
+            return
+
+        trail = [self._tree]
+        for element in elements[:-1]:
+            node = trail[-1].get(element)
+            if node is None:
+                return
+            trail.append(node)
+
+        node = trail[-1].pop(elements[-1], None)
+        if node is None:
+            return
+
+        nodes = [node]
+        while nodes:
+            node = nodes.pop()
+            for element, child in node.items():
+                if element is None:
+                    self._free_slots.append(self._slots.pop(child))
+                else:
+                    nodes.append(child)
+
+        # Branches left without the paths are removed as well
+        for element, parent in zip(reversed(elements[:-1]), reversed(trail[:-1])):
+            if trail[-1]:
+                break
+            del parent[element]
+            trail.pop()
+
+
+class CounterRates(object):
+    """
+    Stage converting monotonically increasing counters (e.g., interface or QoS counters)
+    into per-second rates, using the timestamps of the notifications set by the device.
+
+    Each update entry with the counter value gets the key "rate" with the rate per second,
+    once the previous value of that leaf is known. Counters inside JSON values get "rate"
+    as the dictionary of the same structure. All the other content of the update is passed
+    unchanged. Counters are the non-negative integer values, or the strings of digits, as JSON_IETF
+    encodes the 64-bit integers; the selection can be narrowed down with the list of path patterns
+    (see PathPatternIndex).
+
+    When the counter decreases, it is considered to wrap, if the previous value was in the top
+    quarter of its range (32 bits, if the previous value fits them, or 64 bits otherwise);
+    counter_bits enforces the width and treats any decrease as the wrap. Otherwise, the counter
+    is considered reset (e.g., after reboot), and the rate is reported starting from the next value.
+
+    The object can be attached to the subscription as the stage, e.g.
+    gc.subscribe_stream(subscribe=..., stages=[CounterRates()]), or called on the output of telemetryParser().
+    """
+
+    def __init__(self, paths: list = None, counter_bits: int = None):
+        self._patterns = None
+        if paths:
+            self._patterns = PathPatternIndex()
+            for path in paths:
+                self._patterns.add(path, True)
+
+        self._counter_bits = counter_bits
+        self._store = _LeafStore()
+        self.stats = {"counters": 0, "rates": 0, "wraps": 0, "resets": 0}
+
+    def __call__(self, update: dict) -> dict:
+        if not update or "update" not in update:
+            return update
+
+        notification = update["update"]
+        prefix = notification.get("prefix")
+        timestamp = notification.get("timestamp", 0)
+
+        for delete_entry in notification.get("delete", []):
+            self._store.discard(join_xpath(prefix, delete_entry.get("path")))
+
+        if not timestamp:
+            return update
+
+        for update_entry in notification.get("update", []):
+            path = join_xpath(prefix, update_entry.get("path"))
+            value = update_entry.get("val")
+
+            counter = _as_counter(value)
+
+            if isinstance(value, dict):
+                rate = self._get_tree_rate(path, value, timestamp)
+            elif counter is not None and self._is_selected(path):
+                rate = self._get_rate(path, counter, timestamp)
+            else:
+                rate = None
+
+            if rate is not None:
+                update_entry["rate"] = rate
+
+        self.stats["counters"] = len(self._store)
+
+        return update
+
+    def _is_selected(self, path: str) -> bool:
+        return self._patterns is None or bool(self._patterns.match(path))
+
+    def _get_tree_rate(self, path: str, value: dict, timestamp: int) -> dict:
+        result = {}
+
+        for v_name, v_value in value.items():
+            v_path = f"{path}/{v_name}" if path else v_name
+
+            v_counter = _as_counter(v_value)
+
+            if isinstance(v_value, dict):
+                rate = self._get_tree_rate(v_path, v_value, timestamp)
+            elif v_counter is not None and self._is_selected(v_path):
+                rate = self._get_rate(v_path, v_counter, timestamp)
+            else:
+                rate = None
+
+            if rate is not None:
+                result[v_name] = rate
+
+        return result or None
+
+    def _get_rate(self, path: str, value: int, timestamp: int) -> float:
+        slot = self._store.get_slot(path)
+        if slot is None:
+            self._store.add(path, timestamp, value)
+            return None
+
+        previous_timestamp = self._store.timestamps[slot]
+        previous_value = self._store.values[slot]
+
+        # Duplicated or reordered sample
+        if timestamp <= previous_timestamp:
+            return None
+
+        self._store.timestamps[slot] = timestamp
+        self._store.values[slot] = value
+
+        delta = value - previous_value
+        if delta < 0:
+            counter_bits = self._counter_bits or (32 if previous_value < 2**32 else 64)
+
+            if self._counter_bits or previous_value >= 3 * 2 ** (counter_bits - 2):
+                delta += 2**counter_bits
+                self.stats["wraps"] += 1
+
+            else:
+                logger.info(f"Counter {path} is reset from {previous_value} to {value}")
+                self.stats["resets"] += 1
+                return None
+
+        self.stats["rates"] += 1
+
+        return delta * 1e9 / (timestamp - previous_timestamp)
+
+
+class _Pane(object):
+    """Aggregates of all the leaves over one slide of the window, the arrays are indexed by the slot of the leaf"""
+
+    __slots__ = ("start", "mins", "maxs", "sums", "counts", "lasts", "last_timestamps")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.mins = array("d")
+        self.maxs = array("d")
+        self.sums = array("d")
+        self.counts = array("q")
+        self.last_timestamps = array("q")
+        self.lasts = []
+
+    def add(self, slot: int, timestamp: int, value) -> None:
+        if slot >= len(self.counts):
+            missing = slot + 1 - len(self.counts)
+            self.mins.extend([0.0] * missing)
+            self.maxs.extend([0.0] * missing)
+            self.sums.extend([0.0] * missing)
+            self.counts.extend([0] * missing)
+            self.last_timestamps.extend([0] * missing)
+            self.lasts.extend([None] * missing)
+
+        if self.counts[slot]:
+            if value < self.mins[slot]:
+                self.mins[slot] = value
+            if value > self.maxs[slot]:
+                self.maxs[slot] = value
+
+        else:
+            self.mins[slot] = value
+            self.maxs[slot] = value
+
+        self.sums[slot] += value
+        self.counts[slot] += 1
+
+        if timestamp >= self.last_timestamps[slot]:
+            self.last_timestamps[slot] = timestamp
+            self.lasts[slot] = value
+
+
+class WindowAggregator(object):
+    """
+    Stage aggregating numeric leaves of the updates over the time windows, which downsamples
+    the telemetry before it is returned to the consumer.
+
+    window: length of the window in seconds
+    slide: step of the sliding window in seconds; the window is tumbling, if not provided
+    functions: aggregates to compute per leaf, any of "min", "max", "avg", "last", "count"
+    paths: list of path patterns (see PathPatternIndex) to aggregate; all numeric leaves by default
+    value_key: key of the update entry to aggregate, e.g. "rate" to aggregate the output of CounterRates
+
+    Windows are aligned to the multiples of the slide and use the timestamps of the notifications,
+    the window is closed once the update newer than its end is received (or flush() is called).
+    The aggregated leaves are consumed, and for each closed window one update is returned:
+      {"aggregate": {"start": ..., "end": ..., "values": {path: {"min": ..., "max": ..., ...}}}}
+    Other content of the updates (non-numeric leaves, deletes, sync_response) is passed further,
+    and the updates left without any content are dropped.
+    Values of the leaves are kept in the typed arrays per slide of the window.
+    """
+
+    _functions = ("min", "max", "avg", "last", "count")
+
+    def __init__(
+        self,
+        window: float,
+        slide: float = None,
+        functions: tuple = ("min", "max", "avg", "last", "count"),
+        paths: list = None,
+        value_key: str = "val",
+    ):
+        self._window = int(window * 1e9)
+        self._slide = int(slide * 1e9) if slide else self._window
+
+        if self._slide <= 0 or self._window % self._slide:
+            raise ValueError("The window must be the positive multiple of the slide.")
+
+        if not functions or set(functions) - set(self._functions):
+            raise ValueError(f"Aggregate functions must be within {self._functions}.")
+
+        self._selected_functions = tuple(functions)
+        self._patterns = None
+        if paths:
+            self._patterns = PathPatternIndex()
+            for path in paths:
+                self._patterns.add(path, True)
+
+        self._value_key = value_key
+        self._slots = {}
+        self._paths = []
+        self._panes = []
+        self._next_window_start = None
+        self.stats = {"leaves": 0, "samples": 0, "late": 0, "windows": 0}
+
+    def __call__(self, update: dict):
+        if not update or "update" not in update:
+            return update
+
+        notification = update["update"]
+        prefix = notification.get("prefix")
+        timestamp = notification.get("timestamp") or time.time_ns()
+
+        result = self._close_windows(timestamp)
+
+        passed_entries = []
+        for update_entry in notification.get("update", []):
+            value = update_entry.get(self._value_key)
+            remainder = self._aggregate(join_xpath(prefix, update_entry.get("path")), value, timestamp)
+
+            if remainder is value:
+                passed_entries.append(update_entry)
+
+            elif remainder is not _CONSUMED:
+                passed_entries.append(dict(update_entry, **{self._value_key: remainder}))
+
+        if passed_entries or notification.get("delete") or len(update) > 1:
+            passed_update = dict(update)
+            passed_update["update"] = dict(notification, update=passed_entries)
+            result.insert(0, passed_update)
+
+        return result
+
+    def flush(self) -> list:
+        """Closes all the open windows and returns the aggregated updates"""
+        if not self._panes:
+            return []
+
+        return self._close_windows(self._panes[-1].start + self._window + self._slide)
+
+    def _aggregate(self, path: str, value, timestamp: int):
+        """Adds the value to the aggregates, returns the part of the value, which is not aggregated"""
+        if isinstance(value, dict):
+            remainder = {}
+            for v_name, v_value in value.items():
+                v_remainder = self._aggregate(f"{path}/{v_name}" if path else v_name, v_value, timestamp)
+
+                if v_remainder is not _CONSUMED:
+                    remainder[v_name] = v_remainder
+
+            if len(remainder) == len(value):
+                return value
+
+            return remainder or _CONSUMED
+
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return value
+
+        if self._patterns is not None and not self._patterns.match(path):
+            return value
+
+        pane_start = timestamp - timestamp % self._slide
+
+        if self._next_window_start is None:
+            self._next_window_start = pane_start
+
+        # Windows containing this value are already closed
+        if pane_start < self._next_window_start:
+            self.stats["late"] += 1
+            return _CONSUMED
+
+        slot = self._slots.get(path)
+        if slot is None:
+            slot = self._slots[path] = len(self._paths)
+            self._paths.append(path)
+            self.stats["leaves"] = len(self._paths)
+
+        self._get_pane(pane_start).add(slot, timestamp, value)
+        self.stats["samples"] += 1
+
+        return _CONSUMED
+
+    def _get_pane(self, pane_start: int) -> _Pane:
+        for index in range(len(self._panes) - 1, -1, -1):
+            if self._panes[index].start == pane_start:
+                return self._panes[index]
+
+            if self._panes[index].start < pane_start:
+                self._panes.insert(index + 1, _Pane(pane_start))
+                return self._panes[index + 1]
+
+        self._panes.insert(0, _Pane(pane_start))
+        return self._panes[0]
+
+    def _close_windows(self, timestamp: int) -> list:
+        result = []
+
+        while self._next_window_start is not None and timestamp >= self._next_window_start + self._window:
+            window_start = self._next_window_start
+            window_end = window_start + self._window
+            panes = [pane for pane in self._panes if window_start <= pane.start < window_end]
+
+            if panes:
+                result.append(self._render(window_start, window_end, panes))
+
+            self._next_window_start += self._slide
+            self._panes = [pane for pane in self._panes if pane.start >= self._next_window_start]
+
+            # Skip the windows without data
+            if not self._panes:
+                self._next_window_start = max(
+                    self._next_window_start, timestamp - timestamp % self._slide - self._window + self._slide
+                )
+
+        return result
+
+    def _render(self, window_start: int, window_end: int, panes: list) -> dict:
+        values = {}
+
+        for slot, path in enumerate(self._paths):
+            count = 0
+            total = 0.0
+            minimum = maximum = last = None
+            last_timestamp = -1
+
+            for pane in panes:
+                if slot >= len(pane.counts) or not pane.counts[slot]:
+                    continue
+
+                if not count or pane.mins[slot] < minimum:
+                    minimum = pane.mins[slot]
+                if not count or pane.maxs[slot] > maximum:
+                    maximum = pane.maxs[slot]
+                if pane.last_timestamps[slot] >= last_timestamp:
+                    last_timestamp = pane.last_timestamps[slot]
+                    last = pane.lasts[slot]
+
+                count += pane.counts[slot]
+                total += pane.sums[slot]
+
+            if count:
+                aggregates = {"min": minimum, "max": maximum, "avg": total / count, "last": last, "count": count}
+                values[path] = {function: aggregates[function] for function in self._selected_functions}
+
+        self.stats["windows"] += 1
+
+        return {"aggregate": {"start": window_start, "end": window_end, "values": values}}
+
+
+class Deduplicator(object):
+    """
+    Stage suppressing the redundant values, i.e., the leaves with the same value as the last
+    forwarded one, which gives ON_CHANGE semantics for the subscriptions in SAMPLE mode or to
+    the targets ignoring suppress_redundant. Only the hashes of the values are stored per leaf.
+
+    heartbeat_interval: re-emit the unchanged value, if it was not forwarded for that many seconds
+    paths: list of path patterns (see PathPatternIndex) to deduplicate; all leaves by default
+
+    Leaves of JSON values are compared individually, and only the changed ones are forwarded.
+    Updates left without any content are dropped. Deletes and "resync" forget the stored values,
+    so the state re-appearing after them is always forwarded.
+    """
+
+    def __init__(self, heartbeat_interval: float = None, paths: list = None):
+        self._heartbeat_interval = int(heartbeat_interval * 1e9) if heartbeat_interval else None
+
+        self._patterns = None
+        if paths:
+            self._patterns = PathPatternIndex()
+            for path in paths:
+                self._patterns.add(path, True)
+
+        self._store = _LeafStore(value_typecode="q")
+        self.stats = {"leaves": 0, "forwarded": 0, "suppressed": 0}
+
+    def __call__(self, update: dict):
+        if not update:
+            return update
+
+        if "resync" in update:
+            self._store.discard("")
+
+        if "update" not in update:
+            return update
+
+        notification = update["update"]
+        prefix = notification.get("prefix")
+        timestamp = notification.get("timestamp") or time.time_ns()
+
+        for delete_entry in notification.get("delete", []):
+            self._store.discard(join_xpath(prefix, delete_entry.get("path")))
+
+        is_changed = False
+        passed_entries = []
+        for update_entry in notification.get("update", []):
+            value = update_entry.get("val")
+            remainder = self._filter(join_xpath(prefix, update_entry.get("path")), value, timestamp)
+
+            if remainder is value:
+                passed_entries.append(update_entry)
+
+            elif remainder is not _CONSUMED:
+                passed_entries.append(dict(update_entry, val=remainder))
+                is_changed = True
+
+            else:
+                is_changed = True
+
+        self.stats["leaves"] = len(self._store)
+
+        if not is_changed:
+            return update
+
+        if not passed_entries and not notification.get("delete") and len(update) == 1:
+            return None
+
+        return dict(update, update=dict(notification, update=passed_entries))
+
+    def _filter(self, path: str, value, timestamp: int):
+        """Returns the part of the value, which shall be forwarded"""
+        if isinstance(value, dict) and value:
+            remainder = {}
+            for v_name, v_value in value.items():
+                v_remainder = self._filter(f"{path}/{v_name}" if path else v_name, v_value, timestamp)
+
+                if v_remainder is not _CONSUMED:
+                    remainder[v_name] = v_remainder
+
+            if len(remainder) == len(value):
+                return value
+
+            return remainder or _CONSUMED
+
+        if self._patterns is not None and not self._patterns.match(path):
+            return value
+
+        value_hash = _hash_value(value)
+        slot = self._store.get_slot(path)
+
+        if slot is None:
+            self._store.add(path, timestamp, value_hash)
+
+        elif self._store.values[slot] != value_hash or (
+            self._heartbeat_interval and timestamp - self._store.timestamps[slot] >= self._heartbeat_interval
+        ):
+            self._store.values[slot] = value_hash
+            self._store.timestamps[slot] = timestamp
+
+        else:
+            self.stats["suppressed"] += 1
+            return _CONSUMED
+
+        self.stats["forwarded"] += 1
+
+        return value
+
+
+# User-defined functions
+def _as_counter(value) -> int:
+    """Returns the counter value, or None if the value isn't the counter. The 64-bit integers
+    are encoded as the strings in JSON_IETF (RFC 7951), so the strings of digits are counters too"""
+    if isinstance(value, str):
+        if not value.isdigit() or not value.isascii():
+            return None
+        value = int(value)
+
+    elif not isinstance(value, int) or isinstance(value, bool):
+        return None
+
+    return value if 0 <= value <= _MAX_UINT64 else None
+
+
+def _hash_value(value) -> int:
+    """Returns the hash of the value, which distinguishes the types (e.g., 1, 1.0 and True)"""
+    if isinstance(value, (list, tuple)):
+        return hash((list, tuple(_hash_value(item) for item in value)))
+
+    if isinstance(value, dict):
+        return hash((dict, tuple(sorted((v_name, _hash_value(v_value)) for v_name, v_value in value.items()))))
+
+    try:
+        return hash((type(value), value))
+
+    except TypeError:
+        return hash((type(value), repr(value)))
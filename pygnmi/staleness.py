@@ -0,0 +1,176 @@
+"""This module contains the monitoring of the staleness of the subscribed paths
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import logging
+import threading
+import time
+
+
+# Own modules
+from pygnmi.create_gnmi_path import join_xpath
+from pygnmi.path_patterns import PathPatternIndex
+
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+# Classes
+class _TrackedPath(object):
+    """Subscribed path with the time it has been last seen"""
+
+    __slots__ = ("path", "timeout", "last_seen", "is_stale", "is_tracked")
+
+    def __init__(self, path: str, timeout: float, last_seen: float):
+        self.path = path
+        self.timeout = timeout
+        self.last_seen = last_seen
+        self.is_stale = False
+        self.is_tracked = True
+
+
+class StalenessMonitor(object):
+    """
+    Monitor of the subscribed paths, which raises the staleness event if no update is received
+    for the path (or anything below it) for factor * interval seconds, where interval is the
+    heartbeat_interval or sample_interval of the subscription.
+
+    Updates only refresh the time the path is last seen, while the deadlines are kept in the hashed
+    timing wheel with the given resolution (in seconds). Each slot of the wheel is checked once per
+    revolution, and the paths refreshed in the meantime are moved to the slot of the new deadline,
+    so neither updates nor checks scan all the tracked paths.
+
+    Each path is reported once until it is refreshed, with callback({"stale": {"path": ..., "age": ...,
+    "timeout": ...}}). When the stale path is refreshed, callback({"fresh": {"path": ..., "gap": ...}})
+    is called. The object is used as the stage of the subscription (see gNMIclient.subscribe_stream()).
+    """
+
+    _wheel_size = 512
+
+    def __init__(self, factor: float = 3.0, resolution: float = 0.1, callback=None):
+        self.factor = factor
+        self.callback = callback
+        self._resolution = resolution
+        self._index = PathPatternIndex()
+        self._wheel = [[] for _ in range(self._wheel_size)]
+        self._tick = 0
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+        self.stats = {"tracked": 0, "stale": 0, "stale_events": 0}
+
+    def __call__(self, update: dict) -> dict:
+        if not update or "update" not in update:
+            return update
+
+        notification = update["update"]
+        prefix = notification.get("prefix")
+        now = time.monotonic()
+
+        for entry in notification.get("update", []) + notification.get("delete", []):
+            for tracked in self._index.match(join_xpath(prefix, entry.get("path"))):
+                last_seen, tracked.last_seen = tracked.last_seen, now
+
+                if tracked.is_stale:
+                    self._refresh(tracked, now - last_seen)
+
+        return update
+
+    def track(self, path: str, interval: float) -> None:
+        """Starts monitoring of the path, which is expected to be updated every interval seconds"""
+        tracked = _TrackedPath(path, interval * self.factor, time.monotonic())
+        self._index.add(f"{path}/..." if path else "...", tracked)
+
+        with self._lock:
+            self._schedule(tracked)
+            self.stats["tracked"] = len(self._index)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pygnmi-staleness", daemon=True)
+                self._thread.start()
+
+    def untrack(self, path: str) -> None:
+        """Stops monitoring of the path"""
+        pattern = f"{path}/..." if path else "..."
+
+        # Removed paths are dropped by the wheel lazily
+        for e_pattern, tracked in self._index.items():
+            if e_pattern == pattern:
+                tracked.is_tracked = False
+
+        self._index.remove(pattern)
+
+        with self._lock:
+            self.stats["tracked"] = len(self._index)
+            self.stats["stale"] = len(self.stale_paths())
+
+    def stale_paths(self) -> list:
+        """Returns the list of paths, which are currently stale"""
+        return [tracked.path for _, tracked in self._index.items() if tracked.is_stale]
+
+    def close(self) -> None:
+        """Stops the monitoring"""
+        self._closed.set()
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _schedule(self, tracked: _TrackedPath) -> None:
+        """Puts the path to the slot of its deadline, the lock must be held"""
+        deadline_tick = int((tracked.last_seen + tracked.timeout - self._started_at) / self._resolution) + 1
+        self._wheel[max(deadline_tick, self._tick + 1) % self._wheel_size].append(tracked)
+
+    def _refresh(self, tracked: _TrackedPath, gap: float) -> None:
+        with self._lock:
+            if not tracked.is_stale or not tracked.is_tracked:
+                return
+
+            tracked.is_stale = False
+            self._schedule(tracked)
+            self.stats["stale"] -= 1
+
+        logger.info(f"Path {tracked.path} is updated again")
+        self._emit({"fresh": {"path": tracked.path, "gap": gap}})
+
+    def _run(self) -> None:
+        while not self._closed.wait(
+            max(0.0, self._started_at + (self._tick + 1) * self._resolution - time.monotonic())
+        ):
+            events = []
+
+            with self._lock:
+                self._tick += 1
+                now = time.monotonic()
+                slot = self._wheel[self._tick % self._wheel_size]
+                self._wheel[self._tick % self._wheel_size] = []
+
+                for tracked in slot:
+                    if tracked.is_stale or not tracked.is_tracked:
+                        continue
+
+                    if now - tracked.last_seen >= tracked.timeout:
+                        tracked.is_stale = True
+                        self.stats["stale"] += 1
+                        self.stats["stale_events"] += 1
+                        events.append(
+                            {"stale": {"path": tracked.path, "age": now - tracked.last_seen, "timeout": tracked.timeout}}
+                        )
+
+                    else:
+                        self._schedule(tracked)
+
+            for event in events:
+                logger.warning(f"Path {event['stale']['path']} is not updated for {event['stale']['age']:.3f}s")
+                self._emit(event)
+
+    def _emit(self, event: dict) -> None:
+        if self.callback is None:
+            return
+
+        try:
+            self.callback(event)
+
+        except Exception as err:
+            logger.error(f"Callback failed on the staleness event: {err}")
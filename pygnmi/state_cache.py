@@ -0,0 +1,310 @@
+"""This module contains the last-value cache of the telemetry state
+(c)2019-2024, karneliuk.com"""
+
+# Modules
+import threading
+from copy import deepcopy
+
+
+# Own modules
+from pygnmi.create_gnmi_path import split_xpath, parse_xpath_element
+
+
+# Classes
+class _CacheNode(object):
+    """Single element of the state tree"""
+
+    __slots__ = ("children", "value", "timestamp", "is_leaf", "generation")
+
+    def __init__(self):
+        self.children = {}
+        self.value = None
+        self.timestamp = 0
+        self.is_leaf = False
+        self.generation = 0
+
+
+class StateCache(object):
+    """
+    Last-value cache of the telemetry state, built out of the updates returned by telemetryParser().
+
+    The state is stored as the tree indexed by the path elements, so each update and delete costs
+    O(depth of the path). Deletes remove the whole subtree. Each leaf keeps the timestamp of the
+    notification, which has set its value. JSON values (json_val / json_ietf_val) are expanded into
+    the individual leaves, unless explode_json is set to False.
+
+    The object can be used as a stage of the subscription (see gNMIclient.subscribe_stream()),
+    as calling it applies the update and returns it unchanged. All the methods are thread-safe.
+    When the subscription is re-established after the failure (the "resync" update), the leaves,
+    which are not refreshed by the time of the next sync_response, are removed from the cache.
+
+    Paths used in lookups and queries have the same format as in gNMIclient.get(). Queries also
+    accept wildcards:
+      - "*" matches any single element, e.g. "interfaces/*/state"
+      - "..." matches any number of elements, e.g. "interfaces/.../in-octets"
+      - "[key=*]" matches any value of the key, e.g. "interfaces/interface[name=*]/state"
+    """
+
+    def __init__(self, explode_json: bool = True):
+        self._root = _CacheNode()
+        self._lock = threading.RLock()
+        self._explode_json = explode_json
+        self._generation = 0
+        self._resync_pending = False
+
+    def __call__(self, update: dict) -> dict:
+        self.apply(update)
+
+        return update
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for _ in self._iter_leaves(self._root, []))
+
+    def apply(self, update: dict) -> None:
+        """Applies the update in the format of telemetryParser() to the cache.
+        Deletes are processed before updates, as mandated by gNMI specification."""
+        if not update:
+            return
+
+        if "resync" in update:
+            with self._lock:
+                self._generation += 1
+                self._resync_pending = True
+
+        if "sync_response" in update and self._resync_pending:
+            with self._lock:
+                self._sweep(self._root)
+                self._resync_pending = False
+
+        if "update" not in update:
+            return
+
+        notification = update["update"]
+        prefix = split_xpath(notification.get("prefix"))
+        timestamp = notification.get("timestamp", 0)
+
+        with self._lock:
+            for delete_entry in notification.get("delete", []):
+                self._delete(prefix + split_xpath(delete_entry.get("path")))
+
+            for update_entry in notification.get("update", []):
+                self._set(prefix + split_xpath(update_entry.get("path")), update_entry.get("val"), timestamp)
+
+    def set(self, path: str, value, timestamp: int = 0) -> None:
+        """Sets the value of the path"""
+        with self._lock:
+            self._set(split_xpath(path), value, timestamp)
+
+    def delete(self, path: str) -> None:
+        """Removes the path with the whole subtree below it"""
+        with self._lock:
+            self._delete(split_xpath(path))
+
+    def clear(self) -> None:
+        """Removes all the content of the cache"""
+        with self._lock:
+            self._root = _CacheNode()
+
+    def lookup(self, path: str) -> tuple:
+        """Returns the tuple (value, timestamp) of the leaf, or None if there is no such leaf"""
+        with self._lock:
+            node = self._find(split_xpath(path))
+
+            if node is None or not node.is_leaf:
+                return None
+
+            return node.value, node.timestamp
+
+    def get(self, path: str = None, default=None):
+        """Returns the value of the leaf or the nested dictionary with the subtree below the path"""
+        with self._lock:
+            node = self._find(split_xpath(path))
+
+            if node is None:
+                return default
+
+            return self._render(node, with_timestamps=False)
+
+    def snapshot(self, path: str = None, with_timestamps: bool = False):
+        """Returns the copy of the state below the path as the nested dictionary.
+        If with_timestamps is set, each leaf is returned as the tuple (value, timestamp)."""
+        with self._lock:
+            node = self._find(split_xpath(path))
+
+            if node is None:
+                return {}
+
+            return self._render(node, with_timestamps=with_timestamps)
+
+    def query(self, pattern: str = None) -> list:
+        """Returns the list of tuples (path, value, timestamp) for all the leaves at or below
+        the paths matching the pattern"""
+        result = []
+        seen_leaves = set()
+
+        with self._lock:
+            for elements, node in self._match(self._root, [], split_xpath(pattern)):
+                for leaf_elements, leaf in self._iter_leaves(node, elements):
+                    # "..." may match both the node and its descendants
+                    if id(leaf) not in seen_leaves:
+                        seen_leaves.add(id(leaf))
+                        result.append(("/".join(leaf_elements), deepcopy(leaf.value), leaf.timestamp))
+
+        return result
+
+    def _set(self, elements: list, value, timestamp: int) -> None:
+        node = self._root
+        for element in elements[:-1]:
+            if node.is_leaf:
+                node.is_leaf = False
+                node.value = None
+
+            child = node.children.get(element)
+            if child is None:
+                child = node.children[element] = _CacheNode()
+
+            node = child
+
+        if elements:
+            self._set_child(node, elements[-1], value, timestamp)
+
+        elif self._explode_json and isinstance(value, dict):
+            for v_name, v_value in value.items():
+                self._set_child(node, v_name, v_value, timestamp)
+
+    def _set_child(self, node: _CacheNode, element: str, value, timestamp: int) -> None:
+        # Leaf becomes container, if something is added below it
+        if node.is_leaf:
+            node.is_leaf = False
+            node.value = None
+
+        child = node.children.get(element)
+        if child is None:
+            child = node.children[element] = _CacheNode()
+
+        if self._explode_json and isinstance(value, dict):
+            for v_name, v_value in value.items():
+                self._set_child(child, v_name, v_value, timestamp)
+
+        else:
+            child.children = {}
+            child.is_leaf = True
+            child.value = value
+            child.timestamp = timestamp
+            child.generation = self._generation
+
+    def _delete(self, elements: list) -> None:
+        if not elements:
+            self._root = _CacheNode()
+            return
+
+        # Deletes may contain wildcards
+        if any(_is_wildcard(element) for element in elements):
+            for matched_elements, _ in list(self._match(self._root, [], elements)):
+                self._delete(matched_elements)
+
+            return
+
+        trail = [self._root]
+        for element in elements[:-1]:
+            node = trail[-1].children.get(element)
+            if node is None:
+                return
+
+            trail.append(node)
+
+        if trail[-1].children.pop(elements[-1], None) is None:
+            return
+
+        # Prune the branches, which became empty
+        for depth in range(len(trail) - 1, 0, -1):
+            if trail[depth].children or trail[depth].is_leaf:
+                break
+
+            del trail[depth - 1].children[elements[depth - 1]]
+
+    def _sweep(self, node: _CacheNode) -> bool:
+        """Removes the leaves set before the current generation, returns True if the node became empty"""
+        for child_name, child in list(node.children.items()):
+            if self._sweep(child):
+                del node.children[child_name]
+
+        if node.is_leaf and node.generation < self._generation:
+            node.is_leaf = False
+            node.value = None
+
+        return not node.is_leaf and not node.children
+
+    def _find(self, elements: list) -> _CacheNode:
+        node = self._root
+        for element in elements:
+            node = node.children.get(element)
+            if node is None:
+                return None
+
+        return node
+
+    def _match(self, node: _CacheNode, trail: list, elements: list):
+        """Yields the tuples (path elements, node) for the nodes matching the pattern"""
+        if not elements:
+            yield trail, node
+            return
+
+        element, rest = elements[0], elements[1:]
+
+        if element == "...":
+            yield from self._match(node, trail, rest)
+
+            for child_name, child in list(node.children.items()):
+                yield from self._match(child, trail + [child_name], elements)
+
+        elif element == "*":
+            for child_name, child in list(node.children.items()):
+                yield from self._match(child, trail + [child_name], rest)
+
+        elif _is_wildcard(element):
+            for child_name, child in list(node.children.items()):
+                if _element_matches(element, child_name):
+                    yield from self._match(child, trail + [child_name], rest)
+
+        else:
+            child = node.children.get(element)
+            if child is not None:
+                yield from self._match(child, trail + [element], rest)
+
+    def _iter_leaves(self, node: _CacheNode, trail: list):
+        if node.is_leaf:
+            yield trail, node
+
+        for child_name, child in node.children.items():
+            yield from self._iter_leaves(child, trail + [child_name])
+
+    def _render(self, node: _CacheNode, with_timestamps: bool):
+        if node.is_leaf:
+            return (deepcopy(node.value), node.timestamp) if with_timestamps else deepcopy(node.value)
+
+        return {
+            child_name: self._render(child, with_timestamps=with_timestamps)
+            for child_name, child in node.children.items()
+        }
+
+
+# User-defined functions
+def _is_wildcard(element: str) -> bool:
+    return element in {"*", "..."} or "=*]" in element
+
+
+def _element_matches(pattern: str, element: str) -> bool:
+    """Checks if the element matches the pattern with the key wildcards"""
+    pattern_name, pattern_keys = parse_xpath_element(pattern)
+    element_name, element_keys = parse_xpath_element(element)
+
+    if pattern_name not in {"*", element_name}:
+        return False
+
+    for pk_name, pk_value in pattern_keys.items():
+        if pk_name not in element_keys or pk_value not in {"*", element_keys[pk_name]}:
+            return False
+
+    return True
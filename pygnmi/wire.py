@@ -0,0 +1,108 @@
+"""This module contains the helpers for the serialized gNMI messages
+(c)2019-2024, karneliuk.com"""
+
+# Statics
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH_DELIMITED = 2
+_WIRE_FIXED32 = 5
+
+# Field numbers of SubscribeResponse and Notification in gnmi.proto
+_RESPONSE_UPDATE = 1
+_RESPONSE_SYNC_RESPONSE = 3
+_RESPONSE_ERROR = 4
+_NOTIFICATION_TIMESTAMP = 1
+
+
+# User-defined functions
+def peek_subscribe_response(data) -> dict:
+    """
+    Reads the header of the serialized SubscribeResponse without decoding the whole message.
+
+    Returns {"timestamp": ...} for the notification, {"sync_response": ...} for the end of the
+    synchronisation and {"error": True} for the deprecated error message. Only the tags and
+    lengths of the top-level fields are read, the content of the updates is skipped.
+    """
+    view = memoryview(data)
+    result = {}
+    position = 0
+
+    while position < len(view):
+        field, wire_type, position = _read_tag(view, position)
+
+        if wire_type == _WIRE_VARINT:
+            value, position = _read_varint(view, position)
+
+            if field == _RESPONSE_SYNC_RESPONSE:
+                result["sync_response"] = bool(value)
+
+        elif wire_type == _WIRE_LENGTH_DELIMITED:
+            length, position = _read_varint(view, position)
+
+            if field == _RESPONSE_UPDATE:
+                result["timestamp"] = _peek_timestamp(view[position : position + length])
+
+            elif field == _RESPONSE_ERROR:
+                result["error"] = True
+
+            position += length
+
+        else:
+            position = _skip_fixed(wire_type, position)
+
+    return result
+
+
+def _peek_timestamp(view: memoryview) -> int:
+    """Returns the timestamp of the serialized Notification, 0 if it is not set"""
+    position = 0
+
+    while position < len(view):
+        field, wire_type, position = _read_tag(view, position)
+
+        if wire_type == _WIRE_VARINT:
+            value, position = _read_varint(view, position)
+
+            if field == _NOTIFICATION_TIMESTAMP:
+                # int64 is encoded as the two's complement
+                return value - 2**64 if value >= 2**63 else value
+
+        elif wire_type == _WIRE_LENGTH_DELIMITED:
+            length, position = _read_varint(view, position)
+            position += length
+
+        else:
+            position = _skip_fixed(wire_type, position)
+
+    return 0
+
+
+def _read_tag(view: memoryview, position: int) -> tuple:
+    key, position = _read_varint(view, position)
+
+    return key >> 3, key & 0x07, position
+
+
+def _read_varint(view: memoryview, position: int) -> tuple:
+    result = 0
+    shift = 0
+
+    while True:
+        byte = view[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+
+        if not byte & 0x80:
+            return result, position
+
+        shift += 7
+
+
+def _skip_fixed(wire_type: int, position: int) -> int:
+    if wire_type == _WIRE_FIXED64:
+        return position + 8
+
+    if wire_type == _WIRE_FIXED32:
+        return position + 4
+
+    raise ValueError(f"Unsupported wire type {wire_type} in the serialized message.")
@@ -0,0 +1,101 @@
+"""
+Local gNMI server for the unit tests, which need the target to connect to
+"""
+# Modules
+import datetime
+import time
+from concurrent import futures
+import grpc
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from pygnmi.create_gnmi_path import gnmi_path_generator
+from pygnmi.spec.v080 import gnmi_pb2, gnmi_pb2_grpc
+
+
+# Classes
+class LocalServicer(gnmi_pb2_grpc.gNMIServicer):
+    """
+    gNMI server supporting JSON encoding: Get returns the MTU, STREAM subscription sends it each interval,
+    with sync_response sync_delay seconds after the first update, or is rejected with subscribe_status
+    (grpc.StatusCode) if it is set
+    """
+
+    def __init__(self, interval: float = 0.05, subscribe_status: grpc.StatusCode = None, sync_delay: float = 0):
+        self.interval = interval
+        self.subscribe_status = subscribe_status
+        self.sync_delay = sync_delay
+        self.calls = {"Capabilities": 0, "Get": 0, "Subscribe": 0}
+
+    def Capabilities(self, request, context):
+        self.calls["Capabilities"] += 1
+        return gnmi_pb2.CapabilityResponse(supported_encodings=[gnmi_pb2.JSON], gNMI_version="0.8.0")
+
+    def Get(self, request, context):
+        self.calls["Get"] += 1
+        return gnmi_pb2.GetResponse(notification=[_notification()])
+
+    def Subscribe(self, request_iterator, context):
+        self.calls["Subscribe"] += 1
+        next(request_iterator)
+
+        if self.subscribe_status is not None:
+            context.abort(self.subscribe_status, "Subscription is rejected")
+
+        yield gnmi_pb2.SubscribeResponse(update=_notification())
+        time.sleep(self.sync_delay)
+        yield gnmi_pb2.SubscribeResponse(sync_response=True)
+
+        while context.is_active():
+            time.sleep(self.interval)
+            yield gnmi_pb2.SubscribeResponse(update=_notification())
+
+
+# User-defined functions
+def start_server(servicer: LocalServicer = None, port: int = 0, certificate: tuple = None):
+    """Starts the server on localhost, TLS if certificate (key, cert) is provided; returns (server, port)"""
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    gnmi_pb2_grpc.add_gNMIServicer_to_server(servicer or LocalServicer(), server)
+
+    if certificate:
+        port = server.add_secure_port(f"localhost:{port}", grpc.ssl_server_credentials([certificate]))
+    else:
+        port = server.add_insecure_port(f"localhost:{port}")
+
+    server.start()
+    return server, port
+
+
+def make_certificate(name: str, alt_names: list = None) -> tuple:
+    """Returns the PEM private key and self-signed certificate with the CN name and SANs alt_names (name by default)"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, name)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(subject)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=30))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName(alt_name) for alt_name in alt_names or [name]]), critical=False
+        )
+        .sign(key, hashes.SHA256())
+    )
+
+    return (
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()),
+        certificate.public_bytes(serialization.Encoding.PEM),
+    )
+
+
+def _notification() -> gnmi_pb2.Notification:
+    return gnmi_pb2.Notification(
+        timestamp=time.time_ns(),
+        prefix=gnmi_path_generator("interfaces/interface[name=Ethernet1]"),
+        update=[gnmi_pb2.Update(path=gnmi_path_generator("state/mtu"), val=gnmi_pb2.TypedValue(uint_val=1500))],
+    )
@@ -79,3 +79,50 @@ def test_telemetry_poll(subscribe1: dict = test_telemetry_dict_poll):
         telemetry_iterator.close()
 
     del gconn
+
+
+def test_telemetry_stream_incremental_sync(subscribe1: dict = test_telemetry_dict):
+    """
+    Unit test: Testing Subscribe with streaming telemetry and incremental initial synchronisation
+    """
+    with gNMIclient(target=(ENV_ADDRESS, ENV_PORT),
+                    username=ENV_USERNAME,
+                    password=ENV_PASSWORD,
+                    path_cert=ENV_PATH_CERT) as gconn:
+        gconn.capabilities()
+
+        telemetry_iterator = gconn.subscribe2(subscribe=subscribe1, incremental_sync=True)
+
+        for telemetry_entry_item in telemetry_iterator:
+            if "sync_response" in telemetry_entry_item:
+                assert "update" not in telemetry_entry_item
+                break
+
+            assert telemetry_entry_item["sync_phase"] is True
+
+        telemetry_iterator.close()
+
+    del gconn
+
+
+def test_telemetry_close_all(subscribe1: dict = test_telemetry_dict):
+    """
+    Unit test: Testing closure of all the subscriptions of the client
+    """
+    with gNMIclient(target=(ENV_ADDRESS, ENV_PORT),
+                    username=ENV_USERNAME,
+                    password=ENV_PASSWORD,
+                    path_cert=ENV_PATH_CERT) as gconn:
+        gconn.capabilities()
+
+        telemetry_iterators = [gconn.subscribe2(subscribe=subscribe1) for _ in range(5)]
+        for telemetry_iterator in telemetry_iterators:
+            telemetry_iterator.__next__()
+
+        gconn.close_all()
+
+        for telemetry_iterator in telemetry_iterators:
+            assert not telemetry_iterator._subscribe_thread.is_alive()
+            assert list(telemetry_iterator) == []
+
+    del gconn
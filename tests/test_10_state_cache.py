@@ -0,0 +1,107 @@
+"""
+Collection of unit tests to test the last-value cache of the telemetry state
+"""
+# Modules
+from pygnmi.create_gnmi_path import split_xpath
+from pygnmi.state_cache import StateCache
+
+
+# Statics
+UPDATE1 = {
+    "update": {
+        "update": [
+            {"path": "state/counters/in-octets", "val": 10},
+            {"path": "state/oper-status", "val": "UP"},
+        ],
+        "timestamp": 100,
+        "prefix": "interfaces/interface[name=Ethernet1]",
+    }
+}
+
+UPDATE2 = {
+    "update": {
+        "update": [{"path": "state", "val": {"counters": {"in-octets": 5}, "mtu": 9000}}],
+        "timestamp": 200,
+        "prefix": "interfaces/interface[name=1/1/c1/1]",
+    }
+}
+
+UPDATE3 = {
+    "update": {
+        "update": [{"path": "interfaces/interface[name=Ethernet1]/state/counters/in-octets", "val": 20}],
+        "timestamp": 300,
+        "delete": [{"path": "interfaces/interface[name=1/1/c1/1]"}],
+    }
+}
+
+
+# Tests
+def test_split_xpath():
+    assert split_xpath("") == []
+    assert split_xpath("/") == []
+    assert split_xpath("openconfig-interfaces:interfaces/interface[name=1/1/c1/1]/state") == [
+        "interfaces",
+        "interface[name=1/1/c1/1]",
+        "state",
+    ]
+    assert split_xpath("/a/b[z=1][a=2]") == ["a", "b[a=2][z=1]"]
+
+
+def test_state_cache_update_and_delete():
+    cache = StateCache()
+
+    cache(UPDATE1)
+    cache(UPDATE2)
+    assert len(cache) == 4
+    assert cache.lookup("/interfaces/interface[name=1/1/c1/1]/state/mtu") == (9000, 200)
+
+    result = cache(UPDATE3)
+    assert result is UPDATE3
+    assert len(cache) == 2
+    assert cache.lookup("interfaces/interface[name=Ethernet1]/state/counters/in-octets") == (20, 300)
+    assert cache.lookup("interfaces/interface[name=Ethernet1]/state/oper-status") == ("UP", 100)
+    assert cache.snapshot() == {
+        "interfaces": {"interface[name=Ethernet1]": {"state": {"counters": {"in-octets": 20}, "oper-status": "UP"}}}
+    }
+
+    cache.delete("interfaces/interface[name=Ethernet1]/state/counters")
+    cache.delete("interfaces/interface[name=Ethernet1]/state/oper-status")
+    assert cache.snapshot() == {}
+
+
+def test_state_cache_query():
+    cache = StateCache()
+    cache(UPDATE1)
+    cache(UPDATE2)
+
+    assert sorted(p for p, _, _ in cache.query("interfaces/interface[name=*]/state/counters")) == [
+        "interfaces/interface[name=1/1/c1/1]/state/counters/in-octets",
+        "interfaces/interface[name=Ethernet1]/state/counters/in-octets",
+    ]
+    assert [v for _, v, _ in cache.query(".../mtu")] == [9000]
+    assert len(cache.query("interfaces/*/...")) == 4
+    assert cache.query("interfaces/interface[name=Ethernet2]") == []
+
+    cache.delete("interfaces/interface[name=*]/state/counters")
+    assert len(cache) == 2
+
+
+def test_state_cache_resync():
+    cache = StateCache()
+    cache(UPDATE1)
+    cache({"sync_response": True})
+
+    cache({"resync": {"reconnects": 1, "gap": 1.0, "reason": "stream ended"}})
+    cache(
+        {
+            "update": {
+                "update": [{"path": "state/oper-status", "val": "DOWN"}],
+                "timestamp": 400,
+                "prefix": "interfaces/interface[name=Ethernet1]",
+            }
+        }
+    )
+    assert len(cache) == 2
+
+    cache({"sync_response": True})
+    assert cache.snapshot() == {"interfaces": {"interface[name=Ethernet1]": {"state": {"oper-status": "DOWN"}}}}
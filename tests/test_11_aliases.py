@@ -0,0 +1,36 @@
+"""
+Collection of unit tests to test resolution of aliases in telemetry
+"""
+# Modules
+from pygnmi.client import telemetryParser
+from pygnmi.create_gnmi_path import gnmi_path_generator
+from pygnmi.spec.v080.gnmi_pb2 import Notification, SubscribeResponse, TypedValue
+
+
+# Tests
+def test_target_defined_alias():
+    aliases = {}
+
+    definition = SubscribeResponse(
+        update=Notification(alias="#42", prefix=gnmi_path_generator("interfaces/interface[name=Ethernet1]"))
+    )
+    result = telemetryParser(definition, aliases=aliases)
+    assert result["update"]["alias"] == "#42"
+    assert result["update"]["timestamp"] == 0
+    assert aliases == {"#42": "interfaces/interface[name=Ethernet1]"}
+
+    notification = Notification(timestamp=1, prefix=gnmi_path_generator("#42/state"))
+    notification.update.add(path=gnmi_path_generator("mtu"), val=TypedValue(uint_val=1500))
+    result = telemetryParser(SubscribeResponse(update=notification), aliases=aliases)
+    assert result["update"]["prefix"] == "interfaces/interface[name=Ethernet1]/state"
+    assert result["update"]["update"] == [{"path": "mtu", "val": 1500}]
+
+    removal = SubscribeResponse(update=Notification(alias="#42"))
+    telemetryParser(removal, aliases=aliases)
+    assert aliases == {}
+
+
+def test_alias_without_table():
+    notification = Notification(timestamp=1, prefix=gnmi_path_generator("#42"))
+    result = telemetryParser(SubscribeResponse(update=notification))
+    assert result["update"]["prefix"] == "#42"
@@ -0,0 +1,88 @@
+"""
+Collection of unit tests to test dispatching of telemetry to callbacks
+"""
+# Modules
+from pygnmi.dispatcher import PathDispatcher
+
+
+# Statics
+UPDATE1 = {
+    "update": {
+        "update": [
+            {"path": "state/counters/in-octets", "val": 10},
+            {"path": "state/oper-status", "val": "UP"},
+        ],
+        "timestamp": 100,
+        "prefix": "interfaces/interface[name=Ethernet1]",
+        "delete": [{"path": "subinterfaces/subinterface[index=0]"}],
+    }
+}
+
+
+# Tests
+def test_dispatcher_patterns():
+    dispatcher = PathDispatcher()
+    dispatcher.on("interfaces/interface[name=Ethernet1]/state/oper-status", print)
+    dispatcher.on("interfaces/interface[name=*]/state/oper-status", print)
+    dispatcher.on("interfaces/*/state/*", print)
+    dispatcher.on("interfaces/.../in-octets", print)
+    dispatcher.on("...", print)
+    dispatcher.on("openconfig-interfaces:interfaces/interface[name=*]/.../oper-status", print)
+
+    assert dispatcher.match("interfaces/interface[name=Ethernet1]/state/oper-status") == [
+        "interfaces/interface[name=Ethernet1]/state/oper-status",
+        "interfaces/interface[name=*]/state/oper-status",
+        "interfaces/*/state/*",
+        "...",
+        "openconfig-interfaces:interfaces/interface[name=*]/.../oper-status",
+    ]
+    assert dispatcher.match("interfaces/interface[name=Ethernet2]/state/counters/in-octets") == [
+        "interfaces/.../in-octets",
+        "...",
+    ]
+
+    dispatcher.off("...")
+    assert dispatcher.match("system/state/hostname") == []
+
+
+def test_dispatcher_off_compiles_once():
+    dispatcher = PathDispatcher()
+    for callback in (print, repr, str):
+        dispatcher.on("interfaces/...", callback)
+    dispatcher.on("system/...", print)
+
+    compiles = []
+    compile_index = dispatcher._index._compile
+    dispatcher._index._compile = lambda: compiles.append(compile_index())
+
+    dispatcher.off("interfaces/...", repr)
+    assert dispatcher.match("interfaces/interface") == ["interfaces/...", "interfaces/..."]
+
+    dispatcher.off("interfaces/...")
+    dispatcher.off("interfaces/...")
+    assert dispatcher.match("interfaces/interface") == []
+    assert dispatcher.match("system/state") == ["system/..."]
+    assert len(compiles) == 2
+
+
+def test_dispatcher_callbacks():
+    received = []
+    dispatcher = PathDispatcher()
+    dispatcher.on("interfaces/interface[name=*]/state/oper-status", received.append)
+    dispatcher.on("interfaces/interface[name=*]/subinterfaces/...", received.append)
+    dispatcher.on("interfaces/interface[name=*]/state/counters/in-octets", lambda leaf: 1 / 0)
+
+    assert dispatcher(UPDATE1) is UPDATE1
+    assert received == [
+        {
+            "path": "interfaces/interface[name=Ethernet1]/subinterfaces/subinterface[index=0]",
+            "val": None,
+            "timestamp": 100,
+            "op": "delete",
+        },
+        {"path": "interfaces/interface[name=Ethernet1]/state/oper-status", "val": "UP", "timestamp": 100, "op": "update"},
+    ]
+
+    stats = dispatcher.stats()
+    assert [entry["calls"] for entry in stats] == [1, 1, 1]
+    assert [entry["errors"] for entry in stats] == [0, 0, 1]
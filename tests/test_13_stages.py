@@ -0,0 +1,171 @@
+"""
+Collection of unit tests to test the stages processing telemetry
+"""
+# Modules
+from pygnmi.stages import CounterRates, WindowAggregator, Deduplicator
+
+
+# User-defined functions
+def _counters(timestamp: int, in_octets: int, out_octets: int, prefix: str = "interfaces/interface[name=Ethernet1]"):
+    return {
+        "update": {
+            "update": [
+                {"path": "state/counters/in-octets", "val": in_octets},
+                {"path": "state/counters", "val": {"out-octets": out_octets, "last-clear": "never"}},
+                {"path": "state/oper-status", "val": "UP"},
+            ],
+            "timestamp": timestamp,
+            "prefix": prefix,
+        }
+    }
+
+
+# Tests
+def test_counter_rates():
+    rates = CounterRates()
+
+    result = rates(_counters(10**9, 1000, 500))
+    assert all("rate" not in entry for entry in result["update"]["update"])
+
+    result = rates(_counters(3 * 10**9, 3000, 1500))
+    assert result["update"]["update"][0]["rate"] == 1000.0
+    assert result["update"]["update"][1]["rate"] == {"out-octets": 500.0}
+    assert "rate" not in result["update"]["update"][2]
+
+    # 32-bit wrap for in-octets, reset for out-octets
+    result = rates(_counters(4 * 10**9, 2**32 - 1000, 1600))
+    result = rates(_counters(5 * 10**9, 1000, 50))
+    assert result["update"]["update"][0]["rate"] == 2000.0
+    assert "rate" not in result["update"]["update"][1]
+    assert rates.stats["wraps"] == 1
+    assert rates.stats["resets"] == 1
+
+
+def test_counter_rates_selection():
+    rates = CounterRates(paths=["interfaces/interface[name=*]/state/counters/in-octets"])
+
+    rates(_counters(10**9, 1000, 500))
+    result = rates(_counters(2 * 10**9, 2000, 1000))
+    assert result["update"]["update"][0]["rate"] == 1000.0
+    assert "rate" not in result["update"]["update"][1]
+
+    rates({"update": {"update": [], "timestamp": 3 * 10**9, "delete": [{"path": "interfaces"}]}})
+    assert rates.stats["counters"] == 0
+
+
+def test_counter_rates_json_ietf():
+    rates = CounterRates()
+
+    # 64-bit counters are the strings in JSON_IETF
+    rates(_counters(10**9, "18446744073709550616", "500"))
+    result = rates(_counters(2 * 10**9, "1000", "2500"))
+    assert result["update"]["update"][0]["rate"] == 2000.0
+    assert result["update"]["update"][1]["rate"] == {"out-octets": 2000.0}
+    assert "rate" not in result["update"]["update"][2]
+    assert rates.stats["wraps"] == 1
+
+
+def test_counter_rates_delete():
+    rates = CounterRates()
+    rates(_counters(10**9, 1000, 500, prefix="interfaces/interface[name=1/1]"))
+    rates(_counters(10**9, 1000, 500, prefix="interfaces/interface[name=1/2]"))
+    assert rates.stats["counters"] == 4
+
+    rates({"update": {"update": [], "timestamp": 2 * 10**9, "delete": [{"path": "interfaces/interface[name=1/1]"}]}})
+    assert rates.stats["counters"] == 2
+    assert list(rates._store._tree["interfaces"]) == ["interface[name=1/2]"]
+
+    # The freed slots are reused
+    rates(_counters(3 * 10**9, 1000, 500, prefix="interfaces/interface[name=1/3]"))
+    assert len(rates._store.timestamps) == 4
+
+    rates({"update": {"update": [], "timestamp": 4 * 10**9, "delete": [{"path": "interfaces"}]}})
+    assert rates.stats["counters"] == 0
+    assert rates._store._tree == {}
+
+
+def test_window_aggregator_tumbling():
+    aggregator = WindowAggregator(window=10, functions=("min", "max", "avg", "last", "count"))
+
+    result = aggregator(_counters(10**9, 1000, 500))
+    assert len(result) == 1
+    assert result[0]["update"]["update"] == [
+        {"path": "state/counters", "val": {"last-clear": "never"}},
+        {"path": "state/oper-status", "val": "UP"},
+    ]
+
+    aggregator(_counters(5 * 10**9, 3000, 700))
+    result = aggregator(_counters(12 * 10**9, 4000, 800))
+    assert len(result) == 2
+    assert result[1]["aggregate"]["start"] == 0
+    assert result[1]["aggregate"]["end"] == 10 * 10**9
+    assert result[1]["aggregate"]["values"]["interfaces/interface[name=Ethernet1]/state/counters/in-octets"] == {
+        "min": 1000,
+        "max": 3000,
+        "avg": 2000.0,
+        "last": 3000,
+        "count": 2,
+    }
+
+    result = aggregator.flush()
+    assert len(result) == 1
+    assert result[0]["aggregate"]["start"] == 10 * 10**9
+    assert result[0]["aggregate"]["values"]["interfaces/interface[name=Ethernet1]/state/counters/out-octets"][
+        "count"
+    ] == 1
+
+
+def test_window_aggregator_sliding():
+    aggregator = WindowAggregator(
+        window=4, slide=2, functions=("max", "count"), paths=["interfaces/.../in-octets"]
+    )
+
+    for second in range(1, 9):
+        aggregator(_counters(second * 10**9, second * 100, 0))
+
+    assert aggregator.stats["windows"] == 3
+    assert aggregator.stats["leaves"] == 1
+
+    result = aggregator.flush()
+    assert [(update["aggregate"]["start"], update["aggregate"]["end"]) for update in result] == [
+        (6 * 10**9, 10 * 10**9),
+        (8 * 10**9, 12 * 10**9),
+    ]
+    assert result[0]["aggregate"]["values"] == {
+        "interfaces/interface[name=Ethernet1]/state/counters/in-octets": {"max": 800, "count": 3}
+    }
+
+    # Data of the closed windows is dropped
+    aggregator(_counters(5 * 10**9, 500, 0))
+    assert aggregator.stats["late"] == 1
+
+
+def test_deduplicator():
+    dedup = Deduplicator(heartbeat_interval=10)
+
+    assert dedup(_counters(10**9, 1000, 500)) == _counters(10**9, 1000, 500)
+
+    # Only changed leaves are forwarded
+    result = dedup(_counters(2 * 10**9, 1000, 600))
+    assert result["update"]["update"] == [{"path": "state/counters", "val": {"out-octets": 600}}]
+    assert dedup(_counters(3 * 10**9, 1000, 600)) is None
+    assert dedup.stats["suppressed"] == 7
+
+    # Heartbeat
+    result = dedup(_counters(11 * 10**9, 1000, 600))
+    assert result["update"]["update"] == [
+        {"path": "state/counters/in-octets", "val": 1000},
+        {"path": "state/counters", "val": {"last-clear": "never"}},
+        {"path": "state/oper-status", "val": "UP"},
+    ]
+
+    # Deleted state is forwarded again
+    dedup({"update": {"update": [], "timestamp": 12 * 10**9, "delete": [{"path": "interfaces"}]}})
+    assert dedup.stats["leaves"] == 0
+    assert dedup(_counters(13 * 10**9, 1000, 600)) == _counters(13 * 10**9, 1000, 600)
+
+    # Type of the value is compared as well
+    dedup = Deduplicator(paths=["interfaces/.../oper-status"])
+    dedup({"update": {"update": [{"path": "a", "val": 1}, {"path": "interfaces/oper-status", "val": 1}]}})
+    result = dedup({"update": {"update": [{"path": "a", "val": 1}, {"path": "interfaces/oper-status", "val": True}]}})
+    assert len(result["update"]["update"]) == 2
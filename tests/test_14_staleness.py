@@ -0,0 +1,81 @@
+"""
+Collection of unit tests to test the staleness monitoring of the subscribed paths
+"""
+# Modules
+import time
+from pygnmi.client import gNMIclient
+from pygnmi.staleness import StalenessMonitor
+from tests.servers import LocalServicer, start_server
+
+
+# Statics
+UPDATE = {
+    "update": {
+        "update": [{"path": "state/counters/in-octets", "val": 1000}],
+        "timestamp": 1000000000,
+        "prefix": "interfaces/interface[name=Ethernet1]",
+    }
+}
+
+
+# Tests
+def test_staleness_monitor():
+    events = []
+    monitor = StalenessMonitor(factor=2, resolution=0.01, callback=events.append)
+    monitor.track("interfaces/interface[name=Ethernet1]/state", 0.05)
+    monitor.track("system", 10)
+
+    try:
+        for _ in range(5):
+            time.sleep(0.03)
+            monitor(UPDATE)
+
+        assert events == []
+
+        time.sleep(0.3)
+        assert [event["stale"]["path"] for event in events] == ["interfaces/interface[name=Ethernet1]/state"]
+        assert monitor.stale_paths() == ["interfaces/interface[name=Ethernet1]/state"]
+
+        monitor(UPDATE)
+        assert events[-1]["fresh"]["path"] == "interfaces/interface[name=Ethernet1]/state"
+        assert monitor.stats == {"tracked": 2, "stale": 0, "stale_events": 1}
+
+        monitor.untrack("interfaces/interface[name=Ethernet1]/state")
+        time.sleep(0.3)
+        assert len(events) == 2
+
+    finally:
+        monitor.close()
+
+
+def test_staleness_during_initial_sync():
+    # The target sends the first update, then nothing for a second until the sync_response
+    server, port = start_server(LocalServicer(sync_delay=1))
+    subscribe = {
+        "subscription": [{"path": "interfaces", "mode": "sample", "sample_interval": 100000000}],
+        "mode": "stream",
+        "encoding": "json",
+    }
+
+    try:
+        with gNMIclient(target=("localhost", port), insecure=True) as gconn:
+            subscription = gconn.subscribe2(subscribe=subscribe, staleness=2)
+
+            try:
+                # The events are not merged into the coalesced update, but follow it
+                update = subscription.get_update(timeout=5)
+                assert update["sync_response"]
+                assert "stale" not in update
+
+                event = subscription.get_update(timeout=5)
+                assert event["stale"]["path"] == "interfaces"
+
+                while "fresh" not in event:
+                    event = subscription.get_update(timeout=5)
+                assert event["fresh"]["path"] == "interfaces"
+
+            finally:
+                subscription.close()
+
+    finally:
+        server.stop(0)
@@ -0,0 +1,48 @@
+"""
+Collection of unit tests to test the compact records of telemetry
+"""
+# Modules
+from pygnmi.client import telemetryParser, telemetryRecordParser
+from pygnmi.create_gnmi_path import gnmi_path_generator
+from pygnmi.records import UpdateRecord
+from pygnmi.spec.v080.gnmi_pb2 import Notification, SubscribeResponse, TypedValue
+
+
+# User-defined functions
+def _notification() -> SubscribeResponse:
+    notification = Notification(timestamp=1000, prefix=gnmi_path_generator("interfaces/interface[name=1/1/c1/1]"))
+    notification.update.add(path=gnmi_path_generator("state/mtu"), val=TypedValue(uint_val=1500))
+    notification.update.add(path=gnmi_path_generator("state"), val=TypedValue(json_val=b'{"enabled": true}'))
+    notification.delete.append(gnmi_path_generator("subinterfaces/subinterface[index=0]"))
+
+    return SubscribeResponse(update=notification)
+
+
+# Tests
+def test_update_records():
+    result = telemetryRecordParser(_notification())
+
+    assert result == (
+        UpdateRecord(1000, "interfaces/interface[name=1/1/c1/1]", "subinterfaces/subinterface[index=0]", None, "delete"),
+        UpdateRecord(1000, "interfaces/interface[name=1/1/c1/1]", "state/mtu", 1500, "update"),
+        UpdateRecord(1000, "interfaces/interface[name=1/1/c1/1]", "state", {"enabled": True}, "update"),
+    )
+    assert result[1].prefix is result[2].prefix
+
+    assert telemetryRecordParser(SubscribeResponse(sync_response=True)) == {"sync_response": True}
+
+
+def test_update_batch():
+    result = telemetryRecordParser(_notification(), batch=True)
+
+    assert result.timestamp == 1000
+    assert result.paths == ("state/mtu", "state")
+    assert result.values == (1500, {"enabled": True})
+    assert result.deletes == ("subinterfaces/subinterface[index=0]",)
+    assert tuple(result.records()) == telemetryRecordParser(_notification())
+
+    # The same content as in the dictionary format
+    dict_result = telemetryParser(_notification())
+    assert [{"path": path, "val": value} for path, value in zip(result.paths, result.values)] == dict_result[
+        "update"
+    ]["update"]
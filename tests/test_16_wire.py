@@ -0,0 +1,26 @@
+"""
+Collection of unit tests to test the helpers for the serialized gNMI messages
+"""
+# Modules
+from pygnmi.create_gnmi_path import gnmi_path_generator
+from pygnmi.spec.v080.gnmi_pb2 import Notification, SubscribeResponse, TypedValue
+from pygnmi.wire import peek_subscribe_response
+
+
+# Tests
+def test_peek_subscribe_response():
+    notification = Notification(prefix=gnmi_path_generator("interfaces/interface[name=Ethernet1]"))
+    notification.update.add(path=gnmi_path_generator("state/mtu"), val=TypedValue(double_val=1500.0))
+    notification.timestamp = 1700000000123456789
+
+    data = SubscribeResponse(update=notification).SerializeToString()
+    assert peek_subscribe_response(data) == {"timestamp": 1700000000123456789}
+    assert peek_subscribe_response(memoryview(data)) == {"timestamp": 1700000000123456789}
+
+    notification.timestamp = -1
+    assert peek_subscribe_response(SubscribeResponse(update=notification).SerializeToString()) == {"timestamp": -1}
+
+    assert peek_subscribe_response(SubscribeResponse(update=Notification()).SerializeToString()) == {"timestamp": 0}
+    assert peek_subscribe_response(SubscribeResponse(sync_response=True).SerializeToString()) == {
+        "sync_response": True
+    }
@@ -0,0 +1,101 @@
+"""
+Collection of unit tests to test the pool of gRPC channels
+"""
+# Modules
+import pytest
+from pygnmi.channel_pool import ChannelPool
+from pygnmi.client import gNMIclient
+from tests.servers import LocalServicer, start_server
+
+
+# Classes
+class FakeChannel(object):
+    def __init__(self):
+        self.is_closed = False
+
+    def close(self):
+        self.is_closed = True
+
+
+# Tests
+def test_channel_pool_refcount():
+    pool = ChannelPool(idle_timeout=0)
+    key = ("localhost:6030", "admin")
+
+    first = pool.acquire(key, FakeChannel)
+    second = pool.acquire(key, FakeChannel)
+    other = pool.acquire(("localhost:6031", "admin"), FakeChannel)
+    assert first is second
+    assert first is not other
+    assert len(pool) == 2
+
+    first.attributes["encoding"] = "json"
+    pool.release(key)
+    assert not first.channel.is_closed
+    assert pool.acquire(key, FakeChannel).attributes == {"encoding": "json"}
+
+    pool.release(key)
+    pool.release(key)
+    assert first.channel.is_closed
+    assert pool.stats() == [{"target": "localhost:6031", "refcount": 1, "idle_time": 0.0}]
+
+    pool.clear()
+    assert other.channel.is_closed
+
+
+def test_channel_pool_idle_timeout():
+    pool = ChannelPool(idle_timeout=3600)
+    key = ("localhost:6030", "admin")
+
+    pooled = pool.acquire(key, FakeChannel)
+    pool.release(key)
+    assert pool.evict_idle() == 0
+    assert pool.acquire(key, FakeChannel) is pooled
+
+    pool.release(key)
+    pool.idle_timeout = 0
+    assert pool.evict_idle() == 1
+    assert pooled.channel.is_closed
+
+
+def test_channel_pool_clients():
+    pool = ChannelPool(idle_timeout=60)
+    servicer = LocalServicer()
+    server, port = start_server(servicer)
+
+    try:
+        first = gNMIclient(target=("localhost", port), insecure=True, channel_pool=pool).connect()
+        second = gNMIclient(target=("localhost", port), insecure=True, channel_pool=pool).connect()
+
+        channel = first._gNMIclient__channel
+        assert second._gNMIclient__channel is channel
+        assert second._gNMIclient__stub is first._gNMIclient__stub
+        assert pool.stats()[0]["refcount"] == 2
+
+        # The encoding is negotiated once per channel
+        assert first.get(path=["/interfaces"])["notification"]
+        assert second.get(path=["/interfaces"])["notification"]
+        assert servicer.calls == {"Capabilities": 1, "Get": 2, "Subscribe": 0}
+
+        # Closed client releases the channel, which the other client keeps using
+        first.close()
+        assert pool.stats()[0]["refcount"] == 1
+        assert second.get(path=["/interfaces"])["notification"]
+
+        second.close()
+        assert pool.stats()[0]["refcount"] == 0
+
+        # The idle channel is reused by the next client, until it is evicted
+        with gNMIclient(target=("localhost", port), insecure=True, channel_pool=pool) as third:
+            assert third._gNMIclient__channel is channel
+            assert third.get(path=["/interfaces"])["notification"]
+        assert servicer.calls["Capabilities"] == 1
+
+        pool.idle_timeout = 0
+        assert pool.evict_idle() == 1
+        with pytest.raises(ValueError):
+            channel.unary_unary("/gnmi.gNMI/Capabilities")(b"")
+
+    finally:
+        pool.clear()
+        server.stop(0)
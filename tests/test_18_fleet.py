@@ -0,0 +1,141 @@
+"""
+Collection of unit tests to test the concurrent operations on many targets
+"""
+# Modules
+import threading
+import time
+from concurrent.futures import TimeoutError
+import grpc
+import pytest
+from pygnmi.fleet import connect_many, gNMIFleet
+from tests.servers import start_server
+
+
+# Tests
+def test_connect_many_failures():
+    targets = [("127.0.0.1", 1), {"target": ("127.0.0.1", 2), "username": "admin"}]
+
+    result = connect_many(targets, concurrency=2, timeout=0.5, insecure=True)
+    assert result.clients == {}
+    assert set(result.failures) == {("127.0.0.1", 1), ("127.0.0.1", 2)}
+    assert all(failure["phase"] == "channel_ready" for failure in result.failures.values())
+    assert all(failure["exception"] is not None for failure in result.failures.values())
+
+
+def test_connect_many_deadline():
+    result = connect_many([("127.0.0.1", 1)], timeout=0.5, deadline=0.1, insecure=True)
+    assert result.clients == {}
+    assert result.failures[("127.0.0.1", 1)]["phase"] == "deadline"
+
+    # Connection continues in background till its own timeout, it mustn't outlive the test
+    _join_threads("pygnmi-connect")
+
+
+def test_fleet_retries():
+    targets = [("127.0.0.1", 1), ("127.0.0.1", 2)]
+
+    with gNMIFleet(targets, retries=1, retry_delay=0.01, insecure=True, gnmi_timeout=0.2) as fleet:
+        results = list(fleet.capabilities())
+
+    assert {result.target for result in results} == {("127.0.0.1", 1), ("127.0.0.1", 2)}
+    assert all(result.result is None and result.error is not None for result in results)
+    assert all(result.attempts == 2 for result in results)
+
+
+def test_fleet_deadline():
+    with gNMIFleet([("127.0.0.1", 1)], deadline=0.1, insecure=True, gnmi_timeout=0.5) as fleet:
+        results = list(fleet.get(path=["/interfaces"], encoding="json"))
+
+        assert len(results) == 1
+        assert results[0].attempts is None
+        assert isinstance(results[0].error, TimeoutError)
+
+    # Operation in background fails on its own timeout, it mustn't outlive the test
+    _join_threads("pygnmi-fleet")
+
+
+def test_fleet_deadline_releases_target():
+    server, port = start_server()
+
+    def failing_operation(client):
+        time.sleep(0.3)
+        raise grpc.FutureTimeoutError()
+
+    try:
+        with gNMIFleet([("localhost", port)], deadline=0.1, retries=3, retry_delay=5, insecure=True) as fleet:
+            assert isinstance(list(fleet.run(failing_operation))[0].error, TimeoutError)
+
+            # The late operation isn't retried, so the next one doesn't wait behind its retries
+            started_at = time.monotonic()
+            results = list(fleet.capabilities(deadline=3))
+            assert results[0].error is None
+            assert time.monotonic() - started_at < 1
+
+    finally:
+        server.stop(0)
+
+
+def _join_threads(prefix: str) -> None:
+    for thread in threading.enumerate():
+        if thread.name.startswith(prefix):
+            thread.join()
+
+
+def test_fleet_deadline_slow_consumer():
+    server, port = start_server()
+    targets = [("localhost", port), ("127.0.0.1", port)]
+
+    try:
+        with gNMIFleet(targets, deadline=0.5, insecure=True) as fleet:
+            results = []
+            for result in fleet.capabilities():
+                results.append(result)
+                time.sleep(0.6)
+
+        # The deadline applies to the operations, not to the processing of their results
+        assert len(results) == 2
+        assert all(result.error is None for result in results)
+
+    finally:
+        server.stop(0)
+
+
+def test_fleet_retry_keeps_shared_client():
+    server, port = start_server()
+    clients = []
+    lock = threading.Lock()
+
+    def operation(client):
+        with lock:
+            clients.append(client)
+            call = len(clients)
+
+        # The first call is still running, when the second one fails on the same client
+        if call == 1:
+            time.sleep(0.5)
+            return client.capabilities()
+
+        if call == 2:
+            time.sleep(0.1)
+            raise grpc.FutureTimeoutError()
+
+        return client.capabilities()
+
+    try:
+        with gNMIFleet(
+            [("localhost", port)], per_target_concurrency=2, retries=1, retry_delay=0.01, insecure=True
+        ) as fleet:
+            list(fleet.run(lambda client: None))
+            results = list(fleet.run(operation, targets=[("localhost", port)] * 2))
+
+            assert all(result.result["gnmi_version"] == "0.8.0" for result in results)
+            assert sorted(result.attempts for result in results) == [1, 2]
+
+            # The failed client is replaced for the retry, and is closed after the first call released it
+            assert clients[0] is clients[1]
+            assert clients[2] is not clients[0]
+            with pytest.raises(ValueError):
+                clients[0]._gNMIclient__channel.unary_unary("/gnmi.gNMI/Capabilities")(b"")
+
+    finally:
+        server.stop(0)
@@ -0,0 +1,54 @@
+"""
+Collection of unit tests to test the on-disk cache of the certificates
+"""
+# Modules
+import datetime
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from pygnmi.cert_cache import CertificateCache
+
+
+# User-defined functions
+def create_certificate(common_name: str, days: int) -> bytes:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=2))
+        .not_valid_after(now + datetime.timedelta(days=days))
+        .sign(key, hashes.SHA256())
+    )
+
+    return certificate.public_bytes(serialization.Encoding.PEM)
+
+
+# Tests
+def test_certificate_cache(tmp_path):
+    path = str(tmp_path / "pygnmi" / "certificates.json")
+    certificate = create_certificate("router1", 30)
+
+    cache = CertificateCache(path)
+    assert cache.get("router1:6030") is None
+
+    entry = cache.put("router1:6030", certificate)
+    assert len(entry["fingerprint"]) == 64
+
+    # Another process sees the stored certificate
+    assert CertificateCache(path).get("router1:6030") == certificate
+
+    cache.discard("router1:6030")
+    assert CertificateCache(path).get("router1:6030") is None
+
+
+def test_certificate_cache_expiry(tmp_path):
+    cache = CertificateCache(str(tmp_path / "certificates.json"))
+    cache.put("router1:6030", create_certificate("router1", -1))
+
+    assert cache.get("router1:6030") is None
@@ -0,0 +1,44 @@
+"""
+Collection of unit tests to test the cache of the capabilities
+"""
+# Modules
+import pytest
+from pygnmi.capabilities_cache import CapabilitiesCache
+from pygnmi.client import gNMIclient
+
+
+# Statics
+CAPABILITIES = {"supported_encodings": ["json", "json_ietf"], "gnmi_version": "0.8.0"}
+
+
+# Tests
+def test_capabilities_cache_ttl():
+    cache = CapabilitiesCache(ttl=0)
+    cache.put("router1:6030", CAPABILITIES)
+    assert cache.get("router1:6030") is None
+
+    cache = CapabilitiesCache(ttl=60)
+    cache.put("router1:6030", CAPABILITIES)
+    assert cache.get("router1:6030") == CAPABILITIES
+    assert cache.get("router2:6030") is None
+
+    cache.discard("router1:6030")
+    assert cache.get("router1:6030") is None
+
+
+def test_capabilities_cache_on_disk(tmp_path):
+    path = str(tmp_path / "capabilities.json")
+
+    CapabilitiesCache(path=path).put("router1:6030", CAPABILITIES)
+    assert CapabilitiesCache(path=path).get("router1:6030") == CAPABILITIES
+
+
+def test_capabilities_cache_checks_encoding():
+    cache = CapabilitiesCache(ttl=60)
+    cache.put("127.0.0.1:1", CAPABILITIES)
+
+    gconn = gNMIclient(target=("127.0.0.1", 1), insecure=True, capabilities_cache=cache)
+
+    # Checked against the cached capabilities, without the request to the target
+    with pytest.raises(ValueError):
+        gconn.get(path=["/interfaces"], encoding="proto")
@@ -0,0 +1,51 @@
+"""
+Collection of unit tests to test the lazy connect of gNMIclient
+"""
+# Modules
+import time
+import pytest
+from pygnmi.cert_cache import CertificateCache
+from pygnmi.client import gNMIclient, gNMIException
+from tests.servers import make_certificate, start_server
+
+
+# Tests
+def test_lazy_connect():
+    states = []
+
+    started_at = time.monotonic()
+    gconn = gNMIclient(
+        target=("127.0.0.1", 1), insecure=True, gnmi_timeout=0.5, lazy=True, connectivity_callback=states.append
+    ).connect()
+    assert time.monotonic() - started_at < 0.5
+
+    with pytest.raises(gNMIException):
+        gconn.get(path=["/interfaces"], encoding="json")
+
+    gconn.close()
+    assert states
+
+
+def test_lazy_connect_rotated_certificate(tmp_path):
+    path = str(tmp_path / "certificates.json")
+
+    server, port = start_server(certificate=make_certificate("router1"))
+    with gNMIclient(target=("localhost", port), skip_verify=True, cert_cache=path, gnmi_timeout=2):
+        pass
+    server.stop(0)
+
+    # The device generated the new certificate on reload
+    certificate = make_certificate("router2")
+    server, port = start_server(port=port, certificate=certificate)
+
+    try:
+        with gNMIclient(
+            target=("localhost", port), skip_verify=True, cert_cache=path, gnmi_timeout=5, lazy=True
+        ) as gconn:
+            assert gconn.get(path=["/interfaces"], encoding="json")["notification"]
+            assert gconn.metrics["channel_replacements"] == 1
+
+        assert CertificateCache(path).get(f"localhost:{port}") == certificate[1]
+
+    finally:
+        server.stop(0)
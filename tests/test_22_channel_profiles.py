@@ -0,0 +1,23 @@
+"""
+Collection of unit tests to test the profiles of the gRPC channel options
+"""
+# Modules
+import pytest
+from pygnmi.channel_profiles import CHANNEL_PROFILES, get_channel_options
+from pygnmi.client import gNMIclient
+
+
+# Tests
+def test_channel_profiles():
+    for profile in ("bulk-get", "high-rate-telemetry", "low-latency-set"):
+        options = get_channel_options(profile)
+        assert options == CHANNEL_PROFILES[profile]
+        assert options is not CHANNEL_PROFILES[profile]
+
+    assert ("grpc.max_receive_message_length", 512 * 1024 * 1024) in get_channel_options("bulk-get")
+
+    with pytest.raises(ValueError):
+        get_channel_options("unknown")
+
+    with pytest.raises(ValueError):
+        gNMIclient(target=("127.0.0.1", 6030), channel_profile="unknown")
@@ -0,0 +1,65 @@
+"""
+Collection of unit tests to test the compression of the messages
+"""
+# Modules
+import threading
+import grpc
+import pytest
+import pygnmi.client
+from pygnmi.client import gNMIclient
+from pygnmi.spec.v080.gnmi_pb2 import SetRequest, Update, TypedValue
+
+
+# Tests
+def test_compression_metrics():
+    gconn = gNMIclient(target=("127.0.0.1", 6030), compression="gzip")
+    assert gconn.metrics["request_compression_ratio"] is None
+
+    request = SetRequest(update=[Update(val=TypedValue(json_val=b'{"description": "uplink"}' * 100))])
+    assert gconn._get_compression(None, request) is grpc.Compression.Gzip
+    assert gconn._get_compression("none", request) is grpc.Compression.NoCompression
+    assert gconn.metrics["request_messages"] == 2
+    assert gconn.metrics["request_compressed_bytes"] < gconn.metrics["request_bytes"]
+    assert gconn.metrics["request_compression_ratio"] > 1
+
+    with pytest.raises(ValueError):
+        gNMIclient(target=("127.0.0.1", 6030), compression="lz4")
+
+
+def test_compression_metrics_sampled(monkeypatch):
+    compressed = []
+    compress = pygnmi.client.zlib.compress
+    monkeypatch.setattr(pygnmi.client.zlib, "compress", lambda data: compressed.append(data) or compress(data))
+
+    gconn = gNMIclient(target=("127.0.0.1", 6030), compression="gzip")
+    request = SetRequest(update=[Update(val=TypedValue(json_val=b'{"description": "uplink"}' * 100))])
+
+    for _ in range(150):
+        gconn._get_compression(None, request)
+
+    # Compression ratio is measured on the samples only
+    assert len(compressed) == 2
+    assert gconn.metrics["request_bytes"] == 150 * request.ByteSize()
+    assert gconn.metrics["request_compression_ratio"] > 1
+
+    # Uncompressed messages aren't compressed for the metrics
+    gconn._get_compression("none", request)
+    assert len(compressed) == 2
+
+
+def test_compression_metrics_threads():
+    gconn = gNMIclient(target=("127.0.0.1", 6030), compression="gzip")
+    request = SetRequest(update=[Update(val=TypedValue(json_val=b'{"description": "uplink"}' * 100))])
+
+    def send():
+        for _ in range(500):
+            gconn._get_compression(None, request)
+
+    threads = [threading.Thread(target=send) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert gconn.metrics["request_messages"] == 4000
+    assert gconn.metrics["request_bytes"] == 4000 * request.ByteSize()
@@ -0,0 +1,135 @@
+"""
+Collection of unit tests to test the watching of the connectivity state of the channel
+"""
+# Modules
+import time
+import grpc
+import pytest
+from pygnmi.cert_cache import CertificateCache
+from pygnmi.client import gNMIclient
+from tests.servers import LocalServicer, make_certificate, start_server
+
+
+# Statics
+SUBSCRIBE = {"subscription": [{"path": "interfaces", "mode": "sample"}], "mode": "stream", "encoding": "json"}
+
+
+# Tests
+def test_connectivity_metrics():
+    states = []
+    gconn = gNMIclient(target=("127.0.0.1", 6030), connectivity_callback=states.append)
+
+    for state in (
+        grpc.ChannelConnectivity.READY,
+        grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+        grpc.ChannelConnectivity.CONNECTING,
+        grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+        grpc.ChannelConnectivity.READY,
+    ):
+        gconn._on_connectivity_change(state)
+
+    assert len(states) == 5
+    assert gconn.metrics["connectivity_state"] == "READY"
+    assert gconn.metrics["state_changes"] == 5
+    assert gconn.metrics["transient_failures"] == 1
+    assert gconn.metrics["recoveries"] == 1
+    assert gconn.metrics["last_outage"] >= 0
+
+
+def test_auto_recover_server_restart():
+    server, port = start_server()
+
+    # gRPC doesn't reconnect on its own within the test, so the channel is restored by the probe only
+    backoff = [("grpc.initial_reconnect_backoff_ms", 30000), ("grpc.min_reconnect_backoff_ms", 30000)]
+    gconn = gNMIclient(
+        target=("localhost", port), insecure=True, auto_recover=True, gnmi_timeout=2, grpc_options=backoff
+    ).connect()
+
+    try:
+        subscription = gconn.subscribe2(subscribe=SUBSCRIBE, reconnect=True, reconnect_backoff=(0.1, 0.5))
+        assert "update" in subscription.get_update(timeout=2)
+        channel = subscription._channel
+
+        server.stop(0)
+        assert _wait_for(lambda: gconn.metrics["transient_failures"] == 1)
+
+        servicer = LocalServicer()
+        server, _ = start_server(servicer, port=port)
+
+        # The target is probed and the channel is re-created, the stub and subscription move to it
+        assert _wait_for(lambda: gconn.metrics["channel_replacements"] == 1)
+        assert subscription._channel is not channel
+        assert gconn.get(path=["/interfaces"], encoding="json")["notification"]
+        assert _wait_for(lambda: servicer.calls["Subscribe"] == 1)
+        assert _wait_for(lambda: gconn.metrics["recoveries"] == 1)
+
+    finally:
+        gconn.close()
+        server.stop(0)
+
+
+def test_auto_recover_refresh_certificate(tmp_path):
+    path = str(tmp_path / "certificates.json")
+    server, port = start_server(certificate=make_certificate("router1"))
+    gconn = gNMIclient(
+        target=("localhost", port),
+        skip_verify=True,
+        cert_cache=path,
+        auto_recover=True,
+        refresh_certificate=True,
+        gnmi_timeout=2,
+    ).connect()
+
+    try:
+        server.stop(0)
+        assert _wait_for(lambda: gconn.metrics["transient_failures"] == 1)
+
+        # The device generated the new certificate on reload
+        certificate = make_certificate("router2")
+        server, _ = start_server(port=port, certificate=certificate)
+
+        assert _wait_for(lambda: gconn.metrics["channel_replacements"] == 1)
+        assert gconn.get(path=["/interfaces"], encoding="json")["notification"]
+        assert CertificateCache(path).get(f"localhost:{port}") == certificate[1]
+
+    finally:
+        gconn.close()
+        server.stop(0)
+
+
+def test_replace_channel_closed_meanwhile():
+    server, port = start_server()
+    gconn = gNMIclient(target=("localhost", port), insecure=True, gnmi_timeout=2).connect()
+    old_channel = gconn._gNMIclient__channel
+    new_channels = []
+    open_channel = gconn._open_channel
+
+    # The client is closed, while the new channel becomes ready
+    def open_channel_and_close(*args, **kwargs):
+        new_channels.append(open_channel(*args, **kwargs))
+        gconn.close()
+        return new_channels[-1]
+
+    gconn._open_channel = open_channel_and_close
+
+    try:
+        gconn._replace_channel()
+
+        assert gconn._gNMIclient__channel is old_channel
+        for channel in (old_channel, new_channels[0]):
+            with pytest.raises(ValueError):
+                channel.unary_unary("/gnmi.gNMI/Capabilities")(b"")
+
+    finally:
+        server.stop(0)
+
+
+def _wait_for(condition, timeout: float = 10) -> bool:
+    started_at = time.monotonic()
+
+    while not condition():
+        if time.monotonic() - started_at > timeout:
+            return False
+        time.sleep(0.05)
+
+    return True
@@ -0,0 +1,59 @@
+"""
+Collection of unit tests to test the telemetry collector sharding the targets across the worker processes
+"""
+# Modules
+import time
+from pygnmi.collector import TelemetryCollector
+from tests.servers import start_server
+
+
+# Statics
+SUBSCRIBE = {"subscription": [{"path": "interfaces", "mode": "sample"}], "mode": "stream"}
+
+
+# Tests
+def test_collector_rebalance():
+    targets = [("127.0.0.1", port) for port in (1, 2, 3, 4)]
+
+    with TelemetryCollector(targets, SUBSCRIBE, workers=2, max_restarts=0, insecure=True) as collector:
+        stats = collector.stats()
+        assert [stats[worker_id]["targets"] for worker_id in (0, 1)] == [2, 2]
+        assert all(stats[worker_id]["alive"] for worker_id in (0, 1))
+
+        collector._processes[0].kill()
+        collector._processes[0].join()
+
+        started_at = time.time()
+        while collector.stats()[0]["alive"] and time.time() - started_at < 10:
+            time.sleep(0.1)
+
+        stats = collector.stats()
+        assert not stats[0]["alive"]
+        assert stats[0]["targets"] == 0
+        assert stats[1]["targets"] == 4
+        assert sorted(collector._shards[1]) == targets
+
+
+def test_collector_target_comes_up():
+    # The port of the target, which isn't running yet
+    server, port = start_server()
+    server.stop(0)
+    targets = [("127.0.0.1", 1), ("localhost", port)]
+
+    with TelemetryCollector(
+        targets, SUBSCRIBE, workers=1, retry_delay=0.2, stats_interval=0.2, insecure=True, gnmi_timeout=0.5
+    ) as collector:
+        started_at = time.time()
+        while not collector.stats()[0]["errors"] and time.time() - started_at < 10:
+            time.sleep(0.1)
+        assert collector.stats()[0]["errors"]
+
+        server, port = start_server(port=port)
+
+        try:
+            updates = (entry for entry in collector.updates(timeout=15) if entry[0] == ("localhost", port))
+            target, update = next(updates)
+            assert update["update"]["update"][0]["val"] == 1500
+
+        finally:
+            server.stop(0)
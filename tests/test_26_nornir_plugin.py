@@ -0,0 +1,44 @@
+"""
+Collection of unit tests to test the Nornir connection plugin
+"""
+# Modules
+import pytest
+from pygnmi.client import gNMIclient, gNMIException
+from pygnmi.nornir_plugin import gNMIConnection
+
+
+# Tests
+def test_nornir_connection_open_close():
+    plugin = gNMIConnection()
+    plugin.open(
+        hostname="127.0.0.1",
+        username="admin",
+        password="admin",
+        port=1,
+        platform="arista-eos",
+        extras={"insecure": True, "lazy": True, "gnmi_timeout": 0.5},
+        configuration=None,
+    )
+
+    assert isinstance(plugin.connection, gNMIclient)
+
+    with pytest.raises(gNMIException):
+        plugin.connection.get(path=["/interfaces"], encoding="json")
+
+    plugin.close()
+
+
+def test_nornir_connection_default_port():
+    plugin = gNMIConnection()
+
+    with pytest.raises(ValueError):
+        plugin.open(hostname="127.0.0.1", username="admin", password="admin", extras={"insecure": True})
+
+    plugin.open(
+        hostname="127.0.0.1",
+        username="admin",
+        password="admin",
+        extras={"insecure": True, "lazy": True, "default_port": 1},
+    )
+    assert plugin.connection._gNMIclient__target == ("127.0.0.1", 1)
+    plugin.close()
@@ -0,0 +1,162 @@
+"""
+Collection of unit tests to test the scheduler of the POLL subscriptions
+"""
+# Modules
+import threading
+import time
+import pytest
+from pygnmi.client import PollSubscriber
+from pygnmi.poll_scheduler import PollScheduler
+
+
+# Classes
+class FakePollSubscriber(PollSubscriber):
+    """POLL subscription answering each poll with the snapshot after delay, or never if delay is None"""
+
+    def __init__(self, delay: float = 0.0):
+        self._snapshot_handler = None
+        self._snapshot = None
+        self.delay = delay
+        self.polled_at = []
+
+    def poll(self):
+        self.polled_at.append(time.monotonic())
+
+        if self.delay is not None:
+            threading.Timer(self.delay, self._answer, args=(len(self.polled_at),)).start()
+
+    def _answer(self, sequence: int):
+        handler = self._snapshot_handler
+        if handler is not None:
+            handler({"update": {"update": [{"path": "counter", "val": sequence}]}, "sync_response": True})
+
+
+# Tests
+def test_poll_scheduler_validation():
+    with PollScheduler() as scheduler:
+        with pytest.raises(ValueError):
+            scheduler.add(object(), interval=1)
+
+        with pytest.raises(ValueError):
+            scheduler.add(FakePollSubscriber(), interval=1, jitter=1)
+
+        subscriber = FakePollSubscriber()
+        scheduler.add(subscriber, interval=1)
+
+        with pytest.raises(ValueError):
+            scheduler.add(subscriber, interval=1)
+
+    with pytest.raises(ValueError):
+        scheduler.add(FakePollSubscriber(), interval=1)
+
+
+def test_poll_scheduler_cadence_and_jitter():
+    plain, jittered = FakePollSubscriber(), FakePollSubscriber()
+
+    with PollScheduler() as scheduler:
+        started_at = time.monotonic()
+        scheduler.add(plain, interval=0.1, callback=lambda subscriber, snapshot: None)
+        scheduler.add(jittered, interval=0.1, jitter=0.05, callback=lambda subscriber, snapshot: None)
+        time.sleep(1.05)
+
+    # The cadence doesn't drift by the response time or the jitter
+    for subscriber in (plain, jittered):
+        assert 10 <= len(subscriber.polled_at) <= 12
+
+    for index, polled_at in enumerate(plain.polled_at):
+        assert 0 <= polled_at - started_at - index * 0.1 < 0.05
+
+    offsets = [polled_at - started_at - index * 0.1 for index, polled_at in enumerate(jittered.polled_at)]
+    assert all(-0.01 <= offset < 0.1 for offset in offsets)
+    assert max(offsets) - min(offsets) > 0.005
+
+
+def test_poll_scheduler_overruns():
+    subscriber = FakePollSubscriber(delay=None)
+
+    with PollScheduler() as scheduler:
+        scheduler.add(subscriber, interval=0.05)
+        time.sleep(0.28)
+        stats = scheduler.stats()[0]
+
+    assert len(subscriber.polled_at) == 1
+    assert stats["polls"] == 1
+    assert stats["overruns"] >= 4
+    assert stats["snapshots"] == 0
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_poll_scheduler_pipelined(pipelined):
+    subscriber = FakePollSubscriber()
+    delivered = []
+
+    def slow_callback(subscriber, snapshot):
+        delivered.append(snapshot)
+        time.sleep(0.25)
+
+    with PollScheduler() as scheduler:
+        scheduler.add(subscriber, interval=0.05, pipelined=pipelined, callback=slow_callback)
+        time.sleep(0.5)
+        stats = scheduler.stats()[0]
+
+    if pipelined:
+        # Polls keep going, while the callback processes the previous snapshots
+        assert stats["polls"] >= 9
+        assert stats["overruns"] == 0
+
+    else:
+        assert stats["polls"] <= 3
+        assert stats["overruns"] >= 6
+
+
+def test_poll_scheduler_delivery():
+    queued, called = FakePollSubscriber(), FakePollSubscriber()
+    delivered = []
+
+    def callback(subscriber, snapshot):
+        delivered.append((subscriber, snapshot))
+
+    with PollScheduler() as scheduler:
+        scheduler.add(queued, interval=0.1)
+        scheduler.add(called, interval=0.1, callback=callback)
+
+        subscriber, snapshot = scheduler.snapshots.get(timeout=1)
+        assert subscriber is queued
+        assert snapshot["sync_response"] is True
+        assert snapshot["update"]["update"][0]["val"] == 1
+
+        time.sleep(0.05)
+        stats = {entry["subscriber"]: entry for entry in scheduler.stats()}
+
+    assert delivered and delivered[0][0] is called
+    assert delivered[0][1]["update"]["update"][0]["val"] == 1
+    assert all(subscriber is not called for subscriber, _ in list(scheduler.snapshots.queue))
+    assert stats[called]["snapshots"] >= 1
+    assert stats[called]["last_latency"] is not None
+
+
+def test_poll_scheduler_remove_and_close():
+    removed, kept = FakePollSubscriber(), FakePollSubscriber()
+
+    scheduler = PollScheduler()
+    scheduler.add(removed, interval=0.05, callback=lambda subscriber, snapshot: None)
+    scheduler.add(kept, interval=0.05, callback=lambda subscriber, snapshot: None)
+    time.sleep(0.12)
+
+    scheduler.remove(removed)
+    polls = len(removed.polled_at)
+    assert removed._snapshot_handler is None
+    assert [entry["subscriber"] for entry in scheduler.stats()] == [kept]
+
+    time.sleep(0.15)
+    assert len(removed.polled_at) == polls
+    assert len(kept.polled_at) > polls
+
+    scheduler.close()
+    assert not scheduler._thread.is_alive()
+    assert kept._snapshot_handler is None
+    assert scheduler.stats() == []
+
+    polls = len(kept.polled_at)
+    time.sleep(0.12)
+    assert len(kept.polled_at) == polls
@@ -0,0 +1,73 @@
+"""
+Collection of unit tests to test the race of the TLS name overrides on the parallel channels
+"""
+# Modules
+import time
+import grpc
+import pytest
+import pygnmi.client
+from pygnmi.client import gNMIclient
+from tests.servers import make_certificate, start_server
+
+
+# Tests
+def test_wait_for_first_ready():
+    server, port = start_server()
+    channels = {"dead": grpc.insecure_channel("127.0.0.1:1"), "live": grpc.insecure_channel(f"localhost:{port}")}
+
+    try:
+        started_at = time.monotonic()
+        assert gNMIclient(target=("localhost", port), insecure=True)._wait_for_first_ready(channels, 2) == "live"
+        assert time.monotonic() - started_at < 1
+
+        # The other channels are closed
+        with pytest.raises(ValueError):
+            channels["dead"].unary_unary("/gnmi.gNMI/Capabilities")(b"")
+
+        with pytest.raises(grpc.FutureTimeoutError):
+            gNMIclient(target=("127.0.0.1", 1), insecure=True)._wait_for_first_ready(
+                {"dead": grpc.insecure_channel("127.0.0.1:1")}, 0.2
+            )
+
+    finally:
+        channels["live"].close()
+        server.stop(0)
+
+
+def test_tls_name_override_race():
+    # The CN isn't valid name override, the SAN "router1" is
+    certificate = make_certificate("bad name!", alt_names=["router1"])
+    server, port = start_server(certificate=certificate)
+    target_path = f"localhost:{port}"
+
+    try:
+        with gNMIclient(target=("localhost", port), skip_verify=True, gnmi_timeout=3) as gconn:
+            assert gconn.capabilities()["gnmi_version"] == "0.8.0"
+        assert pygnmi.client._tls_profiles.get(target_path) == "router1"
+
+        # The remembered override stops working, so the overrides are raced again
+        pygnmi.client._tls_profiles.put(target_path, "bad name!")
+
+        with gNMIclient(target=("localhost", port), skip_verify=True, gnmi_timeout=1) as gconn:
+            assert gconn.capabilities()["gnmi_version"] == "0.8.0"
+        assert pygnmi.client._tls_profiles.get(target_path) == "router1"
+
+    finally:
+        pygnmi.client._tls_profiles.discard(target_path)
+        server.stop(0)
+
+
+def test_tls_profiles_lru():
+    profiles = pygnmi.client._TLSProfiles(max_size=2)
+    profiles.put("router1:6030", "router1")
+    profiles.put("router2:6030", "router2")
+
+    # The least recently used target is forgotten
+    assert profiles.get("router1:6030") == "router1"
+    profiles.put("router3:6030", "router3")
+    assert len(profiles) == 2
+    assert profiles.get("router2:6030") is None
+    assert profiles.get("router1:6030") == "router1"
+
+    profiles.discard("router1:6030")
+    assert profiles.get("router1:6030") is None
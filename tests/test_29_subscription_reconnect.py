@@ -0,0 +1,120 @@
+"""
+Collection of unit tests to test the re-establishment of the broken subscription streams
+"""
+# Modules
+import grpc
+import pytest
+from pygnmi.client import gNMIclient, gNMIException
+from tests.servers import LocalServicer, start_server
+
+
+# Statics
+SUBSCRIBE = {"subscription": [{"path": "interfaces", "mode": "sample"}], "mode": "stream", "encoding": "json"}
+GRPC_OPTIONS = [("grpc.initial_reconnect_backoff_ms", 100), ("grpc.max_reconnect_backoff_ms", 500)]
+
+
+# Tests
+def test_reconnect_server_restart():
+    server, port = start_server()
+
+    with gNMIclient(target=("localhost", port), insecure=True, grpc_options=GRPC_OPTIONS) as gconn:
+        subscription = gconn.subscribe2(subscribe=SUBSCRIBE, reconnect=True, reconnect_backoff=(0.1, 0.5))
+
+        try:
+            assert subscription.get_update(timeout=2)["sync_response"]
+            server.stop(0)
+
+            servicer = LocalServicer()
+            server, _ = start_server(servicer, port=port)
+
+            # The boundary is marked, followed by the new initial synchronisation
+            update = subscription.get_update(timeout=10)
+            while "resync" not in update:
+                update = subscription.get_update(timeout=10)
+
+            assert update["resync"]["reconnects"] == 1
+            assert update["resync"]["gap"] > 0
+            assert update["resync"]["reason"]
+            assert subscription.stats["reconnects"] == 1
+            assert subscription.stats["max_gap"] == update["resync"]["gap"]
+
+            assert "update" in subscription.get_update(timeout=2)
+            assert subscription.get_update(timeout=2)["sync_response"]
+            assert servicer.calls["Subscribe"] == 1
+
+        finally:
+            subscription.close()
+            server.stop(0)
+
+
+@pytest.mark.parametrize("output", ["records", "batch", "raw"])
+def test_reconnect_compact_output(output: str):
+    server, port = start_server()
+
+    with gNMIclient(target=("localhost", port), insecure=True, grpc_options=GRPC_OPTIONS) as gconn:
+        subscription = gconn.subscribe2(
+            subscribe=SUBSCRIBE, reconnect=True, reconnect_backoff=(0.1, 0.5), output=output
+        )
+
+        try:
+            received = [subscription.get_update(timeout=2)]
+            server.stop(0)
+            server, _ = start_server(port=port)
+
+            # The stream contains only the records (or bytes) and the sync_response, the reconnect is in stats
+            while subscription.stats["reconnects"] == 0 or not subscription._is_sync_response(received[-1]):
+                received.append(subscription.get_update(timeout=10))
+
+            assert all(not isinstance(entry, dict) or set(entry) == {"sync_response"} for entry in received)
+            assert subscription.stats["reconnects"] == 1
+
+        finally:
+            subscription.close()
+            server.stop(0)
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_reconnect_non_retryable_code():
+    servicer = LocalServicer(subscribe_status=grpc.StatusCode.UNAUTHENTICATED)
+    server, port = start_server(servicer)
+
+    try:
+        with gNMIclient(target=("localhost", port), insecure=True) as gconn:
+            subscription = gconn.subscribe2(subscribe=SUBSCRIBE, reconnect=True, reconnect_backoff=(0.05, 0.1))
+
+            with pytest.raises(gNMIException):
+                subscription.get_update(timeout=5)
+
+            subscription.close(timeout=5)
+            assert not subscription._subscribe_thread.is_alive()
+            assert servicer.calls["Subscribe"] == 1
+            assert subscription.stats["reconnects"] == 0
+
+    finally:
+        server.stop(0)
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_reconnect_max_reconnects():
+    servicer = LocalServicer(subscribe_status=grpc.StatusCode.UNAVAILABLE)
+    server, port = start_server(servicer)
+
+    try:
+        with gNMIclient(target=("localhost", port), insecure=True) as gconn:
+            subscription = gconn.subscribe2(
+                subscribe=SUBSCRIBE, reconnect=True, reconnect_backoff=(0.05, 0.1), max_reconnects=2
+            )
+
+            with pytest.raises(gNMIException):
+                subscription.get_update(timeout=5)
+
+            subscription.close(timeout=5)
+            assert not subscription._subscribe_thread.is_alive()
+
+            # The first attempt and two reconnects, none of them established
+            assert servicer.calls["Subscribe"] == 3
+            assert subscription.stats["reconnects"] == 0
+            assert subscription.stats["last_error"] == "Subscription is rejected"
+
+    finally:
+        server.stop(0)
@@ -0,0 +1,68 @@
+"""
+Collection of unit tests to test the subscriptions against the local gNMI server
+"""
+# Modules
+import time
+import pytest
+from pygnmi.client import gNMIclient
+from tests.servers import LocalServicer, start_server
+
+
+# Statics
+SUBSCRIBE = {"subscription": [{"path": "interfaces", "mode": "sample"}], "mode": "stream", "encoding": "json"}
+
+
+# Tests
+def test_incremental_sync():
+    # The initial synchronisation takes a second to complete
+    server, port = start_server(LocalServicer(sync_delay=1))
+
+    try:
+        with gNMIclient(target=("localhost", port), insecure=True) as gconn:
+            subscription = gconn.subscribe2(subscribe=SUBSCRIBE, incremental_sync=True)
+
+            try:
+                # The updates of the initial synchronisation are returned before it completes
+                started_at = time.monotonic()
+                update = subscription.get_update(timeout=5)
+                assert time.monotonic() - started_at < 0.8
+                assert update["sync_phase"] is True
+                assert update["update"]["update"][0]["val"] == 1500
+                assert "sync_response" not in update
+
+                assert subscription.get_update(timeout=5) == {"sync_response": True}
+
+                update = subscription.get_update(timeout=5)
+                assert "update" in update
+                assert "sync_phase" not in update
+
+            finally:
+                subscription.close()
+
+    finally:
+        server.stop(0)
+
+
+def test_close_all():
+    server, port = start_server()
+
+    try:
+        with gNMIclient(target=("localhost", port), insecure=True) as gconn:
+            subscriptions = [gconn.subscribe2(subscribe=dict(SUBSCRIBE)) for _ in range(5)]
+            for subscription in subscriptions:
+                assert subscription.get_update(timeout=5)["sync_response"]
+
+            started_at = time.monotonic()
+            gconn.close_all()
+            assert time.monotonic() - started_at < 1
+
+            for subscription in subscriptions:
+                assert not subscription._subscribe_thread.is_alive()
+
+                # The consumers are released, rather than blocked
+                with pytest.raises(StopIteration):
+                    while True:
+                        next(subscription)
+
+    finally:
+        server.stop(0)